@@ -0,0 +1,88 @@
+"""Benchmark the cost of building FFmpeg command lines.
+
+Measures `FFmpeg` construction for small and large option sets and compares constructing
+instances from option strings with rendering them from a precompiled `FFmpegTemplate`, the way
+a job generator producing many near-identical jobs would.
+
+Run with ``uv run python benchmarks/bench_compilation.py`` (or ``make bench`` for the whole suite).
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Callable, Iterator
+
+from common import Benchmark, benchmark, report
+
+from ffmpy import FFmpeg, FFmpegTemplate
+
+GLOBAL_OPTIONS = "-y -v error -hide_banner -nostdin"
+INPUT_OPTIONS = "-ss {start:.3f} -t 10"
+OUTPUT_OPTIONS = (
+    "-c:v libx264 -preset veryfast -crf {crf} -pix_fmt yuv420p -c:a aac -b:a 128k "
+    "-movflags +faststart -vf scale=-2:720"
+)
+
+TEMPLATE = FFmpegTemplate(
+    global_options=GLOBAL_OPTIONS,
+    inputs={"{src}": INPUT_OPTIONS},
+    outputs={"{dst}": OUTPUT_OPTIONS},
+)
+
+
+def construct(index: int) -> FFmpeg:
+    return FFmpeg(
+        global_options=GLOBAL_OPTIONS,
+        inputs={f"input {index}.mp4": INPUT_OPTIONS.format(start=index / 10)},
+        outputs={f"output {index}.mp4": OUTPUT_OPTIONS.format(crf=23)},
+    )
+
+
+def render(index: int) -> FFmpeg:
+    return TEMPLATE.render(
+        src=f"input {index}.mp4", dst=f"output {index}.mp4", start=index / 10, crf=23
+    )
+
+
+def large_option_set(streams: int) -> dict[str, dict[str, str]]:
+    """Inputs and outputs of an ABR-like job with `streams` inputs and outputs."""
+    return {
+        "inputs": {f"input{i}.mp4": f"-ss {i} -t 60 -thread_queue_size 512" for i in range(streams)},
+        "outputs": {
+            f"output{i}.mp4": (
+                f"-map {i}:v -map {i}:a -c:v libx264 -b:v {i + 1}M -maxrate {i + 1}M "
+                f"-bufsize {2 * (i + 1)}M -c:a aac -b:a 128k -metadata title='Rendition {i}'"
+            )
+            for i in range(streams)
+        },
+    }
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    for with_cmd in (False, True):
+        suffix = " + cmd" if with_cmd else ""
+        for name, make in (("FFmpeg(...)", construct), ("FFmpegTemplate.render(...)", render)):
+            yield benchmark(f"compile: {name}{suffix}", _jobs(make, with_cmd), 100, operations=100)
+
+    for streams in (10, 100):
+        options = large_option_set(streams)
+        yield benchmark(
+            f"compile: FFmpeg(...) with {streams} inputs and outputs",
+            functools.partial(_compile_large, options),
+            10_000 // streams,
+        )
+
+
+def _jobs(make: Callable[[int], FFmpeg], with_cmd: bool) -> Callable[[], object]:
+    """Return a function creating 100 jobs with `make`, also building ``cmd`` if `with_cmd`."""
+    if with_cmd:
+        return lambda: [make(index).cmd for index in range(100)]
+    return lambda: [make(index) for index in range(100)]
+
+
+def _compile_large(options: dict[str, dict[str, str]]) -> str:
+    return FFmpeg(inputs=options["inputs"], outputs=options["outputs"]).cmd
+
+
+if __name__ == "__main__":
+    report(benchmarks())
@@ -0,0 +1,101 @@
+"""Benchmark the overhead of executing a process.
+
+Measures spawn-to-exit latency of `FFmpeg.run` (and its asynchronous counterpart) executing the
+fake ffmpeg binary, which exits immediately, in the configurations that take different code
+paths: no redirection, output collected by `subprocess.Popen.communicate`, output drained by
+threads, with and without `psutil`, and in the fast spawn mode. The import benchmarks start a
+new interpreter importing ffmpy; the difference to the bare interpreter is the import time.
+
+Run with ``uv run python benchmarks/bench_spawn.py`` (or ``make bench`` for the whole suite).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+from typing import Iterator
+from unittest import mock
+
+from common import FAKE_FFMPEG_DIR, Benchmark, benchmark, report, use_fake_ffmpeg
+
+from ffmpy import FFmpeg, FFprobe, TailCapture
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    use_fake_ffmpeg()
+    number = 200
+    quiet = FFmpeg()
+    ff = FFmpeg(global_options="--stdout oneline --stderr oneline")
+
+    yield benchmark("spawn: run()", quiet.run, number)
+    yield benchmark("spawn: run(fast_spawn=True)", lambda: quiet.run(fast_spawn=True), number)
+    yield benchmark(
+        "spawn: run(stdout=PIPE, stderr=PIPE)",
+        lambda: ff.run(stdout=subprocess.PIPE, stderr=subprocess.PIPE),
+        number,
+    )
+    yield benchmark(
+        "spawn: run(stdout=PIPE, stderr=TailCapture())",
+        lambda: ff.run(stdout=subprocess.PIPE, stderr=TailCapture()),
+        number,
+    )
+    yield benchmark(
+        "spawn: run(stdout=PIPE, stderr=PIPE, timeout=60)",
+        lambda: ff.run(stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60),
+        number,
+    )
+
+    def run_with_subprocess_popen() -> None:
+        with mock.patch("ffmpy.ffmpy.popen", subprocess.Popen):
+            for _ in range(10):
+                quiet.run()
+
+    yield benchmark(
+        "spawn: run() with subprocess.Popen",
+        run_with_subprocess_popen,
+        number // 10,
+        operations=10,
+    )
+
+    media_file = os.path.join(FAKE_FFMPEG_DIR, "ffmpeg.go")
+    yield benchmark(
+        "spawn: FFprobe.probe()",
+        lambda: FFprobe.probe(media_file, executable="ffmpeg", cache=None),
+        number,
+    )
+    yield benchmark(
+        "spawn: FFprobe.probe(fast_spawn=True)",
+        lambda: FFprobe.probe(media_file, executable="ffmpeg", cache=None, fast_spawn=True),
+        number,
+    )
+
+    async def run_async_many() -> None:
+        for _ in range(10):
+            await ff.run_async(stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    yield benchmark(
+        "spawn: run_async(stdout=PIPE, stderr=PIPE)",
+        lambda: asyncio.run(run_async_many()),
+        number // 10,
+        operations=10,
+    )
+
+    env = {**os.environ, "PYTHONPATH": ROOT_DIR}
+    yield benchmark(
+        "import: python -c pass",
+        lambda: subprocess.run([sys.executable, "-c", "pass"], env=env, check=True),
+        number // 10,
+    )
+    yield benchmark(
+        "import: python -c 'import ffmpy'",
+        lambda: subprocess.run([sys.executable, "-c", "import ffmpy"], env=env, check=True),
+        number // 10,
+    )
+
+
+if __name__ == "__main__":
+    report(benchmarks())
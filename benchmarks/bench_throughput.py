@@ -0,0 +1,104 @@
+"""Benchmark moving data through the pipes of a process.
+
+Measures throughput of ``stdout`` produced by the fake ffmpeg binary (``--stdout-bytes``),
+``stdin`` consumed by it (``--stdin discard``) and both at once (``--stdin echo``) through
+`FFmpeg.run` and `FFmpeg.stream` at various payload sizes, and reading ``stdout`` as frames with
+`FrameReader` if NumPy is installed.
+
+Run with ``uv run python benchmarks/bench_throughput.py`` (or ``make bench`` for the whole suite).
+"""
+
+from __future__ import annotations
+
+import collections
+import importlib.util
+import subprocess
+from typing import Iterator
+
+from common import Benchmark, benchmark, report, use_fake_ffmpeg
+
+from ffmpy import FFmpeg, FrameReader
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+PAYLOAD_SIZES = (64 * 2**10, 2**20, 16 * 2**20, 64 * 2**20)
+
+
+def _repeat(size: int) -> int:
+    """Number of runs per measurement, so that every measurement moves about 256 MiB."""
+    return max(1, 256 * 2**20 // size // 8)
+
+
+def _chunks(data: bytes, size: int) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    use_fake_ffmpeg()
+    for size in PAYLOAD_SIZES:
+        yield from _benchmarks(size)
+
+
+def _benchmarks(size: int) -> Iterator[Benchmark]:
+    """Benchmarks moving `size` bytes; a function of its own so that the lambdas bind `size`."""
+    label = f"{size // 2**10} KiB" if size < 2**20 else f"{size // 2**20} MiB"
+    number = _repeat(size)
+    data = b"x" * size
+
+    generate = FFmpeg(global_options=f"--stdout-bytes {size}")
+    yield benchmark(
+        f"stdout: run(stdout=PIPE) {label}",
+        lambda: generate.run(stdout=subprocess.PIPE),
+        number,
+        payload=size,
+    )
+    yield benchmark(
+        f"stdout: stream() {label}",
+        lambda: collections.deque(generate.stream(), maxlen=0),
+        number,
+        payload=size,
+    )
+    if HAS_NUMPY:
+        # 64 KiB frames, read 16 at a time
+        reader = FrameReader(
+            "-", 128, 128, "rgba", batch_size=16, input_options=f"--stdout-bytes {size}"
+        )
+        yield benchmark(
+            f"stdout: FrameReader(batch_size=16) {label}",
+            lambda: collections.deque(reader, maxlen=0),
+            number,
+            payload=size,
+        )
+
+    discard = FFmpeg(global_options="--stdin discard")
+    yield benchmark(
+        f"stdin: run(input_data=bytes) {label}",
+        lambda: discard.run(input_data=data),
+        number,
+        payload=size,
+    )
+    yield benchmark(
+        f"stdin: run(input_data=iterable) {label}",
+        lambda: discard.run(input_data=_chunks(data, 2**16)),
+        number,
+        payload=size,
+    )
+
+    echo = FFmpeg(global_options="--stdin echo")
+    yield benchmark(
+        f"echo: run(input_data=bytes, stdout=PIPE) {label}",
+        lambda: echo.run(input_data=data, stdout=subprocess.PIPE),
+        number,
+        payload=size,
+    )
+    yield benchmark(
+        f"echo: stream(input_data=bytes) {label}",
+        lambda: collections.deque(echo.stream(input_data=data), maxlen=0),
+        number,
+        payload=size,
+    )
+
+
+if __name__ == "__main__":
+    report(benchmarks())
@@ -0,0 +1,102 @@
+"""Shared helpers of the benchmark suite."""
+
+from __future__ import annotations
+
+import os
+import timeit
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+#: directory of the fake ffmpeg binary the tests use, see tests/ffmpeg/ffmpeg.go
+FAKE_FFMPEG_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), os.pardir, "tests", "ffmpeg")
+)
+
+
+def use_fake_ffmpeg() -> None:
+    """Make ``ffmpeg`` resolve to the fake binary, so that only ffmpy overhead is measured."""
+    if not os.path.exists(os.path.join(FAKE_FFMPEG_DIR, "ffmpeg")):
+        raise SystemExit(
+            f"Fake ffmpeg binary not found, build it with `go build` in {FAKE_FFMPEG_DIR}"
+        )
+    os.environ["PATH"] = FAKE_FFMPEG_DIR + os.pathsep + os.environ["PATH"]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A benchmark to be run: `func` is timed `number` times, `repeat` times over."""
+
+    __slots__ = ("name", "func", "number", "payload", "operations")
+
+    name: str
+    func: Callable[[], object]
+    number: int
+    #: bytes transferred by one operation, for throughput benchmarks
+    payload: int | None
+    #: number of operations performed by one call of `func`
+    operations: int
+
+    def run(self, repeat: int = 5) -> Result:
+        """Time the benchmark and keep the best time per operation.
+
+        The minimum is the least noisy estimate of the cost of the code itself; the slower
+        repeats measure interference of the rest of the system.
+        """
+        self.func()  # warm up
+        best = min(timeit.repeat(self.func, number=self.number, repeat=repeat))
+        return Result(self.name, best / self.number / self.operations, self.payload)
+
+
+def benchmark(
+    name: str,
+    func: Callable[[], object],
+    number: int,
+    payload: int | None = None,
+    operations: int = 1,
+) -> Benchmark:
+    """Create a `Benchmark`; `func` is not called until the benchmark is run."""
+    return Benchmark(name, func, number, payload, operations)
+
+
+@dataclass(frozen=True)
+class Result:
+    """Outcome of a single benchmark."""
+
+    __slots__ = ("name", "seconds", "payload")
+
+    name: str
+    #: best time of one operation in seconds
+    seconds: float
+    #: bytes transferred by one operation, for throughput benchmarks
+    payload: int | None
+
+    @property
+    def throughput(self) -> float | None:
+        """Bytes per second transferred, for throughput benchmarks."""
+        return None if self.payload is None else self.payload / self.seconds
+
+    def format(self) -> str:
+        line = f"{self.name:<56} {_format_time(self.seconds):>12}"
+        if self.throughput is not None:
+            line += f" {self.throughput / 2**20:10.1f} MiB/s"
+        return line
+
+
+def report(benchmarks: Iterable[Benchmark], keyword: str | None = None) -> list[Result]:
+    """Run `benchmarks` whose name contains `keyword`, printing the results as they come."""
+    results = []
+    for bench in benchmarks:
+        if keyword is not None and keyword not in bench.name:
+            continue
+        result = bench.run()
+        print(result.format(), flush=True)
+        results.append(result)
+    return results
+
+
+def _format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
@@ -0,0 +1,75 @@
+"""Run the whole benchmark suite and optionally compare the results with a baseline.
+
+Usage::
+
+    uv run python benchmarks/run.py --save baseline.json   # e.g. on the main branch
+    uv run python benchmarks/run.py --compare baseline.json  # on a branch with changes
+
+With ``--compare`` the command exits with status 1 if any benchmark got slower than the
+baseline by more than ``--threshold`` (25% by default). Only compare results obtained on the
+same machine. Use ``-k`` to run only the benchmarks whose name contains the given string.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Iterator
+
+import bench_compilation
+import bench_spawn
+import bench_throughput
+from common import Benchmark, Result, report
+
+SUITES = (bench_compilation, bench_spawn, bench_throughput)
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    for suite in SUITES:
+        yield from suite.benchmarks()
+
+
+def compare(results: list[Result], baseline: dict[str, float], threshold: float) -> bool:
+    """Print the change of every result against `baseline`; return whether none regressed."""
+    ok = True
+    print("\nChange against the baseline:")
+    for result in results:
+        if result.name not in baseline:
+            continue
+        ratio = result.seconds / baseline[result.name]
+        regressed = ratio > 1 + threshold
+        ok = ok and not regressed
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{result.name:<56} {(ratio - 1) * 100:+11.1f}%{marker}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="keyword", help="only run benchmarks containing this string")
+    parser.add_argument("--save", metavar="FILE", help="save the results to a JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="compare with results saved before")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="relative slowdown reported as a regression (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    results = report(benchmarks(), args.keyword)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({result.name: result.seconds for result in results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
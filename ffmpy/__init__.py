@@ -1,3 +1,116 @@
-from .ffmpy import FFExecutableNotFoundError, FFmpeg, FFprobe, FFRuntimeError
+from __future__ import annotations
 
-__all__ = ["FFmpeg", "FFprobe", "FFExecutableNotFoundError", "FFRuntimeError"]
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .ffmpy import (
+    FFExecutableNotFoundError,
+    FFmpeg,
+    FFprobe,
+    FFRuntimeError,
+    FFTimeoutError,
+)
+
+if TYPE_CHECKING:
+    from .capabilities import Capabilities, get_capabilities
+    from .capture import LogCapture, LogEntry, TailCapture
+    from .frames import FrameReader, FrameWriter
+    from .journal import JobQueue, JournalEntry
+    from .ladder import Ladder, Rendition
+    from .pipeline import FFPipelineError, Pipeline
+    from .pool import FFBatchError, FFmpegPool, JobResult, run_many, run_many_async
+    from .probe import FormatInfo, ProbeCache, ProbeResult, SQLiteProbeCache, StreamInfo
+    from .progress import Progress, parse_progress
+    from .segment import SegmentedTranscode
+    from .spec import CommandSpec
+    from .stats import ResourceSample, RunStats
+    from .template import FFmpegTemplate
+    from .thumbnails import Thumbnails
+
+__all__ = [
+    "FFmpeg",
+    "FFprobe",
+    "FFmpegTemplate",
+    "CommandSpec",
+    "Pipeline",
+    "SegmentedTranscode",
+    "Thumbnails",
+    "Ladder",
+    "Rendition",
+    "FrameReader",
+    "FrameWriter",
+    "FFExecutableNotFoundError",
+    "FFRuntimeError",
+    "FFTimeoutError",
+    "FFPipelineError",
+    "FFBatchError",
+    "FFmpegPool",
+    "JobResult",
+    "JobQueue",
+    "JournalEntry",
+    "ProbeResult",
+    "FormatInfo",
+    "StreamInfo",
+    "ProbeCache",
+    "SQLiteProbeCache",
+    "run_many",
+    "run_many_async",
+    "Progress",
+    "parse_progress",
+    "TailCapture",
+    "LogCapture",
+    "LogEntry",
+    "Capabilities",
+    "get_capabilities",
+    "RunStats",
+    "ResourceSample",
+]
+
+# Modules of the names not imported above; they are imported when the name is first accessed, so
+# that importing ffmpy does not pay for the features a program does not use
+_SUBMODULES = {
+    "Capabilities": "capabilities",
+    "get_capabilities": "capabilities",
+    "LogCapture": "capture",
+    "LogEntry": "capture",
+    "TailCapture": "capture",
+    "FrameReader": "frames",
+    "FrameWriter": "frames",
+    "JobQueue": "journal",
+    "JournalEntry": "journal",
+    "Ladder": "ladder",
+    "Rendition": "ladder",
+    "FFPipelineError": "pipeline",
+    "Pipeline": "pipeline",
+    "FFBatchError": "pool",
+    "FFmpegPool": "pool",
+    "JobResult": "pool",
+    "run_many": "pool",
+    "run_many_async": "pool",
+    "FormatInfo": "probe",
+    "ProbeCache": "probe",
+    "ProbeResult": "probe",
+    "SQLiteProbeCache": "probe",
+    "StreamInfo": "probe",
+    "Progress": "progress",
+    "parse_progress": "progress",
+    "SegmentedTranscode": "segment",
+    "CommandSpec": "spec",
+    "ResourceSample": "stats",
+    "RunStats": "stats",
+    "FFmpegTemplate": "template",
+    "Thumbnails": "thumbnails",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _SUBMODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import functools
+import subprocess
+
+from .capture import TailCapture
+from .ffmpy import FFmpeg, _resolve_executable
+
+
+class Capabilities:
+    """What an FFmpeg executable supports, queried once and cached.
+
+    The executable is resolved to an absolute path when the instance is created. Every other
+    property runs the executable with the respective option (e.g. ``-encoders``) the first time
+    it is accessed and caches the parsed result, so checking whether e.g. an encoder is available
+    is a set lookup afterwards:
+
+    >>> caps = get_capabilities('ffmpeg')
+    >>> 'libsvtav1' in caps.encoders
+    True
+
+    Instances are usually obtained with `get_capabilities`, which keeps one per executable.
+
+    :param str executable: name or path of the ffmpeg executable
+    :raise: `FFExecutableNotFoundError` in case the executable was not found
+    """
+
+    def __init__(self, executable: str = "ffmpeg") -> None:
+        self.executable = executable
+        #: absolute path of the executable; pass it as ``executable`` to `FFmpeg` to spare the
+        #: search of ``PATH`` when the process is started
+        self.path = _resolve_executable(executable)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self.path!r}>"
+
+    @functools.cached_property
+    def version(self) -> str:
+        """Version of FFmpeg (e.g. ``6.1.1``), as reported by ``-version``."""
+        words = self._version_output.split(maxsplit=3)
+        return words[2] if len(words) > 2 and words[1] == "version" else ""
+
+    @functools.cached_property
+    def configuration(self) -> tuple[str, ...]:
+        """Options FFmpeg was configured with when it was built (e.g. ``--enable-libx264``)."""
+        for line in self._version_output.splitlines():
+            if line.startswith("configuration:"):
+                return tuple(line[len("configuration:") :].split())
+        return ()
+
+    @functools.cached_property
+    def _version_output(self) -> str:
+        return self._query("-version")
+
+    @functools.cached_property
+    def encoders(self) -> frozenset[str]:
+        """Names of the available encoders (e.g. ``libx264``)."""
+        return _parse_listing(self._query("-encoders"))
+
+    @functools.cached_property
+    def decoders(self) -> frozenset[str]:
+        """Names of the available decoders (e.g. ``h264``)."""
+        return _parse_listing(self._query("-decoders"))
+
+    @functools.cached_property
+    def filters(self) -> frozenset[str]:
+        """Names of the available filters (e.g. ``scale``)."""
+        return _parse_listing(self._query("-filters"))
+
+    @functools.cached_property
+    def muxers(self) -> frozenset[str]:
+        """Names of the available output formats (e.g. ``mp4``)."""
+        return _parse_listing(self._query("-muxers"))
+
+    @functools.cached_property
+    def demuxers(self) -> frozenset[str]:
+        """Names of the available input formats (e.g. ``mov``)."""
+        return _parse_listing(self._query("-demuxers"))
+
+    @functools.cached_property
+    def pix_fmts(self) -> frozenset[str]:
+        """Names of the available pixel formats (e.g. ``yuv420p``)."""
+        return _parse_listing(self._query("-pix_fmts"))
+
+    @functools.cached_property
+    def hwaccels(self) -> frozenset[str]:
+        """Names of the available hardware acceleration methods (e.g. ``cuda``)."""
+        lines = self._query("-hwaccels").splitlines()[1:]
+        return frozenset(line.strip() for line in lines if line.strip())
+
+    def _query(self, option: str) -> str:
+        """Run the executable with `option` and return its output."""
+        ff = FFmpeg(executable=self.path, global_options=["-hide_banner", option])
+        stdout, _ = ff.run(stdout=subprocess.PIPE, stderr=TailCapture())
+        return (stdout or b"").decode(errors="replace")
+
+
+@functools.lru_cache(maxsize=None)
+def get_capabilities(executable: str = "ffmpeg") -> Capabilities:
+    """Return the `Capabilities` of `executable`, creating them on the first call.
+
+    The result is cached for the lifetime of the process; call ``get_capabilities.cache_clear()``
+    after the installed FFmpeg has changed.
+
+    :param str executable: name or path of the ffmpeg executable
+    :rtype: Capabilities
+    :raise: `FFExecutableNotFoundError` in case the executable was not found
+    """
+    return Capabilities(executable)
+
+
+def _parse_listing(output: str) -> frozenset[str]:
+    """Parse the names out of the output of ``-encoders``, ``-filters``, ``-muxers`` etc.
+
+    The listings start with a legend of the flags (``V..... = Video``), which is followed by a
+    line of dashes in most of them, and list one item per line as flags, name and description.
+    Names of formats may list several aliases separated with commas (``mov,mp4,m4a``).
+    """
+    lines = output.splitlines()
+    dashes = [index for index, line in enumerate(lines) if line.strip() and not line.strip("- ")]
+    if dashes:
+        lines = lines[dashes[-1] + 1 :]
+
+    names = set()
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 2 or parts[1] == "=":
+            # The header or a line of the legend
+            continue
+        names.update(parts[1].split(","))
+    return frozenset(names)
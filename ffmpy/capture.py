@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import collections
+import logging
+import re
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+from .ffmpy import _FrozenSlots
+
+#: FFmpeg log levels, as printed with the ``level`` flag of ``-loglevel``, and the `logging`
+#: levels `LogCapture` logs them at
+LOG_LEVELS: Mapping[str, int] = {
+    "panic": logging.CRITICAL,
+    "fatal": logging.CRITICAL,
+    "error": logging.ERROR,
+    "warning": logging.WARNING,
+    "info": logging.INFO,
+    "verbose": logging.DEBUG,
+    "debug": logging.DEBUG,
+    "trace": logging.DEBUG,
+}
+
+# A line of FFmpeg log, e.g. "[h264 @ 0x55d5c8a0] [error] concealing errors", both prefixes
+# being optional
+_LOG_LINE = re.compile(
+    r"(?:\[(?P<component>[^\[\]]+?) @ 0x[0-9a-fA-F]+\] )?"
+    rf"(?:\[(?P<level>{'|'.join(LOG_LEVELS)})\] )?"
+    r"(?P<message>.*)",
+    re.DOTALL,
+)
+# Longest incomplete line kept by `_LogBuffer` before it is parsed as it is
+_MAX_LINE = 64 * 1024
+# Options selecting the log level, -loglevel taking precedence over -v
+_LOGLEVEL_OPTIONS = ("-loglevel", "-v")
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TailCapture(_FrozenSlots):
+    """Capture only the tail of FFmpeg ``stderr``.
+
+    Pass an instance of this class as ``stderr`` to `FFmpeg.run`, `FFmpeg.stream` or
+    `FFmpeg.run_async` to have ``stderr`` drained continuously while FFmpeg is running, retaining
+    only its last ``max_bytes`` bytes and/or last ``max_lines`` lines. The retained tail is what
+    ends up in the return value and in `FFRuntimeError`, so memory used per run is bounded
+    regardless of how long FFmpeg runs or how verbose it is. Both ``\\n`` and ``\\r`` (used by
+    FFmpeg to update its statistics line) are treated as line endings.
+
+    The instance only describes the capture and holds no state, so it can be shared between runs.
+
+    :param int max_bytes: maximum number of bytes to retain; `None` means no byte limit
+    :param int max_lines: maximum number of lines to retain; `None` means no line limit
+    """
+
+    __slots__ = ("max_bytes", "max_lines")
+
+    max_bytes: int | None
+    max_lines: int | None
+
+    def __init__(self, max_bytes: int | None = 64 * 1024, max_lines: int | None = None) -> None:
+        if max_bytes is None and max_lines is None:
+            raise ValueError("At least one of max_bytes and max_lines must be specified")
+        object.__setattr__(self, "max_bytes", max_bytes)
+        object.__setattr__(self, "max_lines", max_lines)
+
+    def _buffer(self) -> _RingBuffer:
+        """Create the buffer capturing ``stderr`` of a single run."""
+        return _RingBuffer(self)
+
+
+@dataclass(frozen=True)
+class LogEntry(_FrozenSlots):
+    """A line FFmpeg logged to ``stderr``, parsed by `LogCapture`."""
+
+    __slots__ = ("level", "component", "message")
+
+    #: FFmpeg log level of the line (e.g. ``warning``), if it is prefixed with one
+    level: str | None
+    #: name of the component that logged the line (e.g. ``h264``), if any
+    component: str | None
+    #: the text of the line without the prefixes
+    message: str
+
+    @classmethod
+    def parse(cls, line: str) -> LogEntry:
+        """Parse a line of FFmpeg log (without the line ending)."""
+        match = _LOG_LINE.match(line)
+        assert match is not None  # Every line matches
+        return cls(match["level"], match["component"], match["message"])
+
+
+@dataclass(frozen=True)
+class LogCapture(TailCapture):
+    """Parse FFmpeg ``stderr`` line by line while FFmpeg is running and route it to `logging`.
+
+    A `TailCapture` which in addition to retaining the tail of ``stderr`` splits it into lines as
+    it is read, parses every line into a `LogEntry` and passes it to ``logger`` and ``on_entry``,
+    so problems such as decoding errors can be noticed while the job is still running. Unless
+    ``print_levels`` is `False`, the ``repeat`` and ``level`` flags are added to the value of
+    ``-v`` or ``-loglevel`` (or ``-loglevel +repeat+level`` is added if the command has neither),
+    which prefixes every line with its level and stops FFmpeg from collapsing repeated lines,
+    without changing the selected level.
+
+    Lines are logged at the `logging` level corresponding to their FFmpeg level (see
+    `LOG_LEVELS`), lines without a level at ``INFO``; the FFmpeg level and component are
+    available as ``ffmpeg_level`` and ``ffmpeg_component`` attributes of the log records. The
+    number of lines logged at every FFmpeg level is counted per run in ``log_counts`` of
+    `RunStats`:
+
+    >>> ff.run(stderr=LogCapture('transcode'))
+    >>> ff.stats.log_counts
+    {'info': 23, 'error': 2}
+
+    ``on_entry`` is called from the thread (or event loop) reading ``stderr``. An exception it
+    raises is logged and the callable is not called again for the run, as ``stderr`` must be
+    drained for FFmpeg to continue.
+
+    :param logger: a `logging.Logger`, or its name, to log the lines to; `None` disables logging
+    :param on_entry: a callable to be called with every `LogEntry`
+    :param bool print_levels: whether to make FFmpeg prefix the lines with their level
+    :param int max_bytes: maximum number of bytes of the tail to retain (see `TailCapture`)
+    :param int max_lines: maximum number of lines of the tail to retain (see `TailCapture`)
+    """
+
+    __slots__ = ("logger", "on_entry", "print_levels")
+
+    logger: logging.Logger | None
+    on_entry: Callable[[LogEntry], object] | None
+    print_levels: bool
+
+    def __init__(
+        self,
+        logger: logging.Logger | str | None = "ffmpy",
+        on_entry: Callable[[LogEntry], object] | None = None,
+        print_levels: bool = True,
+        max_bytes: int | None = 64 * 1024,
+        max_lines: int | None = None,
+    ) -> None:
+        super().__init__(max_bytes, max_lines)
+        if isinstance(logger, str):
+            logger = logging.getLogger(logger)
+        object.__setattr__(self, "logger", logger)
+        object.__setattr__(self, "on_entry", on_entry)
+        object.__setattr__(self, "print_levels", print_levels)
+
+    def _buffer(self) -> _LogBuffer:
+        return _LogBuffer(self)
+
+
+class _RingBuffer:
+    """Bounded buffer retaining the tail of the data written to it, as described by `TailCapture`.
+
+    Data is kept as a deque of lines (the last one possibly incomplete), so that dropping the
+    oldest data never requires copying the retained tail.
+    """
+
+    __slots__ = ("max_bytes", "max_lines", "total_bytes", "_lines", "_size")
+
+    def __init__(self, capture: TailCapture) -> None:
+        self.max_bytes = capture.max_bytes
+        self.max_lines = capture.max_lines
+        self.total_bytes = 0
+        self._lines: collections.deque[bytes] = collections.deque()
+        self._size = 0
+
+    def command(self, cmd: list[str]) -> list[str]:
+        """Return `cmd` with the options the capture needs FFmpeg to be run with."""
+        return cmd
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self.total_bytes += len(data)
+
+        lines = data.splitlines(keepends=True)
+        if self._lines and not self._lines[-1].endswith((b"\n", b"\r")):
+            lines[0] = self._lines.pop() + lines[0]
+
+        self._lines.extend(lines)
+        self._size += len(data)
+        self._trim()
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._lines)
+
+    def _trim(self) -> None:
+        if self.max_lines is not None:
+            while len(self._lines) > self.max_lines:
+                self._size -= len(self._lines.popleft())
+
+        if self.max_bytes is not None:
+            while self._size > self.max_bytes:
+                excess = self._size - self.max_bytes
+                first = self._lines[0]
+                if len(first) <= excess:
+                    self._lines.popleft()
+                    self._size -= len(first)
+                else:
+                    self._lines[0] = first[excess:]
+                    self._size -= excess
+
+
+class _LogBuffer(_RingBuffer):
+    """`_RingBuffer` also parsing every complete line written to it, as described by `LogCapture`.
+
+    Lines are parsed and dispatched in `write`; an incomplete line at the end of the output is
+    parsed by `flush`. ``counts`` holds the number of lines per FFmpeg level.
+    """
+
+    __slots__ = ("capture", "counts", "_on_entry", "_partial")
+
+    def __init__(self, capture: LogCapture) -> None:
+        super().__init__(capture)
+        self.capture = capture
+        self.counts: collections.Counter[str] = collections.Counter()
+        self._on_entry = capture.on_entry
+        self._partial = b""
+
+    def command(self, cmd: list[str]) -> list[str]:
+        if not self.capture.print_levels:
+            return cmd
+        positions = [i for i in range(1, len(cmd) - 1) if cmd[i] in _LOGLEVEL_OPTIONS]
+        if not positions:
+            return [cmd[0], "-loglevel", "+repeat+level", *cmd[1:]]
+
+        # FFmpeg selects the level with the first -loglevel (or the first -v) before parsing the
+        # other options, so every occurrence is rewritten rather than another one added
+        cmd = cmd.copy()
+        for i in positions:
+            value = cmd[i + 1]
+            cmd[i + 1] = "repeat+level" + ("" if value.startswith(("+", "-")) else "+") + value
+        return cmd
+
+    def write(self, data: bytes) -> None:
+        super().write(data)
+        lines = (self._partial + data).splitlines(keepends=True)
+        self._partial = b""
+        if lines and not lines[-1].endswith((b"\n", b"\r")):
+            self._partial = lines.pop()
+        for line in lines:
+            self._emit(line)
+        if len(self._partial) > _MAX_LINE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Parse the incomplete line written last, if any."""
+        if self._partial:
+            self._emit(self._partial)
+            self._partial = b""
+
+    def _emit(self, line: bytes) -> None:
+        text = line.decode(errors="replace").rstrip("\r\n")
+        if not text.strip():
+            return
+        entry = LogEntry.parse(text)
+        if entry.level is not None:
+            self.counts[entry.level] += 1
+
+        log = self.capture.logger
+        level = LOG_LEVELS.get(entry.level or "info", logging.INFO)
+        if log is not None and log.isEnabledFor(level):
+            extra = {"ffmpeg_level": entry.level, "ffmpeg_component": entry.component}
+            if entry.component is None:
+                log.log(level, "%s", entry.message, extra=extra)
+            else:
+                log.log(level, "[%s] %s", entry.component, entry.message, extra=extra)
+
+        if self._on_entry is not None:
+            try:
+                self._on_entry(entry)
+            except Exception:
+                self._on_entry = None
+                _logger.exception("on_entry of LogCapture failed, it is not called again")
+
+
+def _log_counts(tail: _RingBuffer | None) -> dict[str, int] | None:
+    """Return the number of lines per level parsed by `tail`, if it is a `_LogBuffer`."""
+    if not isinstance(tail, _LogBuffer):
+        return None
+    tail.flush()
+    return dict(tail.counts)
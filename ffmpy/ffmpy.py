@@ -1,19 +1,89 @@
 from __future__ import annotations
 
+import contextlib
 import errno
+import functools
 import itertools
+import os
 import shlex
+import shutil
 import subprocess
-from typing import IO, Any, Mapping, Sequence
+import threading
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Sequence,
+    TypeVar,
+    Union,
+)
 
-try:
-    from psutil import Popen  # noqa: F401
+from .watchdog import DEFAULT_GRACE_PERIOD, _Watchdog
 
-    popen: type[subprocess.Popen | Popen]
-except ImportError:
-    popen = subprocess.Popen
-else:
-    popen = Popen
+if TYPE_CHECKING:
+    import asyncio
+
+    from psutil import Popen
+
+    from .capture import TailCapture, _RingBuffer
+    from .pipeline import Pipeline
+    from .probe import BaseProbeCache, ProbeKey, ProbeResult
+    from .progress import Progress, _ProgressPipe
+    from .spec import CommandSpec
+    from .spill import _Spill
+    from .stats import RunStats, _StatsRecorder
+
+# The modules implementing the optional features (capturing stderr, progress, probing, spilling,
+# resource accounting) are imported by the methods using them, so that importing ffmpy stays cheap
+
+#: class the processes are started with: `psutil.Popen` if psutil is installed, otherwise
+#: `subprocess.Popen`; resolved by `_popen_class` on the first run, so that importing ffmpy does
+#: not import psutil
+popen: type[subprocess.Popen | Popen] | None = None
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Per-thread callable `FFmpeg._popen` passes every process it starts to, set by `FFmpegPool.run`
+# in its workers to learn about the process of the job a worker is running
+_spawn_listener = threading.local()
+
+# Inputs FFmpeg reads from its stdin
+_STDIN_INPUTS = ("-", "pipe:", "pipe:0")
+
+InputData = Union[bytes, IO[bytes], Iterable[bytes], None]
+# Data of an input pipe, or a writable file object or a callable receiving chunks of an output
+PipeData = Union[bytes, IO[bytes], Iterable[bytes], Callable[[bytes], object]]
+
+_T = TypeVar("_T")
+
+
+class _FrozenSlots:
+    """Base of the frozen dataclasses with ``__slots__`` that can be pickled.
+
+    Unpickling restores the slots with ``setattr``, which a frozen dataclass does not allow, so
+    the state is the values of all the slots, set back with `object.__setattr__`.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+        }
+
+    def __setstate__(self, state: Mapping[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
 
 
 class FFmpeg:
@@ -54,39 +124,154 @@ class FFmpeg:
             corresponding options (either as a list of strings or a single space separated string) as
             values
         """
-        self.executable = executable
-        self._cmd = [executable]
-        self._cmd += _normalize_options(global_options, split_mixed=True)
+        cmd = [executable]
+        cmd += _normalize_options(global_options, split_mixed=True)
 
         if inputs is not None:
-            self._cmd += _merge_args_opts(inputs, add_minus_i_option=True)
+            cmd += _merge_args_opts(inputs, add_minus_i_option=True)
 
         if outputs is not None:
-            self._cmd += _merge_args_opts(outputs)
+            cmd += _merge_args_opts(outputs)
+
+        self._init(cmd)
 
-        self.cmd = subprocess.list2cmdline(self._cmd)
-        self.process: subprocess.Popen | Popen | None = None
+    def _init(self, cmd: list[str]) -> None:
+        """Initialize the instance to execute the compiled command line `cmd`."""
+        self.executable = cmd[0]
+        self._cmd = cmd
+        self.process: subprocess.Popen | Popen | asyncio.subprocess.Process | None = None
+        self.stats: RunStats | None = None
+
+    @classmethod
+    def _from_cmd(cls, cmd: list[str]) -> FFmpeg:
+        """Create an instance executing the already compiled command line `cmd`."""
+        ff = cls.__new__(cls)
+        ff._init(cmd)
+        return ff
+
+    @classmethod
+    def from_spec(cls, spec: CommandSpec) -> FFmpeg:
+        """Create an instance executing the command line described by ``spec``.
+
+        :param CommandSpec spec: the command line, e.g. received from another process
+        :return: a new instance
+        :rtype: FFmpeg
+        """
+        return cls._from_cmd(spec.argv)
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__!r} {self.cmd!r}>"
 
+    @functools.cached_property
+    def cmd(self) -> str:
+        """The command line as a single string, built when it is first needed."""
+        return subprocess.list2cmdline(self._cmd)
+
+    @property
+    def spec(self) -> CommandSpec:
+        """Immutable, picklable `CommandSpec` of the command line, without the execution state."""
+        from .spec import CommandSpec
+
+        return CommandSpec(self.executable, tuple(self._cmd[1:]))
+
+    def pipe_to(self, other: FFmpeg | Pipeline) -> Pipeline:
+        """Return a `Pipeline` feeding ``stdout`` of this command into ``stdin`` of ``other``.
+
+        FFmpeg must write its output to ``pipe:1`` and ``other`` read its input from ``pipe:0``.
+        The commands are connected with an OS pipe, so the data never passes through Python.
+
+        :param other: an `FFmpeg` (or `FFprobe`) instance or a `Pipeline`
+        :return: a new `Pipeline`
+        :rtype: Pipeline
+        """
+        from .pipeline import Pipeline
+
+        return Pipeline([self]).pipe_to(other)
+
     def run(
         self,
-        input_data: bytes | None = None,
+        input_data: InputData = None,
         stdout: IO | int | None = None,
-        stderr: IO | int | None = None,
+        stderr: IO | int | TailCapture | None = None,
         env: Mapping[str, str] | None = None,
+        on_progress: Callable[[Progress], object] | None = None,
+        timeout: float | None = None,
+        stall_timeout: float | None = None,
+        grace_period: float = DEFAULT_GRACE_PERIOD,
+        sample_interval: float | None = None,
+        pipes: Mapping[str, PipeData] | None = None,
+        fast_spawn: bool = False,
+        spill_threshold: int | None = None,
+        spill_concat: bool = False,
         **kwargs: Any,
     ) -> tuple[bytes | None, bytes | None]:
         """Execute FFmpeg command line.
 
         ``input_data`` can contain input for FFmpeg in case ``pipe`` protocol is used for input.
-        ``stdout`` and ``stderr`` specify where to redirect the ``stdout`` and ``stderr`` of the
-        process. By default no redirection is done, which means all output goes to running shell
+        It can be either a single `bytes` object, a binary file-like object or an iterable of
+        `bytes` chunks; the latter two are written to ``stdin`` incrementally as FFmpeg consumes
+        them, so the input never has to be loaded into memory as a whole. ``stdout`` and
+        ``stderr`` specify where to redirect the ``stdout`` and ``stderr`` of the process. By
+        default no redirection is done, which means all output goes to running shell
         (this mode should normally only be used for debugging purposes). If FFmpeg ``pipe`` protocol
         is used for output, ``stdout`` must be redirected to a pipe by passing `subprocess.PIPE` as
         ``stdout`` argument. You can pass custom environment to ffmpeg process with ``env``.
 
+        Redirecting ``stderr`` to `subprocess.PIPE` keeps everything FFmpeg logs in memory until
+        the process exits. For long running jobs pass a `TailCapture` as ``stderr`` instead: the
+        ``stderr`` is then drained while FFmpeg is running and only its tail is retained and
+        returned (or attached to `FFRuntimeError`).
+
+        If ``on_progress`` callback is given, FFmpeg is instructed to write its progress reports
+        (see ``-progress`` option) to a dedicated pipe, and the callback is called with a
+        `Progress` object for every report while FFmpeg is running. An exception raised by the
+        callback kills the process and is propagated to the caller. This requires a POSIX system,
+        as the pipe is passed to FFmpeg with ``pass_fds``.
+
+        A run exceeding ``timeout`` seconds, or making no progress for ``stall_timeout`` seconds,
+        is stopped and `FFTimeoutError` is raised. Progress means output read from ``stdout`` or
+        ``stderr`` pipes (e.g. the statistics FFmpeg keeps writing to ``stderr`` captured by
+        `TailCapture`) or a report passed to ``on_progress``. The process is first asked to quit
+        by sending ``q`` to its ``stdin``, which lets FFmpeg finalize the output files; for that
+        ``stdin`` is kept open until the process exits. This step is skipped, and ``stdin``
+        closed right away, if FFmpeg does not read commands from it: when ``input_data`` is
+        given, ``stdin`` is an input (e.g. ``-i pipe:0``) or ``-nostdin`` is used. If the process
+        is still running ``grace_period`` seconds later it is terminated with SIGTERM and after
+        another ``grace_period`` seconds killed with SIGKILL.
+
+        Once the process has exited, the resources it used (wall-clock and CPU time, peak memory,
+        bytes written to ``stdin`` and read from ``stdout`` and ``stderr``) are available as
+        `RunStats` in ``stats`` attribute, also when the run fails. If ``sample_interval`` is
+        given and `psutil <https://github.com/giampaolo/psutil>`_ is installed, CPU time and
+        memory of the running process are additionally sampled every ``sample_interval`` seconds.
+
+        Inputs and outputs other than ``stdin`` and ``stdout`` can be connected to pipes too: an
+        input or output named ``pipe:NAME`` in the command line (e.g. ``pipe:audio``) is replaced
+        with an extra pipe passed to FFmpeg with ``pass_fds`` if ``NAME`` is a key of ``pipes``.
+        The value of an input is the data to write to the pipe, of the same types as
+        ``input_data``; the value of an output is a binary file object or a callable the data
+        read from the pipe is written or passed to chunk by chunk. All the pipes are written and
+        read concurrently in background threads. This requires a POSIX system.
+
+        By default the process is started with `psutil.Popen` if psutil is installed, so that
+        ``process`` attribute offers its methods. For many short runs (e.g. probing thousands of
+        files) ``fast_spawn`` reduces the cost of starting the process: it is started with
+        `subprocess.Popen` unless ``sample_interval`` is given, and the executable is looked up in
+        ``PATH`` once and started by its absolute path afterwards.
+
+        The length of a single command line argument and of the whole command line is limited by
+        the operating system (e.g. to 128 KiB and 2 MiB on Linux). With ``spill_threshold``, filter
+        graphs (``-filter_complex``, ``-vf``, ``-af`` and ``-filter``) longer than
+        ``spill_threshold`` bytes are written to temporary files passed to FFmpeg with the
+        respective ``-filter_complex_script`` or ``-filter_script`` option. The files are removed
+        once the process has exited; ``cmd`` keeps the original command line. Every argument is
+        checked on its own, so many short arguments (e.g. thousands of separate ``-i`` inputs) are
+        never moved. With ``spill_concat``, oversized ``concat:`` protocol inputs are also replaced
+        with list files read by the concat demuxer (``-f concat -safe 0``). Unlike a script, a list
+        is not equivalent to the input it replaces: the protocol joins the bytes of the files
+        (which works e.g. for MPEG-TS segments), while the demuxer opens every file on its own and
+        requires them to have the same streams.
+
         Returns a 2-tuple containing ``stdout`` and ``stderr`` of the process. If there was no
         redirection or if the output was redirected to e.g. `os.devnull`, the value returned will
         be a tuple of two `None` values, otherwise it will contain the actual ``stdout`` and
@@ -94,36 +279,383 @@ class FFmpeg:
 
         More info about ``pipe`` protocol `here <https://ffmpeg.org/ffmpeg-protocols.html#pipe>`_.
 
-        :param str input_data: input data for FFmpeg to deal with (audio, video etc.) as bytes (e.g.
-            the result of reading a file in binary mode)
+        :param input_data: input data for FFmpeg to deal with (audio, video etc.) as bytes (e.g.
+            the result of reading a file in binary mode), a file object opened in binary mode or an
+            iterable of bytes chunks
         :param stdout: redirect FFmpeg ``stdout`` there (default is `None` which means no
             redirection)
         :param stderr: redirect FFmpeg ``stderr`` there (default is `None` which means no
-            redirection)
+            redirection); a `TailCapture` retains only the tail of ``stderr``
         :param env: custom environment for ffmpeg process
+        :param on_progress: a callable to be called with every `Progress` report
+        :param float timeout: maximum number of seconds the process may run; by default unlimited
+        :param float stall_timeout: maximum number of seconds the process may run without making
+            progress; by default unlimited
+        :param float grace_period: number of seconds to wait for the process to exit after each
+            step of stopping it
+        :param float sample_interval: number of seconds between samples of the resource usage of
+            the running process; by default no samples are taken
+        :param dict pipes: data of ``pipe:NAME`` inputs and destinations of ``pipe:NAME`` outputs
+            by their ``NAME``
+        :param bool fast_spawn: start the process with as little overhead as possible
+        :param int spill_threshold: length in bytes above which filter graphs are moved to
+            temporary files; by default they are never moved
+        :param bool spill_concat: whether to also move ``concat:`` inputs longer than
+            ``spill_threshold`` to concat demuxer lists
         :param kwargs: any other keyword arguments to be forwarded to `subprocess.Popen
             <https://docs.python.org/3/library/subprocess.html#subprocess.Popen>`_
         :return: a 2-tuple containing ``stdout`` and ``stderr`` of the process
         :rtype: tuple
         :raise: `FFRuntimeError` in case FFmpeg command exits with a non-zero code;
-            `FFExecutableNotFoundError` in case the executable path passed was not valid
+            `FFTimeoutError` in case the process exceeded ``timeout`` or ``stall_timeout``;
+            `FFExecutableNotFoundError` in case the executable path passed was not valid;
+            `ValueError` in case a name in ``pipes`` is not used in the command line
         """
+        from .stats import _communicate as _communicate_with_stats
+
+        watchdog = _Watchdog(
+            timeout, stall_timeout, grace_period, input_data is None and self._reads_commands()
+        )
+        attachments = _Attachments(
+            self,
+            watchdog.wrap(on_progress),
+            pipes,
+            stderr,
+            spill_threshold,
+            spill_concat,
+            kwargs.get("cwd"),
+        )
+        self.process = attachments.popen(
+            fast_spawn=fast_spawn,
+            sample_interval=sample_interval,
+            stdin=subprocess.PIPE,
+            stdout=stdout,
+            env=env,
+            **kwargs,
+        )
+        watchdog.start(self.process)
+
+        stderr_tail, recorder = attachments.stderr_tail, attachments.recorder
         try:
-            self.process = popen(
-                self._cmd, stdin=subprocess.PIPE, stdout=stdout, stderr=stderr, env=env, **kwargs
-            )
-        except OSError as e:
-            if e.errno == errno.ENOENT:
-                raise FFExecutableNotFoundError(f"Executable '{self.executable}' not found")
+            if not watchdog.enabled and stderr_tail is None and input_data is None:
+                o_stdout, o_stderr = _communicate_with_stats(self.process, recorder)
             else:
-                raise
+                o_stdout, o_stderr = _communicate(
+                    self.process, input_data, stderr_tail, watchdog, recorder
+                )
+        finally:
+            watchdog.stop()
+            attachments.join()
 
-        o_stdout, o_stderr = self.process.communicate(input=input_data)
+        attachments.finish(_len(o_stdout), _len(o_stderr))
+        attachments.raise_error()
+        if watchdog.reason is not None:
+            raise FFTimeoutError(
+                self.cmd,
+                self.process.returncode,
+                o_stdout,
+                o_stderr,
+                watchdog.reason,
+                watchdog.limit,
+            )
         if self.process.returncode != 0:
             raise FFRuntimeError(self.cmd, self.process.returncode, o_stdout, o_stderr)
 
         return o_stdout, o_stderr
 
+    def stream(
+        self,
+        input_data: InputData = None,
+        stderr: IO | int | TailCapture | None = None,
+        env: Mapping[str, str] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        on_progress: Callable[[Progress], object] | None = None,
+        pipes: Mapping[str, PipeData] | None = None,
+        fast_spawn: bool = False,
+        spill_threshold: int | None = None,
+        spill_concat: bool = False,
+        **kwargs: Any,
+    ) -> Generator[bytes, None, None]:
+        """Execute FFmpeg command line and iterate over its ``stdout`` as it is produced.
+
+        Unlike `FFmpeg.run`, which buffers the whole output in memory before returning it, this
+        generator yields chunks of at most ``chunk_size`` bytes as soon as FFmpeg writes them to
+        ``stdout``, so the output of the ``pipe`` protocol can be forwarded elsewhere with constant
+        memory. ``input_data`` is written to ``stdin`` and ``stderr`` (if redirected to
+        `subprocess.PIPE`) is drained in background threads while the output is being consumed.
+
+        The process is started when the first chunk is requested. If the generator is closed
+        before the output is exhausted, the FFmpeg process is killed.
+
+        :param input_data: input data for FFmpeg to deal with (audio, video etc.) as bytes, a file
+            object opened in binary mode or an iterable of bytes chunks
+        :param stderr: redirect FFmpeg ``stderr`` there (default is `None` which means no
+            redirection); if `subprocess.PIPE` or a `TailCapture` is used, ``stderr`` (or its
+            tail) is collected for the `FFRuntimeError`
+        :param env: custom environment for ffmpeg process
+        :param int chunk_size: maximum size of a yielded chunk in bytes
+        :param on_progress: a callable to be called with every `Progress` report (see
+            `FFmpeg.run`)
+        :param dict pipes: data of ``pipe:NAME`` inputs and destinations of ``pipe:NAME`` outputs
+            by their ``NAME`` (see `FFmpeg.run`)
+        :param bool fast_spawn: start the process with as little overhead as possible (see
+            `FFmpeg.run`)
+        :param int spill_threshold: length in bytes above which filter graphs are moved to
+            temporary files (see `FFmpeg.run`)
+        :param bool spill_concat: whether to also move oversized ``concat:`` inputs to concat
+            demuxer lists (see `FFmpeg.run`)
+        :param kwargs: any other keyword arguments to be forwarded to `subprocess.Popen
+            <https://docs.python.org/3/library/subprocess.html#subprocess.Popen>`_
+        :return: an iterator over ``stdout`` chunks
+        :rtype: iterator
+        :raise: `FFRuntimeError` in case FFmpeg command exits with a non-zero code;
+            `FFExecutableNotFoundError` in case the executable path passed was not valid
+        """
+        return self._stream(
+            functools.partial(_iter_chunks, chunk_size=chunk_size),
+            input_data,
+            stderr,
+            env,
+            on_progress,
+            pipes,
+            spill_threshold,
+            spill_concat,
+            fast_spawn=fast_spawn,
+            **kwargs,
+        )
+
+    def _stream(
+        self,
+        read: Callable[[IO[bytes]], Iterator[_T]],
+        input_data: InputData,
+        stderr: IO | int | TailCapture | None,
+        env: Mapping[str, str] | None,
+        on_progress: Callable[[Progress], object] | None,
+        pipes: Mapping[str, PipeData] | None,
+        spill_threshold: int | None = None,
+        spill_concat: bool = False,
+        **kwargs: Any,
+    ) -> Generator[_T, None, None]:
+        """Run FFmpeg with ``stdout`` redirected to a pipe and yield what `read` makes of it.
+
+        This implements `FFmpeg.stream`, where `read` splits ``stdout`` into chunks of bytes, and
+        can be used with other ways of reading ``stdout`` (e.g. into preallocated buffers).
+        """
+        from .stats import _wait
+
+        attachments = _Attachments(
+            self, on_progress, pipes, stderr, spill_threshold, spill_concat, kwargs.get("cwd")
+        )
+        process = attachments.popen(stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, **kwargs)
+
+        stderr_tail, recorder = attachments.stderr_tail, attachments.recorder
+        stderr_chunks: list[bytes] = []
+        stderr_sink = stderr_chunks.append if stderr_tail is None else stderr_tail.write
+        input_errors: list[BaseException] = []
+        threads = [_start_thread(_write_input, process, input_data, input_errors, recorder)]
+        if process.stderr is not None:
+            threads.append(_start_thread(_read_into, process.stderr, stderr_sink))
+
+        assert process.stdout is not None
+        stdout_bytes = 0
+        try:
+            for item in read(process.stdout):
+                stdout_bytes += _nbytes(item)
+                yield item
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            _wait(process, recorder)
+            for thread in threads:
+                thread.join()
+            attachments.join()
+            stderr_bytes = None if process.stderr is None else sum(map(len, stderr_chunks))
+            attachments.finish(stdout_bytes, stderr_bytes)
+
+        if input_errors:
+            raise input_errors[0]
+        attachments.raise_error()
+
+        if process.returncode != 0:
+            o_stderr: bytes | None = None
+            if stderr_tail is not None:
+                o_stderr = stderr_tail.getvalue()
+            elif process.stderr is not None:
+                o_stderr = b"".join(stderr_chunks)
+            raise FFRuntimeError(self.cmd, process.returncode, None, o_stderr)
+
+    def _popen(
+        self,
+        progress: _ProgressPipe,
+        extra_pipes: _ExtraPipes | None = None,
+        stderr_tail: _RingBuffer | None = None,
+        spill: _Spill | None = None,
+        fast_spawn: bool = False,
+        sample_interval: float | None = None,
+        **kwargs: Any,
+    ) -> subprocess.Popen | Popen:
+        """Start the FFmpeg process, wiring ``progress``, extra pipes, the capture of ``stderr``
+        and the files of oversized arguments into the command line.
+
+        With ``fast_spawn`` the process is started by the absolute path of the executable and
+        with `subprocess.Popen`, unless ``sample_interval`` requires `psutil.Popen`.
+        """
+        if extra_pipes is None:
+            extra_pipes = _ExtraPipes(None)
+        if spill is None:
+            from .spill import _Spill
+
+            spill = _Spill(None)
+        process: subprocess.Popen | Popen
+        with _spawning(self.executable, progress, extra_pipes, spill):
+            cmd = self._command(progress, extra_pipes, stderr_tail, spill)
+            kwargs = extra_pipes.popen_kwargs(progress.popen_kwargs(kwargs))
+            if fast_spawn and not os.path.dirname(cmd[0]):
+                # A path is left to Popen, which resolves a relative one against ``cwd``
+                cmd = [_resolve_executable(cmd[0], kwargs.get("env")), *cmd[1:]]
+            if fast_spawn and sample_interval is None:
+                process = subprocess.Popen(cmd, **kwargs)
+            else:
+                process = _popen_class()(cmd, **kwargs)
+
+        on_spawn = getattr(_spawn_listener, "callback", None)
+        if on_spawn is not None:
+            on_spawn(process)
+        return process
+
+    def _reads_commands(self) -> bool:
+        """Whether the process reads commands such as ``q`` from ``stdin``, which is the case
+        unless ``-nostdin`` is given or ``stdin`` is one of the inputs."""
+        if "-nostdin" in self._cmd:
+            return False
+        return not any(
+            option == "-i" and value in _STDIN_INPUTS
+            for option, value in zip(self._cmd, self._cmd[1:])
+        )
+
+    def _command(
+        self,
+        progress: _ProgressPipe,
+        extra_pipes: _ExtraPipes,
+        stderr_tail: _RingBuffer | None,
+        spill: _Spill | None = None,
+    ) -> list[str]:
+        """Return the command line to start the process with."""
+        cmd = self._cmd if spill is None else spill.command(self._cmd)
+        cmd = cmd if stderr_tail is None else stderr_tail.command(cmd)
+        return extra_pipes.command(progress.command(cmd))
+
+    async def run_async(
+        self,
+        input_data: InputData | AsyncIterable[bytes] = None,
+        stdout: IO | int | None = None,
+        stderr: IO | int | TailCapture | None = None,
+        env: Mapping[str, str] | None = None,
+        on_progress: Callable[[Progress], object] | None = None,
+        timeout: float | None = None,
+        stall_timeout: float | None = None,
+        grace_period: float = DEFAULT_GRACE_PERIOD,
+        pipes: Mapping[str, PipeData] | None = None,
+        spill_threshold: int | None = None,
+        spill_concat: bool = False,
+        **kwargs: Any,
+    ) -> tuple[bytes | None, bytes | None]:
+        """Execute FFmpeg command line asynchronously.
+
+        This is a coroutine counterpart of `FFmpeg.run` built on `asyncio.create_subprocess_exec
+        <https://docs.python.org/3/library/asyncio-subprocess.html>`_. It accepts the same
+        arguments, returns the same 2-tuple and raises the same exceptions, but does not block the
+        event loop while the process is running, which allows a single loop to drive many FFmpeg
+        processes concurrently. In addition to the input types supported by `FFmpeg.run`,
+        ``input_data`` can be an asynchronous iterable of `bytes` chunks; every chunk is written
+        only after FFmpeg has consumed enough of the previous ones.
+
+        If the task running the coroutine is cancelled, the FFmpeg process is killed and waited
+        for before `asyncio.CancelledError` is propagated.
+
+        :param input_data: input data for FFmpeg to deal with (audio, video etc.) as bytes, a file
+            object opened in binary mode, or a synchronous or asynchronous iterable of bytes chunks
+        :param stdout: redirect FFmpeg ``stdout`` there (default is `None` which means no
+            redirection)
+        :param stderr: redirect FFmpeg ``stderr`` there (default is `None` which means no
+            redirection); a `TailCapture` retains only the tail of ``stderr``
+        :param env: custom environment for ffmpeg process
+        :param on_progress: a callable to be called with every `Progress` report (see
+            `FFmpeg.run`); it is called from the event loop
+        :param float timeout: maximum number of seconds the process may run (see `FFmpeg.run`)
+        :param float stall_timeout: maximum number of seconds the process may run without making
+            progress (see `FFmpeg.run`)
+        :param float grace_period: number of seconds to wait for the process to exit after each
+            step of stopping it
+        :param dict pipes: data of ``pipe:NAME`` inputs and destinations of ``pipe:NAME`` outputs
+            by their ``NAME`` (see `FFmpeg.run`); they are written and read in background threads
+        :param int spill_threshold: length in bytes above which filter graphs are moved to
+            temporary files (see `FFmpeg.run`)
+        :param bool spill_concat: whether to also move oversized ``concat:`` inputs to concat
+            demuxer lists (see `FFmpeg.run`)
+        :param kwargs: any other keyword arguments to be forwarded to
+            `asyncio.create_subprocess_exec`
+        :return: a 2-tuple containing ``stdout`` and ``stderr`` of the process
+        :rtype: tuple
+        :raise: `FFRuntimeError` in case FFmpeg command exits with a non-zero code;
+            `FFTimeoutError` in case the process exceeded ``timeout`` or ``stall_timeout``;
+            `FFExecutableNotFoundError` in case the executable path passed was not valid
+        """
+        import asyncio
+
+        watchdog = _Watchdog(
+            timeout, stall_timeout, grace_period, input_data is None and self._reads_commands()
+        )
+        attachments = _Attachments(
+            self,
+            watchdog.wrap(on_progress),
+            pipes,
+            stderr,
+            spill_threshold,
+            spill_concat,
+            kwargs.get("cwd"),
+        )
+        process = await attachments.popen_async(
+            stdin=subprocess.PIPE, stdout=stdout, env=env, **kwargs
+        )
+        watch = asyncio.ensure_future(watchdog.watch_async(process))
+
+        stderr_tail = attachments.stderr_tail
+        o_stdout: bytes | None
+        o_stderr: bytes | None
+        try:
+            communicate: Awaitable[tuple[bytes | None, bytes | None]]
+            if not watchdog.enabled and stderr_tail is None and input_data is None:
+                communicate = process.communicate()
+            else:
+                communicate = _communicate_async(
+                    process, input_data, stderr_tail, watchdog, attachments.recorder
+                )
+            (o_stdout, o_stderr), _ = await asyncio.gather(
+                communicate, attachments.progress.read_async(functools.partial(_kill, process))
+            )
+        except asyncio.CancelledError:
+            _kill(process)
+            await process.wait()
+            raise
+        finally:
+            watch.cancel()
+            await attachments.join_async()
+
+        exit_code = await process.wait()
+        attachments.finish(_len(o_stdout), _len(o_stderr))
+        attachments.raise_error()
+        if watchdog.reason is not None:
+            raise FFTimeoutError(
+                self.cmd, exit_code, o_stdout, o_stderr, watchdog.reason, watchdog.limit
+            )
+        if exit_code != 0:
+            raise FFRuntimeError(self.cmd, exit_code, o_stdout, o_stderr)
+
+        return o_stdout, o_stderr
+
 
 class FFprobe(FFmpeg):
     """Wrapper for `ffprobe <https://www.ffmpeg.org/ffprobe.html>`_."""
@@ -149,6 +681,166 @@ class FFprobe(FFmpeg):
         """
         super().__init__(executable=executable, global_options=global_options, inputs=inputs)
 
+    def _reads_commands(self) -> bool:
+        # Unlike FFmpeg, ffprobe takes no commands from stdin
+        return False
+
+    @classmethod
+    def probe(
+        cls,
+        path: str | os.PathLike[str],
+        executable: str = "ffprobe",
+        options: Sequence[str] | str | None = None,
+        cache: BaseProbeCache | Literal["default"] | None = "default",
+        **kwargs: Any,
+    ) -> ProbeResult:
+        """Probe ``path`` and return the parsed properties of its container and streams.
+
+        Runs ffprobe with ``-print_format json -show_format -show_streams`` and parses its output
+        into a `ProbeResult`. Results of probing local files are kept in ``cache``, keyed by the
+        path, the inode, the size and the modification time of the file, the executable and the
+        options, so probing an unchanged file again does not spawn a process. Inputs that cannot
+        be ``stat``-ed (e.g. URLs) are never cached.
+
+        :param path: path (or URL) of the input to probe
+        :param str executable: path to ffprobe executable
+        :param options: additional ffprobe options (e.g. ``-count_frames``)
+        :param cache: a `ProbeCache` or `SQLiteProbeCache` to look the result up in and store it
+            to; ``"default"`` stands for `ffmpy.probe.default_cache`, an in-memory cache shared by
+            the whole process, and `None` disables caching
+        :param kwargs: any other keyword arguments to be forwarded to `FFmpeg.run`; ``stderr``
+            defaults to a `TailCapture`, so the error of a failed probe ends up in the exception
+        :return: the parsed ffprobe output
+        :rtype: ProbeResult
+        :raise: `FFRuntimeError` in case ffprobe exits with a non-zero code;
+            `FFExecutableNotFoundError` in case the executable path passed was not valid
+        """
+        from .capture import TailCapture
+        from .probe import ProbeResult
+
+        cache = _probe_cache(cache)
+        ff, key = cls._prepare_probe(path, executable, options, cache)
+        result = cache.get(key) if cache is not None and key is not None else None
+        if result is None:
+            kwargs.setdefault("stderr", TailCapture())
+            stdout, _ = ff.run(stdout=subprocess.PIPE, **kwargs)
+            result = ProbeResult.from_json(stdout or b"{}")
+            if cache is not None and key is not None:
+                cache.put(key, result)
+        return result
+
+    @classmethod
+    async def probe_async(
+        cls,
+        path: str | os.PathLike[str],
+        executable: str = "ffprobe",
+        options: Sequence[str] | str | None = None,
+        cache: BaseProbeCache | Literal["default"] | None = "default",
+        **kwargs: Any,
+    ) -> ProbeResult:
+        """Asynchronous counterpart of `FFprobe.probe` using `FFmpeg.run_async`."""
+        from .capture import TailCapture
+        from .probe import ProbeResult
+
+        cache = _probe_cache(cache)
+        ff, key = cls._prepare_probe(path, executable, options, cache)
+        result = cache.get(key) if cache is not None and key is not None else None
+        if result is None:
+            kwargs.setdefault("stderr", TailCapture())
+            stdout, _ = await ff.run_async(stdout=subprocess.PIPE, **kwargs)
+            result = ProbeResult.from_json(stdout or b"{}")
+            if cache is not None and key is not None:
+                cache.put(key, result)
+        return result
+
+    @classmethod
+    def probe_many(
+        cls,
+        paths: Iterable[str | os.PathLike[str]],
+        executable: str = "ffprobe",
+        options: Sequence[str] | str | None = None,
+        cache: BaseProbeCache | Literal["default"] | None = "default",
+        max_workers: int | None = None,
+        **kwargs: Any,
+    ) -> list[ProbeResult]:
+        """Probe many inputs, spawning ffprobe only for the ones missing from ``cache``.
+
+        All the inputs are looked up in ``cache`` at once (which takes a few queries with
+        `SQLiteProbeCache`), the missing ones are probed concurrently in an `FFmpegPool` and their
+        results are stored to ``cache`` at once.
+
+        :param iterable paths: paths (or URLs) of the inputs to probe
+        :param str executable: path to ffprobe executable
+        :param options: additional ffprobe options (e.g. ``-count_frames``)
+        :param cache: a `ProbeCache` or `SQLiteProbeCache`; ``"default"`` stands for
+            `ffmpy.probe.default_cache` and `None` disables caching
+        :param int max_workers: maximum number of concurrently running ffprobe processes; by
+            default the number of CPUs
+        :param kwargs: any other keyword arguments to be forwarded to `FFmpeg.run` (see
+            `FFprobe.probe`)
+        :return: the parsed ffprobe output for every input, in the order of ``paths``
+        :rtype: list
+        :raise: `FFBatchError` in case probing any of the inputs failed; results of the
+            successfully probed inputs are cached nevertheless
+        """
+        import dataclasses
+
+        from .capture import TailCapture
+        from .pool import FFBatchError, FFmpegPool
+        from .probe import ProbeResult
+
+        cache = _probe_cache(cache)
+        prepared = [cls._prepare_probe(path, executable, options, cache) for path in paths]
+        found = {}
+        if cache is not None:
+            found = cache.get_many(key for _, key in prepared if key is not None)
+        results = [found.get(key) if key is not None else None for _, key in prepared]
+        missing = [index for index, result in enumerate(results) if result is None]
+
+        probed = {}
+        job_results = []
+        pool = FFmpegPool(max_workers=max_workers)
+        jobs = [prepared[index][0] for index in missing]
+        kwargs.setdefault("stderr", TailCapture())
+        for job_result in pool.run(jobs, stdout=subprocess.PIPE, **kwargs):
+            index = missing[job_result.index]
+            job_results.append(dataclasses.replace(job_result, index=index))
+            if not job_result.ok:
+                continue
+            result = results[index] = ProbeResult.from_json(job_result.stdout or b"{}")
+            key = prepared[index][1]
+            if key is not None:
+                probed[key] = result
+
+        if cache is not None and probed:
+            cache.put_many(probed)
+        if not all(job_result.ok for job_result in job_results):
+            raise FFBatchError(job_results)
+        return [result for result in results if result is not None]
+
+    @classmethod
+    def _prepare_probe(
+        cls,
+        path: str | os.PathLike[str],
+        executable: str,
+        options: Sequence[str] | str | None,
+        cache: BaseProbeCache | None,
+    ) -> tuple[FFprobe, ProbeKey | None]:
+        """Build the ffprobe command for `probe` and the cache key of its result."""
+        from .probe import PROBE_OPTIONS, ProbeKey
+
+        path = os.fspath(path)
+        normalized_options = _normalize_options(options, split_mixed=True)
+        ff = cls(
+            executable=executable,
+            global_options=[*PROBE_OPTIONS, *normalized_options],
+            inputs={path: None},
+        )
+        key = None
+        if cache is not None:
+            key = ProbeKey.from_path(path, (executable, *normalized_options))
+        return ff, key
+
 
 class FFExecutableNotFoundError(Exception):
     """Raise when FFmpeg/FFprobe executable was not found."""
@@ -186,6 +878,38 @@ class FFRuntimeError(Exception):
         super().__init__(message)
 
 
+class FFTimeoutError(FFRuntimeError, TimeoutError):
+    """Raise when FFmpeg/FFprobe command line execution exceeds its timeout and is stopped.
+
+    In addition to the attributes of `FFRuntimeError`, where ``stdout`` and ``stderr`` contain
+    the output captured until the process was stopped and ``exit_code`` is the exit code of the
+    stopped process, the exception object contains ``reason`` (``"timeout"`` if the process ran
+    too long, ``"stall"`` if it made no progress for too long) and ``timeout``, the exceeded limit
+    in seconds.
+    """
+
+    def __init__(
+        self,
+        cmd: str,
+        exit_code: int,
+        stdout: bytes | str | None,
+        stderr: bytes | str | None,
+        reason: str,
+        timeout: float | None,
+    ) -> None:
+        super().__init__(cmd, exit_code, stdout, stderr)
+        self.reason = reason
+        self.timeout = timeout
+
+        if reason == "stall":
+            summary = f"`{cmd}` stalled: no progress for {timeout} seconds"
+        else:
+            summary = f"`{cmd}` timed out after {timeout} seconds"
+        self.args = (
+            f"{summary}\n\nSTDOUT:\n{_safe_decode(stdout)}\n\nSTDERR:\n{_safe_decode(stderr)}",
+        )
+
+
 def _merge_args_opts(
     args_opts_dict: Mapping[str, Sequence[str] | str | None],
     add_minus_i_option: bool = False,
@@ -236,6 +960,517 @@ def _normalize_options(options: Sequence[str] | str | None, split_mixed: bool =
             return list(options)
 
 
+def _kill(process: subprocess.Popen | Popen | asyncio.subprocess.Process) -> None:
+    """Kill `process` unless it has already exited."""
+    with contextlib.suppress(ProcessLookupError):
+        if process.returncode is None:
+            process.kill()
+
+
+def _start_thread(target: Callable[..., None], *args: Any) -> threading.Thread:
+    """Run `target` with `args` in a daemon thread and return the started thread."""
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _iter_input(input_data: InputData) -> Iterator[bytes | bytearray | memoryview]:
+    """Iterate over `input_data` in chunks suitable for writing to process ``stdin``."""
+    if input_data is None:
+        return
+    if isinstance(input_data, (bytes, bytearray, memoryview)):
+        yield input_data
+    elif hasattr(input_data, "read"):
+        yield from iter(lambda: input_data.read(DEFAULT_CHUNK_SIZE), b"")
+    else:
+        yield from input_data
+
+
+def _write_input(
+    process: subprocess.Popen | Popen,
+    input_data: InputData,
+    errors: list[BaseException],
+    recorder: _StatsRecorder | None = None,
+) -> None:
+    """Write `input_data` to process ``stdin`` chunk by chunk and close it.
+
+    Writes block while the pipe is full, so input is never read ahead of FFmpeg. A broken pipe
+    (FFmpeg exiting before consuming all input) is not an error here; the exit code of the process
+    tells whether the run was successful. If reading `input_data` fails, the process is killed and
+    the exception is appended to `errors` for the caller to re-raise.
+    """
+    stdin = process.stdin
+    if stdin is None:
+        return
+    try:
+        for chunk in _iter_input(input_data):
+            stdin.write(chunk)
+            if recorder is not None:
+                recorder.stdin_bytes += _nbytes(chunk)
+    except BrokenPipeError:
+        pass
+    except BaseException as e:
+        errors.append(e)
+        process.kill()
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def _iter_chunks(stream: IO[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield chunks of at most `chunk_size` bytes from `stream` as soon as they are available."""
+    read = getattr(stream, "read1", stream.read)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _read_into(stream: IO[bytes], sink: Callable[[bytes], Any]) -> None:
+    """Drain `stream` until EOF passing every chunk to `sink`, then close it."""
+    try:
+        for chunk in _iter_chunks(stream):
+            sink(chunk)
+    finally:
+        stream.close()
+
+
+def _popen_class() -> type[subprocess.Popen | Popen]:
+    """Return `popen`, importing psutil the first time it is called."""
+    global popen
+    if popen is None:
+        try:
+            from psutil import Popen
+        except ImportError:
+            popen = subprocess.Popen
+        else:
+            popen = Popen
+    return popen
+
+
+def _resolve_executable(executable: str, env: Mapping[str, str] | None = None) -> str:
+    """Return the absolute path of `executable`, a name being looked up in ``PATH`` of `env` (or
+    of the current process) like `shutil.which` does.
+
+    Names found are cached for every ``PATH``; names not found are not, so an executable
+    installed later is found on the next call.
+
+    :raise: `FFExecutableNotFoundError` in case the executable was not found
+    """
+    if os.path.dirname(executable):
+        # Not cached, as a relative path depends on the working directory
+        return _which(executable, None)
+    return _cached_which(executable, (os.environ if env is None else env).get("PATH", os.defpath))
+
+
+def _which(executable: str, path: str | None) -> str:
+    found = shutil.which(executable, path=path)
+    if found is None:
+        raise FFExecutableNotFoundError(f"Executable '{executable}' not found")
+    return os.path.abspath(found)
+
+
+_cached_which = functools.lru_cache(maxsize=64)(_which)
+
+
+def _probe_cache(cache: BaseProbeCache | Literal["default"] | None) -> BaseProbeCache | None:
+    """Resolve the ``cache`` argument of the `FFprobe` methods."""
+    if cache == "default":
+        from .probe import default_cache
+
+        return default_cache
+    return cache
+
+
+def _tail_capture(
+    stderr: IO | int | TailCapture | None,
+) -> tuple[IO | int | None, _RingBuffer | None]:
+    """Translate `stderr` argument into Popen ``stderr`` and a ring buffer for its tail."""
+    from .capture import TailCapture
+
+    if isinstance(stderr, TailCapture):
+        return subprocess.PIPE, stderr._buffer()
+    return stderr, None
+
+
+class _Attachments:
+    """What `FFmpeg.run`, `FFmpeg.stream` and `FFmpeg.run_async` attach to the process they run:
+    the ``-progress`` pipe, the extra pipes, the capture of the tail of ``stderr``, the files of
+    oversized arguments and the recorder of the stats.
+
+    `popen` (or `popen_async`) starts the process with them, sets ``process`` of the `FFmpeg`
+    instance and starts reading the pipes. Once the process has exited, `join` (or
+    `join_async`) waits for the pipes and removes the files, and `finish` sets ``stats``.
+    """
+
+    def __init__(
+        self,
+        ff: FFmpeg,
+        on_progress: Callable[[Progress], object] | None,
+        pipes: Mapping[str, PipeData] | None,
+        stderr: IO | int | TailCapture | None,
+        spill_threshold: int | None,
+        spill_concat: bool,
+        cwd: str | os.PathLike[str] | None,
+    ) -> None:
+        from .progress import _ProgressPipe
+        from .spill import _Spill
+        from .stats import _StatsRecorder
+
+        self.ff = ff
+        self.progress = _ProgressPipe(on_progress)
+        self.extra_pipes = _ExtraPipes(pipes)
+        self.stderr, self.stderr_tail = _tail_capture(stderr)
+        self.spill = _Spill(spill_threshold, cwd, spill_concat)
+        self.recorder = _StatsRecorder()
+        ff.stats = None
+
+    def popen(
+        self, fast_spawn: bool = False, sample_interval: float | None = None, **kwargs: Any
+    ) -> subprocess.Popen | Popen:
+        """Start the process (see `FFmpeg._popen`) and the threads reading the pipes."""
+        process = self.ff._popen(
+            self.progress,
+            self.extra_pipes,
+            self.stderr_tail,
+            self.spill,
+            fast_spawn=fast_spawn,
+            sample_interval=sample_interval,
+            stderr=self.stderr,
+            **kwargs,
+        )
+        self.ff.process = process
+        self.recorder.track(process, sample_interval)
+        self.progress.start(functools.partial(_kill, process))
+        self.extra_pipes.start(functools.partial(_kill, process))
+        return process
+
+    async def popen_async(self, **kwargs: Any) -> asyncio.subprocess.Process:
+        """Start the process on the running event loop and the threads of the extra pipes; the
+        ``-progress`` pipe is left to `_ProgressPipe.read_async`."""
+        import asyncio
+
+        ff = self.ff
+        with _spawning(ff.executable, self.progress, self.extra_pipes, self.spill):
+            process = await asyncio.create_subprocess_exec(
+                *ff._command(self.progress, self.extra_pipes, self.stderr_tail, self.spill),
+                stderr=self.stderr,
+                **self.extra_pipes.popen_kwargs(self.progress.popen_kwargs(kwargs)),
+            )
+        ff.process = process
+        self.recorder.track()
+        self.extra_pipes.start(functools.partial(_kill, process))
+        return process
+
+    def join(self) -> None:
+        """Wait for the threads reading the pipes and remove the files."""
+        self.progress.join()
+        self.extra_pipes.join()
+        self.spill.close()
+
+    async def join_async(self) -> None:
+        """Counterpart of `join` for a process started by `popen_async`."""
+        import asyncio
+
+        self.progress.close()
+        self.spill.close()
+        if self.extra_pipes:
+            await asyncio.get_running_loop().run_in_executor(None, self.extra_pipes.join)
+
+    def finish(self, stdout_bytes: int | None, stderr_bytes: int | None) -> None:
+        """Set ``stats`` of the `FFmpeg` instance; with a `TailCapture` the bytes of ``stderr``
+        are counted by its buffer rather than by the caller."""
+        from .capture import _log_counts
+
+        if self.stderr_tail is not None:
+            stderr_bytes = self.stderr_tail.total_bytes
+        self.ff.stats = self.recorder.finish(
+            stdout_bytes, stderr_bytes, _log_counts(self.stderr_tail)
+        )
+
+    def raise_error(self) -> None:
+        """Re-raise the exception of the progress callback or of an extra pipe, if any."""
+        self.progress.raise_error()
+        self.extra_pipes.raise_error()
+
+
+@contextlib.contextmanager
+def _spawning(executable: str, *attachments: _ProgressPipe | _ExtraPipes | _Spill) -> Iterator[None]:
+    """Close `attachments` if starting the process in the block fails, reporting a missing
+    `executable` as `FFExecutableNotFoundError`."""
+    try:
+        yield
+    except BaseException as e:
+        for attachment in attachments:
+            attachment.close()
+        if isinstance(e, OSError) and e.errno == errno.ENOENT:
+            raise FFExecutableNotFoundError(f"Executable '{executable}' not found") from e
+        raise
+
+
+class _ExtraPipes:
+    """Pipes for ``pipe:NAME`` inputs and outputs of FFmpeg other than ``stdin`` and ``stdout``.
+
+    `command` replaces every ``pipe:NAME`` argument whose name is a key of `pipes` with
+    ``pipe:FD``, where ``FD`` is FFmpeg's end of a new pipe; an argument following ``-i`` is an
+    input, any other an output. The ends are passed to the process with ``pass_fds``. Once the
+    process is started, `start` writes the input data to and drains the outputs of the parent's
+    ends in threads. An exception raised by reading input data or by an output destination kills
+    the process and is re-raised by `raise_error`. Without `pipes` all the methods leave the
+    command and the process untouched.
+    """
+
+    def __init__(self, pipes: Mapping[str, PipeData] | None) -> None:
+        self.pipes = dict(pipes or {})
+        self.errors: list[BaseException] = []
+        self._child_fds: list[int] = []
+        self._parent_ends: list[tuple[int, bool, PipeData]] = []
+        self._threads: list[threading.Thread] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.pipes)
+
+    def command(self, cmd: list[str]) -> list[str]:
+        """Return `cmd` with the ``pipe:NAME`` arguments pointing to new pipes."""
+        if not self.pipes:
+            return cmd
+        names = {}
+        for index, arg in enumerate(cmd):
+            name = arg[len("pipe:") :] if arg.startswith("pipe:") else None
+            if name not in self.pipes:
+                continue
+            if name in names:
+                raise ValueError(f"Pipe 'pipe:{name}' is used more than once")
+            names[name] = index
+        missing = self.pipes.keys() - names.keys()
+        if missing:
+            raise ValueError(f"Pipes not used in the command line: {', '.join(sorted(missing))}")
+
+        cmd = cmd.copy()
+        for name, index in names.items():
+            data = self.pipes[name]
+            is_input = cmd[index - 1] == "-i"
+            if is_input and callable(data):
+                raise TypeError(f"Input 'pipe:{name}' needs data, not a callable")
+            if not is_input and not callable(getattr(data, "write", data)):
+                raise TypeError(f"Output 'pipe:{name}' needs a file object or a callable")
+            read_fd, write_fd = os.pipe()
+            child_fd, parent_fd = (read_fd, write_fd) if is_input else (write_fd, read_fd)
+            self._child_fds.append(child_fd)
+            self._parent_ends.append((parent_fd, is_input, data))
+            cmd[index] = f"pipe:{child_fd}"
+        return cmd
+
+    def popen_kwargs(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Return Popen `kwargs` with FFmpeg's ends of the pipes added to ``pass_fds``."""
+        if not self._child_fds:
+            return kwargs
+        return {**kwargs, "pass_fds": (*kwargs.get("pass_fds", ()), *self._child_fds)}
+
+    def start(self, kill: Callable[[], object]) -> None:
+        """Close FFmpeg's ends of the pipes in the parent and start writing and reading them."""
+        self._close_child_fds()
+        for fd, is_input, data in self._parent_ends:
+            if is_input:
+                writer = os.fdopen(fd, "wb")
+                self._threads.append(_start_thread(self._write, writer, data, kill))
+            else:
+                reader = os.fdopen(fd, "rb")
+                sink = getattr(data, "write", data)
+                self._threads.append(_start_thread(self._read, reader, sink, kill))
+        self._parent_ends = []
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def close(self) -> None:
+        self._close_child_fds()
+        for fd, _, _ in self._parent_ends:
+            os.close(fd)
+        self._parent_ends = []
+
+    def raise_error(self) -> None:
+        if self.errors:
+            raise self.errors[0]
+
+    def _close_child_fds(self) -> None:
+        for fd in self._child_fds:
+            os.close(fd)
+        self._child_fds = []
+
+    def _write(self, stream: IO[bytes], data: InputData, kill: Callable[[], object]) -> None:
+        try:
+            for chunk in _iter_input(data):
+                stream.write(chunk)
+        except BrokenPipeError:
+            pass
+        except BaseException as e:
+            self.errors.append(e)
+            kill()
+        finally:
+            with contextlib.suppress(BrokenPipeError):
+                stream.close()
+
+    def _read(
+        self, stream: IO[bytes], sink: Callable[[bytes], object], kill: Callable[[], object]
+    ) -> None:
+        try:
+            _read_into(stream, sink)
+        except BaseException as e:
+            self.errors.append(e)
+            kill()
+
+
+def _communicate(
+    process: subprocess.Popen | Popen,
+    input_data: InputData,
+    stderr_tail: _RingBuffer | None = None,
+    watchdog: _Watchdog | None = None,
+    recorder: _StatsRecorder | None = None,
+) -> tuple[bytes | None, bytes | None]:
+    """Interact with `process` like `subprocess.Popen.communicate` but stream `input_data`.
+
+    ``stdin`` is fed and ``stdout``/``stderr`` (if redirected to pipes) are drained in separate
+    threads, so neither side of the conversation can deadlock the other. If `stderr_tail` is
+    given, ``stderr`` is written to it instead of being collected as a whole. Reading output is
+    reported to `watchdog`, which also keeps ``stdin`` open until the process exits if it may
+    need to send the ``q`` command. Bytes written to ``stdin`` are counted by `recorder`.
+    """
+    from .stats import _wait
+
+    stdout_chunks: list[bytes] = []
+    stderr_chunks: list[bytes] = []
+    stdout_sink: Callable[[bytes], Any] = stdout_chunks.append
+    stderr_sink: Callable[[bytes], Any] = (
+        stderr_chunks.append if stderr_tail is None else stderr_tail.write
+    )
+    keep_stdin = watchdog is not None and watchdog.keeps_stdin
+    if watchdog is not None:
+        stdout_sink = watchdog.wrap(stdout_sink)
+        stderr_sink = watchdog.wrap(stderr_sink)
+    input_errors: list[BaseException] = []
+
+    threads = []
+    if not keep_stdin:
+        threads.append(_start_thread(_write_input, process, input_data, input_errors, recorder))
+    if process.stdout is not None:
+        threads.append(_start_thread(_read_into, process.stdout, stdout_sink))
+    if process.stderr is not None:
+        threads.append(_start_thread(_read_into, process.stderr, stderr_sink))
+
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        _wait(process, recorder)
+        if keep_stdin and process.stdin is not None:
+            with contextlib.suppress(BrokenPipeError):
+                process.stdin.close()
+
+    if input_errors:
+        raise input_errors[0]
+
+    o_stdout = b"".join(stdout_chunks) if process.stdout is not None else None
+    if stderr_tail is not None:
+        return o_stdout, stderr_tail.getvalue()
+    return o_stdout, b"".join(stderr_chunks) if process.stderr is not None else None
+
+
+async def _write_input_async(
+    process: asyncio.subprocess.Process,
+    input_data: InputData | AsyncIterable[bytes],
+    recorder: _StatsRecorder | None = None,
+) -> None:
+    """Write `input_data` to process ``stdin`` waiting for the pipe to drain after every chunk."""
+    stdin = process.stdin
+    if stdin is None:
+        return
+    try:
+        if isinstance(input_data, AsyncIterable):
+            async for chunk in input_data:
+                stdin.write(chunk)
+                await stdin.drain()
+                if recorder is not None:
+                    recorder.stdin_bytes += _nbytes(chunk)
+        else:
+            for buffer in _iter_input(input_data):
+                stdin.write(buffer)
+                await stdin.drain()
+                if recorder is not None:
+                    recorder.stdin_bytes += _nbytes(buffer)
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        stdin.close()
+
+
+async def _read_async(
+    stream: asyncio.StreamReader | None,
+    tail: _RingBuffer | None = None,
+    watchdog: _Watchdog | None = None,
+) -> bytes | None:
+    """Read `stream` until EOF, retaining only its tail if `tail` is given.
+
+    Every chunk read is reported to `watchdog` if it is enabled.
+    """
+    if stream is None:
+        return None
+    watching = watchdog is not None and watchdog.enabled
+    if tail is None and not watching:
+        return await stream.read()
+    chunks: list[bytes] = []
+    while True:
+        chunk = await stream.read(DEFAULT_CHUNK_SIZE)
+        if not chunk:
+            return tail.getvalue() if tail is not None else b"".join(chunks)
+        if watchdog is not None:
+            watchdog.touch()
+        if tail is not None:
+            tail.write(chunk)
+        else:
+            chunks.append(chunk)
+
+
+async def _communicate_async(
+    process: asyncio.subprocess.Process,
+    input_data: InputData | AsyncIterable[bytes],
+    stderr_tail: _RingBuffer | None = None,
+    watchdog: _Watchdog | None = None,
+    recorder: _StatsRecorder | None = None,
+) -> tuple[bytes | None, bytes | None]:
+    """Asynchronous counterpart of `_communicate`."""
+    import asyncio
+
+    keep_stdin = watchdog is not None and watchdog.keeps_stdin
+    writing = [] if keep_stdin else [_write_input_async(process, input_data, recorder)]
+    *_, o_stdout, o_stderr = await asyncio.gather(
+        *writing,
+        _read_async(process.stdout, watchdog=watchdog),
+        _read_async(process.stderr, stderr_tail, watchdog),
+    )
+    await process.wait()
+    if keep_stdin and process.stdin is not None:
+        process.stdin.close()
+    return o_stdout, o_stderr
+
+
+def _nbytes(data: Any) -> int:
+    """Return the size of a bytes-like object (e.g. a NumPy array) in bytes."""
+    return memoryview(data).nbytes
+
+
+def _len(data: bytes | str | None) -> int | None:
+    """Return the length of captured output, or `None` if it was not captured."""
+    return None if data is None else len(data)
+
+
 def _safe_decode(stream_data: bytes | str | None) -> str:
     """Convert FFmpeg output to text for error messages."""
     if stream_data is None:
@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import io
+import os
+import subprocess
+import threading
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Callable, Generator, Iterator, Mapping, Sequence, cast
+
+from .capture import TailCapture, _log_counts, _RingBuffer
+from .ffmpy import (
+    FFmpeg,
+    FFprobe,
+    FFRuntimeError,
+    InputData,
+    PipeData,
+    _kill,
+    _len,
+    _normalize_options,
+    _read_into,
+    _start_thread,
+    _tail_capture,
+)
+from .progress import Progress, _ProgressPipe
+from .stats import _StatsRecorder, _wait
+
+if TYPE_CHECKING:
+    import numpy as np
+
+#: number of components of a pixel and their NumPy dtype for the packed pixel formats frames
+#: can be read in
+PIXEL_FORMATS: Mapping[str, tuple[int, str]] = {
+    "gray": (1, "u1"),
+    "gray16le": (1, "<u2"),
+    "gray16be": (1, ">u2"),
+    "grayf32le": (1, "<f4"),
+    "rgb24": (3, "u1"),
+    "bgr24": (3, "u1"),
+    "rgb48le": (3, "<u2"),
+    "bgr48le": (3, "<u2"),
+    "rgba": (4, "u1"),
+    "bgra": (4, "u1"),
+    "argb": (4, "u1"),
+    "abgr": (4, "u1"),
+    "rgb0": (4, "u1"),
+    "bgr0": (4, "u1"),
+    "rgba64le": (4, "<u2"),
+    "bgra64le": (4, "<u2"),
+}
+
+
+class FrameReader:
+    """Decode video into `NumPy <https://numpy.org>`_ arrays of raw frames.
+
+    FFmpeg is run with ``-f rawvideo -pix_fmt PIX_FMT pipe:1`` and its ``stdout`` is read with
+    ``readinto`` directly into a preallocated array, so no memory is allocated per frame and the
+    memory used stays constant regardless of the length of the video. Iterating over the reader
+    runs FFmpeg and yields the frames as arrays of shape ``(height, width, channels)``, or batches
+    of up to ``batch_size`` frames of shape ``(frames, height, width, channels)``.
+
+    The yielded array is the same buffer every time, overwritten by the next frame or batch: copy
+    it (``frame.copy()``) to keep it for longer.
+
+    >>> reader = FrameReader('input.mp4', pix_fmt='rgb24', batch_size=32)
+    >>> for batch in reader:
+    ...     model.predict(batch)
+
+    If ``width`` or ``height`` is not given, the dimensions of the first video stream are probed
+    with `FFprobe.probe`. They must be given explicitly if ``output_options`` change them (e.g.
+    with a ``scale`` filter).
+
+    Requires NumPy (``pip install ffmpy[numpy]``).
+
+    :param path: path (or URL) of the input
+    :param int width: width of the frames in pixels
+    :param int height: height of the frames in pixels
+    :param str pix_fmt: pixel format of the frames, one of `PIXEL_FORMATS`
+    :param int batch_size: number of frames per yielded array; by default single frames are
+        yielded
+    :param str executable: path to ffmpeg executable
+    :param input_options: options of the input (e.g. ``-ss 10``)
+    :param output_options: additional options of the output (e.g. ``-vf fps=1``)
+    :param str probe_executable: path to ffprobe executable used to probe the dimensions
+    :raise: `ValueError` in case the pixel format is not supported or the dimensions could not be
+        probed; `ImportError` in case NumPy is not installed
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        width: int | None = None,
+        height: int | None = None,
+        pix_fmt: str = "rgb24",
+        batch_size: int | None = None,
+        executable: str = "ffmpeg",
+        input_options: Sequence[str] | str | None = None,
+        output_options: Sequence[str] | str | None = None,
+        probe_executable: str = "ffprobe",
+    ) -> None:
+        _require_numpy()
+        if pix_fmt not in PIXEL_FORMATS:
+            raise ValueError(
+                f"Unsupported pixel format {pix_fmt!r}, use one of {', '.join(PIXEL_FORMATS)}"
+            )
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be greater than 0")
+
+        path = os.fspath(path)
+        if width is None or height is None:
+            video = FFprobe.probe(path, executable=probe_executable).video
+            if video is None or video.width is None or video.height is None:
+                raise ValueError(f"Could not probe the dimensions of the video in {path!r}")
+            width = video.width if width is None else width
+            height = video.height if height is None else height
+
+        channels, dtype = PIXEL_FORMATS[pix_fmt]
+        self.width = width
+        self.height = height
+        self.pix_fmt = pix_fmt
+        self.batch_size = batch_size
+        #: shape of a single frame
+        self.shape = (height, width, channels)
+        #: NumPy dtype of the components of a pixel
+        self.dtype = dtype
+        #: the `FFmpeg` instance run by the reader
+        self.ff = FFmpeg(
+            executable=executable,
+            inputs={path: input_options},
+            outputs={
+                "pipe:1": [
+                    *_normalize_options(output_options, split_mixed=True),
+                    *("-f", "rawvideo", "-pix_fmt", pix_fmt),
+                ]
+            },
+        )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self.ff.cmd!r}>"
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return self.read()
+
+    def read(
+        self,
+        input_data: InputData = None,
+        stderr: IO | int | TailCapture | None = None,
+        env: Mapping[str, str] | None = None,
+        on_progress: Callable[[Progress], object] | None = None,
+        pipes: Mapping[str, PipeData] | None = None,
+        **kwargs: Any,
+    ) -> Generator[np.ndarray, None, None]:
+        """Run FFmpeg and iterate over the frames (or batches of them) as they are decoded.
+
+        The arguments are the ones of `FFmpeg.stream`, e.g. ``input_data`` is written to
+        ``stdin`` if the input is ``pipe:0``. If the iteration is stopped early, the FFmpeg process
+        is killed.
+
+        :return: an iterator over the frames or batches of frames
+        :rtype: iterator
+        :raise: `FFRuntimeError` in case FFmpeg exits with a non-zero code
+        """
+        return self.ff._stream(
+            self._read_frames, input_data, stderr, env, on_progress, pipes, **kwargs
+        )
+
+    def _read_frames(self, stdout: IO[bytes]) -> Iterator[np.ndarray]:
+        import numpy as np
+
+        frames = self.batch_size or 1
+        buffer = np.empty((frames, *self.shape), dtype=self.dtype)
+        view = memoryview(cast(Any, buffer)).cast("B")
+        frame_size = view.nbytes // frames
+        while True:
+            size = _readinto(stdout, view)
+            count = size // frame_size
+            if count:
+                if self.batch_size is None:
+                    yield buffer[0]
+                else:
+                    yield buffer if count == frames else buffer[:count]
+            if size < view.nbytes:
+                return
+
+
+class FrameWriter:
+    """Encode raw video frames or audio samples written from Python, e.g. NumPy arrays.
+
+    FFmpeg reads raw data from ``stdin`` (``pipe:0``), described by ``input_options`` such as
+    ``-f rawvideo -pix_fmt rgb24 -s 640x480``; the `video` and `audio` class methods build them
+    for the common cases. The writer is a context manager: entering it starts FFmpeg, `write`
+    passes data to it and leaving it waits for FFmpeg to finish the output.
+
+    >>> with FrameWriter.video('output.mp4', 640, 480, frame_rate=30) as writer:
+    ...     for frame in frames:  # e.g. arrays of shape (480, 640, 3) and dtype uint8
+    ...         writer.write(frame)
+
+    Any object supporting the buffer protocol (NumPy arrays, `bytes`, `bytearray`,
+    `memoryview`, ...) can be written. Its memory is written to the pipe as it is, without being
+    copied (unless it is not contiguous) or converted, so it must already be in the pixel or
+    sample format given to FFmpeg. Writing blocks while FFmpeg is busy, so frames are never
+    produced faster than FFmpeg encodes them.
+
+    :param str path: path (or URL) of the output
+    :param input_options: options describing the raw input (e.g. ``-f s16le -ar 48000 -ac 2``)
+    :param output_options: options of the output (e.g. ``-c:v libx264 -crf 23``)
+    :param str executable: path to ffmpeg executable
+    :param global_options: global options (e.g. ``-y``)
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        input_options: Sequence[str] | str | None,
+        output_options: Sequence[str] | str | None = None,
+        executable: str = "ffmpeg",
+        global_options: Sequence[str] | str | None = None,
+    ) -> None:
+        #: size of a single frame in bytes if known; data written must consist of whole frames
+        self.frame_size: int | None = None
+        #: the `FFmpeg` instance run by the writer
+        self.ff = FFmpeg(
+            executable=executable,
+            global_options=global_options,
+            inputs={"pipe:0": input_options},
+            outputs={os.fspath(path): output_options},
+        )
+        self._process: Any = None
+        self._recorder = _StatsRecorder()
+        self._progress = _ProgressPipe(None)
+        self._stderr_tail: _RingBuffer | None = None
+        self._stdout_chunks: list[bytes] = []
+        self._stderr_chunks: list[bytes] = []
+        self._threads: list[threading.Thread] = []
+        self._result: tuple[bytes | None, bytes | None] | None = None
+
+    @classmethod
+    def video(
+        cls,
+        path: str | os.PathLike[str],
+        width: int,
+        height: int,
+        pix_fmt: str = "rgb24",
+        frame_rate: float | str = 25,
+        output_options: Sequence[str] | str | None = None,
+        executable: str = "ffmpeg",
+        global_options: Sequence[str] | str | None = None,
+    ) -> FrameWriter:
+        """Create a writer of raw video frames (``-f rawvideo``).
+
+        With a pixel format from `PIXEL_FORMATS`, a frame is an array of shape
+        ``(height, width, channels)`` (or several of them stacked) and every write is checked to
+        contain whole frames.
+
+        :param path: path (or URL) of the output
+        :param int width: width of the frames in pixels
+        :param int height: height of the frames in pixels
+        :param str pix_fmt: pixel format of the frames
+        :param frame_rate: frame rate of the input (e.g. ``30`` or ``'30000/1001'``)
+        :param output_options: options of the output
+        :param str executable: path to ffmpeg executable
+        :param global_options: global options
+        :return: a new `FrameWriter`
+        :rtype: FrameWriter
+        """
+        input_options = [
+            *("-f", "rawvideo", "-pix_fmt", pix_fmt),
+            *("-s", f"{width}x{height}", "-framerate", str(frame_rate)),
+        ]
+        writer = cls(path, input_options, output_options, executable, global_options)
+        if pix_fmt in PIXEL_FORMATS:
+            channels, dtype = PIXEL_FORMATS[pix_fmt]
+            # The item size is the last character of the dtype (e.g. "<u2")
+            writer.frame_size = width * height * channels * int(dtype[-1])
+        return writer
+
+    @classmethod
+    def audio(
+        cls,
+        path: str | os.PathLike[str],
+        sample_rate: int = 48000,
+        channels: int = 2,
+        sample_fmt: str = "s16le",
+        output_options: Sequence[str] | str | None = None,
+        executable: str = "ffmpeg",
+        global_options: Sequence[str] | str | None = None,
+    ) -> FrameWriter:
+        """Create a writer of raw interleaved audio samples (e.g. ``-f s16le``).
+
+        :param path: path (or URL) of the output
+        :param int sample_rate: sample rate in Hz
+        :param int channels: number of channels
+        :param str sample_fmt: format of the samples, the name of an FFmpeg PCM format (e.g.
+            ``s16le`` for arrays of dtype ``<i2`` or ``f32le`` for ``<f4``)
+        :param output_options: options of the output
+        :param str executable: path to ffmpeg executable
+        :param global_options: global options
+        :return: a new `FrameWriter`
+        :rtype: FrameWriter
+        """
+        input_options = ["-f", sample_fmt, "-ar", str(sample_rate), "-ac", str(channels)]
+        return cls(path, input_options, output_options, executable, global_options)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self.ff.cmd!r}>"
+
+    def __enter__(self) -> FrameWriter:
+        if self._process is None:
+            self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(
+        self,
+        stdout: IO | int | None = None,
+        stderr: IO | int | TailCapture | None = None,
+        env: Mapping[str, str] | None = None,
+        on_progress: Callable[[Progress], object] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Start FFmpeg; called when entering the context, call it directly to pass arguments.
+
+        ``stdout`` and ``stderr`` (if redirected to pipes) are drained in background threads
+        and returned by `close`. The arguments are otherwise the ones of `FFmpeg.run`.
+
+        :raise: `FFExecutableNotFoundError` in case the executable path passed was not valid
+        """
+        if self._process is not None:
+            raise RuntimeError("The writer has already been opened")
+        self._progress = _ProgressPipe(on_progress)
+        stderr, self._stderr_tail = _tail_capture(stderr)
+        self._recorder = _StatsRecorder()
+        self.ff.stats = None
+        process = self.ff._popen(
+            self._progress,
+            None,
+            self._stderr_tail,
+            stdin=subprocess.PIPE,
+            stdout=stdout,
+            stderr=stderr,
+            env=env,
+            **kwargs,
+        )
+        self.ff.process = self._process = process
+        self._recorder.track(process)
+        self._progress.start(functools.partial(_kill, process))
+        if process.stdout is not None:
+            self._threads.append(
+                _start_thread(_read_into, process.stdout, self._stdout_chunks.append)
+            )
+        if process.stderr is not None:
+            sink = (
+                self._stderr_chunks.append if self._stderr_tail is None else self._stderr_tail.write
+            )
+            self._threads.append(_start_thread(_read_into, process.stderr, sink))
+
+    def write(self, data: Any) -> None:
+        """Write raw frames or samples, blocking until FFmpeg has taken them.
+
+        :param data: an object supporting the buffer protocol, e.g. a NumPy array
+        :raise: `ValueError` in case the data does not consist of whole frames;
+            `FFRuntimeError` in case FFmpeg has exited with a non-zero code
+        """
+        if self._process is None:
+            self.open()
+        if self._result is not None:
+            raise ValueError("Write to a closed writer")
+        view = memoryview(data)
+        if self.frame_size is not None and view.nbytes % self.frame_size:
+            raise ValueError(
+                f"Expected whole frames of {self.frame_size} bytes, got {view.nbytes} bytes"
+            )
+        # Pipes take bytes only; casting a contiguous view is free, others have to be copied
+        chunk = view.cast("B") if view.c_contiguous else view.tobytes()
+        try:
+            self._process.stdin.write(chunk)
+        except BrokenPipeError:
+            # FFmpeg exited before reading all the data; raise its error if it failed
+            self.close()
+            raise
+        self._recorder.stdin_bytes += view.nbytes
+
+    def close(self) -> tuple[bytes | None, bytes | None]:
+        """Finish the input, wait for FFmpeg to exit and return its ``stdout`` and ``stderr``.
+
+        Calling it again returns the same result.
+
+        :return: a 2-tuple containing ``stdout`` and ``stderr`` of the process, as returned by
+            `FFmpeg.run`
+        :rtype: tuple
+        :raise: `FFRuntimeError` in case FFmpeg exits with a non-zero code
+        """
+        if self._process is None:
+            self.open()
+        process = self._process
+        if self._result is None:
+            with contextlib.suppress(BrokenPipeError):
+                process.stdin.close()
+            try:
+                for thread in self._threads:
+                    thread.join()
+            finally:
+                _wait(process, self._recorder)
+                self._progress.join()
+            o_stdout = b"".join(self._stdout_chunks) if process.stdout is not None else None
+            o_stderr: bytes | None = None
+            stderr_bytes: int | None = None
+            if self._stderr_tail is not None:
+                o_stderr = self._stderr_tail.getvalue()
+                stderr_bytes = self._stderr_tail.total_bytes
+            elif process.stderr is not None:
+                o_stderr = b"".join(self._stderr_chunks)
+                stderr_bytes = len(o_stderr)
+            self._result = o_stdout, o_stderr
+            self.ff.stats = self._recorder.finish(
+                _len(o_stdout), stderr_bytes, _log_counts(self._stderr_tail)
+            )
+            self._progress.raise_error()
+
+        if process.returncode != 0:
+            raise FFRuntimeError(self.ff.cmd, process.returncode, *self._result)
+        return self._result
+
+    def abort(self) -> None:
+        """Kill FFmpeg and wait for it to exit, e.g. when producing the frames failed."""
+        if self._process is None or self._result is not None:
+            return
+        _kill(self._process)
+        with contextlib.suppress(FFRuntimeError):
+            self.close()
+
+
+def _readinto(stream: IO[bytes], buffer: memoryview) -> int:
+    """Fill `buffer` from `stream`; return the number of bytes read, less than its size at EOF."""
+    readinto = cast(io.BufferedIOBase, stream).readinto
+    filled = 0
+    while filled < buffer.nbytes:
+        size = readinto(buffer[filled:])
+        if not size:
+            break
+        filled += size
+    return filled
+
+
+def _require_numpy() -> None:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise ImportError("NumPy is required, install it with `pip install ffmpy[numpy]`") from None
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Generator, Iterable, Mapping
+
+from .capture import TailCapture
+from .ffmpy import FFmpeg, _FrozenSlots
+from .pool import FFmpegPool, JobResult
+
+#: the job has not been run yet, or was interrupted and will be run again
+PENDING = "pending"
+#: the job is being run
+RUNNING = "running"
+#: the job completed successfully
+DONE = "done"
+#: the job failed; `JobQueue.run` runs it again unless ``retry_failed`` is `False`
+FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class JournalEntry(_FrozenSlots):
+    """The state of a job recorded in the journal of a `JobQueue`."""
+
+    __slots__ = (
+        "id",
+        "key",
+        "args",
+        "state",
+        "attempts",
+        "exit_code",
+        "error",
+        "wall_time",
+        "updated_at",
+    )
+
+    #: identifier of the job, increasing in the order the jobs were added
+    id: int
+    #: unique key of the job; the command line unless given explicitly
+    key: str
+    #: the command line of the job as a list of arguments, starting with the executable
+    args: tuple[str, ...]
+    #: `PENDING`, `RUNNING`, `DONE` or `FAILED`
+    state: str
+    #: number of times the job has been started
+    attempts: int
+    #: exit code of the last run, if it was started
+    exit_code: int | None
+    #: description of the error the last run failed with, if any
+    error: str | None
+    #: seconds the last run took, if it completed
+    wall_time: float | None
+    #: time of the last change of the state as seconds since the epoch
+    updated_at: float
+
+    @property
+    def job(self) -> FFmpeg:
+        """A new `FFmpeg` instance executing the command line of the job."""
+        return FFmpeg._from_cmd(list(self.args))
+
+
+class JobQueue:
+    """Queue of `FFmpeg` jobs recording their progress in an on-disk journal.
+
+    The command lines of the added jobs and every change of their state are stored in an SQLite
+    database file, so that after the process is restarted (e.g. after a crash), running the queue
+    again executes only the jobs that have not completed yet. Jobs are executed concurrently in
+    an `FFmpegPool`.
+
+    >>> with JobQueue('transcode.db', max_workers=8) as queue:
+    ...     queue.add(FFmpeg(inputs={path: None}, outputs={output(path): '-c:v libx264'})
+    ...               for path in paths)
+    ...     for entry in queue.run():
+    ...         print(entry.key, entry.state)
+
+    Adding a job whose key is already in the journal does nothing, so the same jobs can be added
+    every time the process starts. Jobs that were running when the process stopped are pending
+    again when the journal is opened; since their outputs may have been partially written, the
+    jobs should overwrite existing outputs (``-y``). The journal must not be run by several
+    processes at once.
+
+    :param path: path to the journal database file, created if it does not exist
+    :param int max_workers: maximum number of concurrently running processes; by default the
+        number of CPUs
+    :param float timeout: maximum number of seconds a single job may run (see `FFmpegPool`)
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        max_workers: int | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        self.path = os.fspath(path)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY,"
+                " key TEXT NOT NULL UNIQUE,"
+                " args TEXT NOT NULL,"
+                " state TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " exit_code INTEGER,"
+                " error TEXT,"
+                " wall_time REAL,"
+                " updated_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)")
+            # Jobs left running by a process that stopped
+            connection.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?",
+                (PENDING, time.time(), RUNNING),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        return int(count)
+
+    def __enter__(self) -> JobQueue:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the journal."""
+        with self._lock:
+            self._connection.close()
+
+    def add(self, jobs: Iterable[FFmpeg] | Mapping[str, FFmpeg]) -> int:
+        """Add ``jobs`` to the journal as pending, skipping the ones already in it.
+
+        :param jobs: `FFmpeg` (or `FFprobe`) instances, keyed by the command line, or a mapping
+            of unique keys (e.g. the names of the outputs) to the instances
+        :return: number of jobs added
+        :rtype: int
+        """
+        items = jobs.items() if isinstance(jobs, Mapping) else ((job.cmd, job) for job in jobs)
+        now = time.time()
+        rows = [(key, json.dumps(job._cmd), PENDING, now) for key, job in items]
+        with self._lock, self._connection as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO jobs (key, args, state, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            return connection.total_changes - before
+
+    def entries(self, state: str | None = None) -> list[JournalEntry]:
+        """Return the journaled jobs in the order they were added.
+
+        :param str state: return only the jobs in this state; by default all the jobs are returned
+        :rtype: list
+        """
+        query = f"SELECT {', '.join(JournalEntry.__slots__)} FROM jobs"
+        parameters: tuple[str, ...] = ()
+        if state is not None:
+            query += " WHERE state = ?"
+            parameters = (state,)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY id", parameters).fetchall()
+        return [_entry(row) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of jobs in every state.
+
+        :rtype: dict
+        """
+        counts = dict.fromkeys((PENDING, RUNNING, DONE, FAILED), 0)
+        with self._lock:
+            rows = self._connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state")
+            counts.update(rows)
+        return counts
+
+    def run(self, retry_failed: bool = True, **kwargs: Any) -> Generator[JournalEntry, None, None]:
+        """Execute the pending jobs, and the failed ones unless ``retry_failed`` is `False`.
+
+        Yields the updated `JournalEntry` of every job as soon as it completes or fails. A failing
+        job does not stop the others. If the iteration is abandoned, the jobs still running are
+        killed and left pending.
+
+        :param bool retry_failed: whether to run the jobs that failed before again
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run` of every job; ``stderr`` is
+            captured with `TailCapture` by default, so that errors are recorded with its tail
+        :return: an iterator over the entries of the executed jobs
+        :rtype: iterator
+        """
+        states = (PENDING, FAILED) if retry_failed else (PENDING,)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id, args FROM jobs WHERE state IN ({', '.join('?' * len(states))})"
+                " ORDER BY id",
+                states,
+            ).fetchall()
+        ids = [job_id for job_id, _ in rows]
+        jobs = [FFmpeg._from_cmd(json.loads(args)) for _, args in rows]
+
+        pool = _JournalPool(self, ids)
+        try:
+            for result in pool.run(jobs, ordered=False, **{"stderr": TailCapture(), **kwargs}):
+                yield self._finish(ids[result.index], result)
+        finally:
+            with self._lock, self._connection as connection:
+                connection.executemany(
+                    "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ? AND state = ?",
+                    [(PENDING, time.time(), job_id, RUNNING) for job_id in ids],
+                )
+
+    def _start(self, job_id: int) -> None:
+        with self._lock, self._connection as connection:
+            connection.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, exit_code = NULL,"
+                " error = NULL, wall_time = NULL, updated_at = ? WHERE id = ?",
+                (RUNNING, time.time(), job_id),
+            )
+
+    def _finish(self, job_id: int, result: JobResult) -> JournalEntry:
+        process, stats = result.job.process, result.job.stats
+        state = DONE if result.ok else FAILED
+        error = None if result.ok else f"{type(result.error).__name__}: {result.error}"
+        with self._lock, self._connection as connection:
+            connection.execute(
+                "UPDATE jobs SET state = ?, exit_code = ?, error = ?, wall_time = ?,"
+                " updated_at = ? WHERE id = ?",
+                (
+                    state,
+                    process.returncode if process is not None else None,
+                    error,
+                    stats.wall_time if stats is not None else None,
+                    time.time(),
+                    job_id,
+                ),
+            )
+            row = connection.execute(
+                f"SELECT {', '.join(JournalEntry.__slots__)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _entry(row)
+
+
+class _JournalPool(FFmpegPool):
+    """`FFmpegPool` recording the start of every job in the journal of ``queue``."""
+
+    def __init__(self, queue: JobQueue, ids: list[int]) -> None:
+        super().__init__(max_workers=queue.max_workers, timeout=queue.timeout)
+        self._queue = queue
+        self._ids = ids
+
+    def _run_job(self, index: int, job: FFmpeg, kwargs: dict[str, Any]) -> JobResult:
+        self._queue._start(self._ids[index])
+        return super()._run_job(index, job, kwargs)
+
+
+def _entry(row: tuple[Any, ...]) -> JournalEntry:
+    job_id, key, args, *rest = row
+    return JournalEntry(job_id, key, tuple(json.loads(args)), *rest)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from .ffmpy import FFmpeg, _FrozenSlots, _normalize_options
+
+
+@dataclass(frozen=True)
+class Rendition(_FrozenSlots):
+    """One output of a `Ladder`: the decoded video scaled to a size and encoded with options.
+
+    If only one of ``width`` and ``height`` is given, the other one is computed keeping the
+    aspect ratio (and rounded to an even number, as most encoders require); if neither is given
+    the video is not scaled.
+
+    >>> Rendition('720p.mp4', height=720, options='-c:v libx264 -b:v 3M -maxrate 3M -bufsize 6M')
+
+    :param output: path (or URL) of the output
+    :param int width: width of the video in pixels
+    :param int height: height of the video in pixels
+    :param options: options of the output (e.g. ``-c:v libx264 -b:v 3M -c:a aac``)
+    :param str filters: filters applied to the video after scaling (e.g. ``fps=30``)
+    :param bool audio: whether to include the audio of the input
+    """
+
+    __slots__ = ("output", "width", "height", "options", "filters", "audio")
+
+    output: str
+    width: int | None
+    height: int | None
+    options: tuple[str, ...]
+    filters: str | None
+    audio: bool
+
+    def __init__(
+        self,
+        output: str | os.PathLike[str],
+        width: int | None = None,
+        height: int | None = None,
+        options: Sequence[str] | str | None = None,
+        filters: str | None = None,
+        audio: bool = True,
+    ) -> None:
+        object.__setattr__(self, "output", os.fspath(output))
+        object.__setattr__(self, "width", width)
+        object.__setattr__(self, "height", height)
+        object.__setattr__(self, "options", tuple(_normalize_options(options, split_mixed=True)))
+        object.__setattr__(self, "filters", filters)
+        object.__setattr__(self, "audio", audio)
+
+    def _filters(self) -> list[str]:
+        """Return the filters of the branch of the filter graph producing the video."""
+        filters = []
+        if self.width is not None or self.height is not None:
+            width = -2 if self.width is None else self.width
+            height = -2 if self.height is None else self.height
+            filters.append(f"scale={width}:{height}")
+        if self.filters:
+            filters.append(self.filters)
+        return filters
+
+
+class Ladder:
+    """Encode one input into several renditions (e.g. an ABR ladder) decoding it only once.
+
+    Running a separate FFmpeg process per rendition demuxes and decodes the input once for every
+    rendition. A ladder is compiled into a single command whose ``-filter_complex`` graph splits
+    the decoded first video stream into a branch per rendition, scales and filters every branch
+    and maps it to its own output, so the input is read and decoded once for all of them:
+
+    >>> ladder = Ladder('master.mov', [
+    ...     Rendition('1080p.mp4', height=1080, options='-c:v libx264 -b:v 6M -c:a aac'),
+    ...     Rendition('720p.mp4', height=720, options='-c:v libx264 -b:v 3M -c:a aac'),
+    ...     Rendition('360p.mp4', height=360, options='-c:v libx264 -b:v 800k -c:a aac'),
+    ... ], filters='yadif')
+    >>> ladder.run()
+
+    :param input: path (or URL) of the input
+    :param renditions: the `Rendition` of every output
+    :param input_options: options of the input (e.g. ``-hwaccel auto``)
+    :param str filters: filters applied to the decoded video before it is split (e.g. ``yadif``)
+    :param str executable: path to ffmpeg executable
+    :param global_options: global options of the ffmpeg process (e.g. ``-y -v error``)
+    :raise: `ValueError` in case ``renditions`` is empty or two renditions have the same output
+    """
+
+    def __init__(
+        self,
+        input: str | os.PathLike[str],
+        renditions: Sequence[Rendition],
+        input_options: Sequence[str] | str | None = None,
+        filters: str | None = None,
+        executable: str = "ffmpeg",
+        global_options: Sequence[str] | str | None = None,
+    ) -> None:
+        if not renditions:
+            raise ValueError("renditions must not be empty")
+        outputs = [rendition.output for rendition in renditions]
+        if len(set(outputs)) != len(outputs):
+            raise ValueError("Every rendition must have a different output")
+
+        self.input = os.fspath(input)
+        self.renditions = list(renditions)
+        self.input_options = _normalize_options(input_options, split_mixed=True)
+        self.filters = filters
+        self.executable = executable
+        self.global_options = _normalize_options(global_options, split_mixed=True)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self.input!r} -> {len(self.renditions)} outputs>"
+
+    @property
+    def filter_graph(self) -> str:
+        """The ``-filter_complex`` graph producing the video of the renditions.
+
+        The video of the ``N``-th rendition is labelled ``[vN]``.
+        """
+        count = len(self.renditions)
+        head = [self.filters] if self.filters else []
+        if count > 1:
+            head.append(f"split={count}")
+        chains = []
+        sources = ["[0:v:0]"]
+        if head:
+            sources = [f"[s{index}]" for index in range(count)]
+            chains.append(f"[0:v:0]{','.join(head)}{''.join(sources)}")
+        for index, (source, rendition) in enumerate(zip(sources, self.renditions)):
+            chains.append(f"{source}{','.join(rendition._filters() or ['null'])}[v{index}]")
+        return ";".join(chains)
+
+    def ffmpeg(self) -> FFmpeg:
+        """Return the `FFmpeg` instance encoding all the renditions."""
+        outputs = {}
+        for index, rendition in enumerate(self.renditions):
+            maps = ["-map", f"[v{index}]"]
+            if rendition.audio:
+                maps += ["-map", "0:a:0?"]
+            outputs[rendition.output] = [*maps, *rendition.options]
+        return FFmpeg(
+            executable=self.executable,
+            global_options=[*self.global_options, "-filter_complex", self.filter_graph],
+            inputs={self.input: self.input_options},
+            outputs=outputs,
+        )
+
+    def run(self, **kwargs: Any) -> tuple[bytes | None, bytes | None]:
+        """Encode all the renditions with `FFmpeg.run`.
+
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run`
+        :return: a 2-tuple containing ``stdout`` and ``stderr`` of the process
+        :rtype: tuple
+        :raise: `FFRuntimeError` in case FFmpeg exits with a non-zero code
+        """
+        return self.ffmpeg().run(**kwargs)
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import contextlib
+import subprocess
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Mapping, Sequence, Union
+
+from .capture import TailCapture, _log_counts, _RingBuffer
+from .ffmpy import (
+    FFmpeg,
+    FFRuntimeError,
+    InputData,
+    _kill,
+    _len,
+    _read_into,
+    _safe_decode,
+    _start_thread,
+    _tail_capture,
+    _write_input,
+)
+from .progress import _ProgressPipe
+from .stats import _StatsRecorder, _wait
+
+if TYPE_CHECKING:
+    from psutil import Popen
+
+_Process = Union[subprocess.Popen, "Popen"]
+
+
+class Pipeline:
+    """A chain of `FFmpeg`/`FFprobe` commands, each reading the ``stdout`` of the previous one.
+
+    The commands are connected with OS pipes, like ``ffmpeg ... | ffmpeg ...`` in a shell: the
+    data passed between them never goes through Python and all of them run concurrently. Only
+    ``input_data`` of the first command and ``stdout`` of the last one are handled by `run`.
+    Pipelines are usually created with `FFmpeg.pipe_to`:
+
+    >>> decode = FFmpeg(inputs={'input.mp4': None}, outputs={'pipe:1': '-f nut'})
+    >>> encode = FFmpeg(inputs={'pipe:0': '-f nut'}, outputs={'output.mkv': '-c:v libx264'})
+    >>> decode.pipe_to(encode).cmd
+    'ffmpeg -i input.mp4 -f nut pipe:1 | ffmpeg -f nut -i pipe:0 -c:v libx264 output.mkv'
+
+    After a run, ``process`` and ``stats`` of every stage refer to its own process.
+
+    :param iterable stages: the commands in the order the data flows through them
+    :raise: `ValueError` in case no stages are given
+    """
+
+    def __init__(self, stages: Iterable[FFmpeg]) -> None:
+        self.stages = list(stages)
+        if not self.stages:
+            raise ValueError("A pipeline must have at least one stage")
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self.cmd!r}>"
+
+    @property
+    def cmd(self) -> str:
+        """The command lines of the stages joined with ``|``."""
+        return " | ".join(stage.cmd for stage in self.stages)
+
+    def pipe_to(self, other: FFmpeg | Pipeline) -> Pipeline:
+        """Return a new pipeline feeding ``stdout`` of this one into ``stdin`` of `other`.
+
+        :param other: an `FFmpeg` instance or a `Pipeline` to append
+        :return: a new `Pipeline`
+        :rtype: Pipeline
+        """
+        stages = other.stages if isinstance(other, Pipeline) else [other]
+        return Pipeline([*self.stages, *stages])
+
+    def run(
+        self,
+        input_data: InputData = None,
+        stdout: IO | int | None = None,
+        stderr: IO | int | TailCapture | None = None,
+        env: Mapping[str, str] | None = None,
+        **kwargs: Any,
+    ) -> tuple[bytes | None, list[bytes | None]]:
+        """Execute all the stages concurrently and wait for all of them to exit.
+
+        ``input_data`` is written to ``stdin`` of the first stage and ``stdout`` applies to the
+        last stage, as in `FFmpeg.run`. ``stderr``, ``env`` and ``kwargs`` apply to every stage;
+        a `TailCapture` retains the tail of ``stderr`` of each stage separately.
+
+        When a stage exits early, the stage writing to it gets a broken pipe and the stage
+        reading from it gets the end of its input, so a failure anywhere brings the whole
+        pipeline down without any of the stages being killed.
+
+        :param input_data: input data for the first stage as bytes, a file object opened in binary
+            mode or an iterable of bytes chunks
+        :param stdout: redirect ``stdout`` of the last stage there (default is `None` which means
+            no redirection)
+        :param stderr: redirect ``stderr`` of every stage there (default is `None` which means no
+            redirection)
+        :param env: custom environment for the processes
+        :param kwargs: any other keyword arguments to be forwarded to `subprocess.Popen
+            <https://docs.python.org/3/library/subprocess.html#subprocess.Popen>`_
+        :return: a 2-tuple containing ``stdout`` of the last stage and a list of ``stderr`` of
+            every stage
+        :rtype: tuple
+        :raise: `FFPipelineError` in case any of the stages exits with a non-zero code;
+            `FFExecutableNotFoundError` in case the executable of any of the stages was not found
+        """
+        processes: list[_Process] = []
+        recorders: list[_StatsRecorder] = []
+        tails: list[_RingBuffer | None] = []
+        try:
+            stdin: IO | int = subprocess.PIPE
+            for index, stage in enumerate(self.stages):
+                last = index == len(self.stages) - 1
+                stage_stderr, tail = _tail_capture(stderr)
+                recorder = _StatsRecorder()
+                stage.stats = None
+                process = stage._popen(
+                    _ProgressPipe(None),
+                    None,
+                    tail,
+                    stdin=stdin,
+                    stdout=stdout if last else subprocess.PIPE,
+                    stderr=stage_stderr,
+                    env=env,
+                    **kwargs,
+                )
+                stage.process = process
+                recorder.track(process)
+                processes.append(process)
+                recorders.append(recorder)
+                tails.append(tail)
+                if not isinstance(stdin, int):
+                    # Only the child reads from the pipe now, so that it gets EOF (and the stage
+                    # before it a broken pipe) when the other end goes away
+                    stdin.close()
+                if process.stdout is not None:
+                    stdin = process.stdout
+        except BaseException:
+            for process, recorder in zip(processes, recorders):
+                _kill(process)
+                _close_pipes(process)
+                _wait(process, recorder)
+            raise
+
+        stdout_chunks: list[bytes] = []
+        stderr_chunks: list[list[bytes]] = [[] for _ in processes]
+        input_errors: list[BaseException] = []
+        threads = [_start_thread(_write_input, processes[0], input_data, input_errors, recorders[0])]
+        if processes[-1].stdout is not None:
+            threads.append(_start_thread(_read_into, processes[-1].stdout, stdout_chunks.append))
+        for process, chunks, tail in zip(processes, stderr_chunks, tails):
+            if process.stderr is not None:
+                sink: Callable[[bytes], Any] = chunks.append if tail is None else tail.write
+                threads.append(_start_thread(_read_into, process.stderr, sink))
+
+        try:
+            for thread in threads:
+                thread.join()
+        except BaseException:
+            for process in processes:
+                _kill(process)
+            raise
+        finally:
+            for process, recorder in zip(processes, recorders):
+                _wait(process, recorder)
+
+        o_stdout = b"".join(stdout_chunks) if processes[-1].stdout is not None else None
+        o_stderrs: list[bytes | None] = []
+        for stage, process, recorder, chunks, tail in zip(
+            self.stages, processes, recorders, stderr_chunks, tails
+        ):
+            if tail is not None:
+                o_stderrs.append(tail.getvalue())
+            else:
+                o_stderrs.append(b"".join(chunks) if process.stderr is not None else None)
+            stage.stats = recorder.finish(
+                _len(o_stdout) if process is processes[-1] else None,
+                tail.total_bytes if tail is not None else _len(o_stderrs[-1]),
+                _log_counts(tail),
+            )
+
+        if input_errors:
+            raise input_errors[0]
+        exit_codes = [process.returncode for process in processes]
+        if any(exit_codes):
+            raise FFPipelineError(
+                [stage.cmd for stage in self.stages], exit_codes, o_stdout, o_stderrs
+            )
+        return o_stdout, o_stderrs
+
+
+class FFPipelineError(FFRuntimeError):
+    """Raise when any stage of a `Pipeline` exits with a non-zero code.
+
+    In addition to the attributes of `FFRuntimeError`, the exception object contains the command
+    line of every stage as ``cmds``, their exit codes as ``exit_codes`` and their ``stderr`` as
+    ``stderrs``. Like a shell with ``pipefail`` set, ``exit_code`` and ``stderr`` are the ones of
+    the last stage that failed; ``cmd`` is the whole pipeline.
+    """
+
+    def __init__(
+        self,
+        cmds: Sequence[str],
+        exit_codes: Sequence[int],
+        stdout: bytes | None,
+        stderrs: Sequence[bytes | None],
+    ) -> None:
+        failed = max(index for index, code in enumerate(exit_codes) if code)
+        super().__init__(" | ".join(cmds), exit_codes[failed], stdout, stderrs[failed])
+        self.cmds = list(cmds)
+        self.exit_codes = list(exit_codes)
+        self.stderrs = list(stderrs)
+
+        sections = [
+            f"`{self.cmd}` exited with statuses {', '.join(map(str, exit_codes))}",
+            f"STDOUT:\n{_safe_decode(stdout)}",
+        ]
+        for index, (cmd, stderr) in enumerate(zip(cmds, stderrs)):
+            sections.append(f"STDERR of stage {index} (`{cmd}`):\n{_safe_decode(stderr)}")
+        self.args = ("\n\n".join(sections),)
+
+
+def _close_pipes(process: _Process) -> None:
+    for stream in (process.stdin, process.stdout, process.stderr):
+        if stream is not None:
+            with contextlib.suppress(OSError):
+                stream.close()
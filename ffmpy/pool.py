@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Generator, Iterable, Sequence
+
+from .ffmpy import FFmpeg, _FrozenSlots, _kill, _spawn_listener
+
+if TYPE_CHECKING:
+    import asyncio
+    import subprocess
+
+    from psutil import Popen
+
+
+@dataclass(frozen=True)
+class JobResult(_FrozenSlots):
+    """The outcome of a single job executed by `FFmpegPool`."""
+
+    __slots__ = ("index", "job", "stdout", "stderr", "error")
+
+    #: position of the job in the sequence passed to the pool
+    index: int
+    #: the `FFmpeg` (or `FFprobe`) instance that was executed
+    job: FFmpeg
+    #: ``stdout`` of the process as returned by `FFmpeg.run`
+    stdout: bytes | None
+    #: ``stderr`` of the process as returned by `FFmpeg.run`
+    stderr: bytes | None
+    #: the exception the job failed with (e.g. `FFRuntimeError` or `FFTimeoutError`), if any
+    error: BaseException | None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the job completed successfully."""
+        return self.error is None
+
+
+class FFBatchError(Exception):
+    """Raise when one or more jobs executed by `run_many` have failed.
+
+    The exception object contains the ``results`` of all the jobs (in the order the jobs were
+    passed) and the failed subset of them as ``errors``; the original exception of every failed
+    job (e.g. `FFRuntimeError` with its ``stdout`` and ``stderr``) is available as its ``error``.
+    """
+
+    def __init__(self, results: Sequence[JobResult]) -> None:
+        self.results = list(results)
+        self.errors = [result for result in self.results if not result.ok]
+
+        lines = [f"{len(self.errors)} of {len(self.results)} jobs failed"]
+        for result in self.errors:
+            summary = str(result.error).splitlines()[0] if str(result.error) else ""
+            lines.append(f"  [{result.index}] {type(result.error).__name__}: {summary}")
+
+        super().__init__("\n".join(lines))
+
+
+class FFmpegPool:
+    """Execute many `FFmpeg`/`FFprobe` instances concurrently with bounded parallelism.
+
+    At most ``max_workers`` FFmpeg processes are running at any time. Jobs are executed either
+    in a pool of threads (`FFmpegPool.run`), each thread blocking in `FFmpeg.run`, or on an
+    event loop (`FFmpegPool.run_async`) using `FFmpeg.run_async`, which needs no threads at all.
+
+    :param int max_workers: maximum number of concurrently running processes; by default the
+        number of CPUs
+    :param float timeout: maximum number of seconds a single job may run; a job running longer is
+        stopped and fails with `FFTimeoutError` (see ``timeout`` of `FFmpeg.run`); by default
+        jobs may run indefinitely. Pass ``stall_timeout`` to `FFmpegPool.run` to also stop jobs
+        that make no progress.
+    """
+
+    def __init__(self, max_workers: int | None = None, timeout: float | None = None) -> None:
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def run(
+        self,
+        jobs: Iterable[FFmpeg],
+        ordered: bool = True,
+        **kwargs: Any,
+    ) -> Generator[JobResult, None, None]:
+        """Execute ``jobs`` in a pool of threads.
+
+        Yields a `JobResult` for every job, either in the order the jobs were passed
+        (``ordered=True``) or as soon as each of them completes (``ordered=False``). A failing job
+        does not stop the others; its exception is stored in the result.
+
+        :param iterable jobs: `FFmpeg` instances to execute
+        :param bool ordered: whether to yield the results in the order of ``jobs``
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run` of every job
+        :return: an iterator over job results
+        :rtype: iterator
+        """
+        jobs = list(jobs)
+        submissions = [_Submission() for _ in jobs]
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            futures = [
+                executor.submit(self._run_submission, submission, index, job, kwargs)
+                for index, (submission, job) in enumerate(zip(submissions, jobs))
+            ]
+            try:
+                if ordered:
+                    for future in futures:
+                        yield future.result()
+                else:
+                    for future in concurrent.futures.as_completed(futures):
+                        yield future.result()
+            finally:
+                for future, submission in zip(futures, submissions):
+                    if not future.cancel():
+                        submission.abandon()
+
+    async def run_async(
+        self,
+        jobs: Iterable[FFmpeg],
+        ordered: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[JobResult]:
+        """Execute ``jobs`` on the running event loop.
+
+        Asynchronous counterpart of `FFmpegPool.run`. If the iteration is abandoned, the jobs
+        still running are cancelled, which kills their processes.
+
+        :param iterable jobs: `FFmpeg` instances to execute
+        :param bool ordered: whether to yield the results in the order of ``jobs``
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run_async` of every job
+        :return: an asynchronous iterator over job results
+        :rtype: asynchronous iterator
+        """
+        import asyncio
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+        tasks = [
+            asyncio.ensure_future(self._run_job_async(semaphore, index, job, kwargs))
+            for index, job in enumerate(jobs)
+        ]
+        try:
+            if ordered:
+                for task in tasks:
+                    yield await task
+            else:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run_submission(
+        self, submission: _Submission, index: int, job: FFmpeg, kwargs: dict[str, Any]
+    ) -> JobResult:
+        _spawn_listener.callback = submission.spawned
+        try:
+            return self._run_job(index, job, kwargs)
+        finally:
+            _spawn_listener.callback = None
+
+    def _run_job(self, index: int, job: FFmpeg, kwargs: dict[str, Any]) -> JobResult:
+        try:
+            stdout, stderr = job.run(**{"timeout": self.timeout, **kwargs})
+        except Exception as e:
+            return JobResult(index, job, None, None, e)
+        return JobResult(index, job, stdout, stderr, None)
+
+    async def _run_job_async(
+        self,
+        semaphore: asyncio.Semaphore,
+        index: int,
+        job: FFmpeg,
+        kwargs: dict[str, Any],
+    ) -> JobResult:
+        async with semaphore:
+            try:
+                stdout, stderr = await job.run_async(**{"timeout": self.timeout, **kwargs})
+            except Exception as e:
+                return JobResult(index, job, None, None, e)
+        return JobResult(index, job, stdout, stderr, None)
+
+
+class _Submission:
+    """A job submitted by `FFmpegPool.run`, shared between the pool and the worker running it.
+
+    The process the job starts is recorded by `spawned` (rather than read from ``process`` of the
+    job, which may still hold the process of an earlier run of the same instance). `abandon` kills
+    the process, or has `spawned` kill it as soon as it is started.
+    """
+
+    def __init__(self) -> None:
+        self.process: subprocess.Popen | Popen | None = None
+        self.abandoned = False
+        self._lock = threading.Lock()
+
+    def spawned(self, process: subprocess.Popen | Popen) -> None:
+        with self._lock:
+            self.process = process
+            abandoned = self.abandoned
+        if abandoned:
+            _kill(process)
+
+    def abandon(self) -> None:
+        with self._lock:
+            self.abandoned = True
+            process = self.process
+        if process is not None:
+            _kill(process)
+
+
+def run_many(
+    jobs: Iterable[FFmpeg],
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> list[tuple[bytes | None, bytes | None]]:
+    """Execute ``jobs`` concurrently in a pool of threads and wait for all of them to complete.
+
+    A shortcut for `FFmpegPool.run` for the common case when the caller only needs the outputs.
+
+    :param iterable jobs: `FFmpeg` instances to execute
+    :param int max_workers: maximum number of concurrently running processes; by default the
+        number of CPUs
+    :param float timeout: maximum number of seconds a single job may run
+    :param kwargs: keyword arguments forwarded to `FFmpeg.run` of every job
+    :return: a list of ``(stdout, stderr)`` tuples in the order of ``jobs``
+    :rtype: list
+    :raise: `FFBatchError` in case any of the jobs failed, after all of them have completed
+    """
+    pool = FFmpegPool(max_workers=max_workers, timeout=timeout)
+    return _collect(list(pool.run(jobs, **kwargs)))
+
+
+async def run_many_async(
+    jobs: Iterable[FFmpeg],
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> list[tuple[bytes | None, bytes | None]]:
+    """Asynchronous counterpart of `run_many` using `FFmpeg.run_async`."""
+    pool = FFmpegPool(max_workers=max_workers, timeout=timeout)
+    return _collect([result async for result in pool.run_async(jobs, **kwargs)])
+
+
+def _collect(results: list[JobResult]) -> list[tuple[bytes | None, bytes | None]]:
+    if any(not result.ok for result in results):
+        raise FFBatchError(results)
+    return [(result.stdout, result.stderr) for result in results]
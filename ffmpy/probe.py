@@ -0,0 +1,539 @@
+from __future__ import annotations
+
+import abc
+import collections
+import fractions
+import json
+import os
+import threading
+import time
+import types
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Sequence
+
+from .ffmpy import _FrozenSlots
+
+#: ffprobe options producing the output `ProbeResult` is parsed from
+PROBE_OPTIONS = ("-v", "error", "-print_format", "json", "-show_format", "-show_streams")
+
+
+class _Tagged(_FrozenSlots):
+    """Base of the probed properties holding read-only ``tags``.
+
+    The tags are a `types.MappingProxyType`, so a result shared through a cache cannot be
+    modified by one of its users; as a proxy cannot be pickled, its state holds a copy of them.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = super().__getstate__()
+        state["tags"] = dict(state["tags"])
+        return state
+
+    def __setstate__(self, state: Mapping[str, Any]) -> None:
+        super().__setstate__({**state, "tags": types.MappingProxyType(state["tags"])})
+
+
+@dataclass(frozen=True)
+class StreamInfo(_Tagged):
+    """Properties of a single stream reported by ffprobe ``-show_streams``.
+
+    Values missing from ffprobe output (or reported as ``N/A``) are `None`.
+    """
+
+    __slots__ = (
+        "index",
+        "codec_type",
+        "codec_name",
+        "width",
+        "height",
+        "pix_fmt",
+        "frame_rate",
+        "sample_rate",
+        "channels",
+        "duration",
+        "bit_rate",
+        "tags",
+    )
+
+    #: index of the stream in the container
+    index: int
+    #: ``video``, ``audio``, ``subtitle``, ``data`` or ``attachment``
+    codec_type: str | None
+    #: short name of the codec (e.g. ``h264``)
+    codec_name: str | None
+    #: width of a video stream in pixels
+    width: int | None
+    #: height of a video stream in pixels
+    height: int | None
+    #: pixel format of a video stream (e.g. ``yuv420p``)
+    pix_fmt: str | None
+    #: average frame rate of a video stream in frames per second
+    frame_rate: float | None
+    #: sample rate of an audio stream in Hz
+    sample_rate: int | None
+    #: number of channels of an audio stream
+    channels: int | None
+    #: duration of the stream in seconds
+    duration: float | None
+    #: bitrate of the stream in bit/s
+    bit_rate: int | None
+    #: stream metadata (read-only)
+    tags: Mapping[str, str]
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[str, Any]) -> StreamInfo:
+        """Create a `StreamInfo` from a stream object of ffprobe JSON output."""
+        frame_rate = _to_rate(fields.get("avg_frame_rate")) or _to_rate(fields.get("r_frame_rate"))
+        return cls(
+            index=int(fields.get("index", 0)),
+            codec_type=fields.get("codec_type"),
+            codec_name=fields.get("codec_name"),
+            width=_to_int(fields.get("width")),
+            height=_to_int(fields.get("height")),
+            pix_fmt=fields.get("pix_fmt"),
+            frame_rate=frame_rate,
+            sample_rate=_to_int(fields.get("sample_rate")),
+            channels=_to_int(fields.get("channels")),
+            duration=_to_float(fields.get("duration")),
+            bit_rate=_to_int(fields.get("bit_rate")),
+            tags=types.MappingProxyType(dict(fields.get("tags", {}))),
+        )
+
+    def to_fields(self) -> dict[str, Any]:
+        """Convert the properties back to a stream object of ffprobe JSON output."""
+        return _present(
+            index=self.index,
+            codec_type=self.codec_type,
+            codec_name=self.codec_name,
+            width=self.width,
+            height=self.height,
+            pix_fmt=self.pix_fmt,
+            avg_frame_rate=self.frame_rate,
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+            duration=self.duration,
+            bit_rate=self.bit_rate,
+            tags=dict(self.tags),
+        )
+
+
+@dataclass(frozen=True)
+class FormatInfo(_Tagged):
+    """Properties of the container reported by ffprobe ``-show_format``.
+
+    Values missing from ffprobe output (or reported as ``N/A``) are `None`.
+    """
+
+    __slots__ = (
+        "filename",
+        "format_name",
+        "nb_streams",
+        "start_time",
+        "duration",
+        "size",
+        "bit_rate",
+        "tags",
+    )
+
+    #: name of the probed input
+    filename: str | None
+    #: comma separated short names of the format (e.g. ``mov,mp4,m4a,3gp,3g2,mj2``)
+    format_name: str | None
+    #: number of streams in the container
+    nb_streams: int | None
+    #: start time of the container in seconds
+    start_time: float | None
+    #: duration of the container in seconds
+    duration: float | None
+    #: size of the input in bytes
+    size: int | None
+    #: overall bitrate in bit/s
+    bit_rate: int | None
+    #: container metadata (read-only)
+    tags: Mapping[str, str]
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[str, Any]) -> FormatInfo:
+        """Create a `FormatInfo` from the format object of ffprobe JSON output."""
+        return cls(
+            filename=fields.get("filename"),
+            format_name=fields.get("format_name"),
+            nb_streams=_to_int(fields.get("nb_streams")),
+            start_time=_to_float(fields.get("start_time")),
+            duration=_to_float(fields.get("duration")),
+            size=_to_int(fields.get("size")),
+            bit_rate=_to_int(fields.get("bit_rate")),
+            tags=types.MappingProxyType(dict(fields.get("tags", {}))),
+        )
+
+    def to_fields(self) -> dict[str, Any]:
+        """Convert the properties back to the format object of ffprobe JSON output."""
+        return _present(
+            filename=self.filename,
+            format_name=self.format_name,
+            nb_streams=self.nb_streams,
+            start_time=self.start_time,
+            duration=self.duration,
+            size=self.size,
+            bit_rate=self.bit_rate,
+            tags=dict(self.tags),
+        )
+
+
+@dataclass(frozen=True)
+class ProbeResult(_FrozenSlots):
+    """Parsed output of ``ffprobe -print_format json -show_format -show_streams``."""
+
+    __slots__ = ("format", "streams")
+
+    #: properties of the container
+    format: FormatInfo
+    #: properties of the streams, in the order of their indices
+    streams: tuple[StreamInfo, ...]
+
+    @classmethod
+    def from_json(cls, data: bytes | str | Mapping[str, Any]) -> ProbeResult:
+        """Create a `ProbeResult` from ffprobe JSON output (raw or already decoded)."""
+        output: Mapping[str, Any] = json.loads(data) if isinstance(data, (bytes, str)) else data
+        return cls(
+            format=FormatInfo.from_fields(output.get("format", {})),
+            streams=tuple(StreamInfo.from_fields(stream) for stream in output.get("streams", ())),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the result back to the structure of ffprobe JSON output, holding only the
+        properties the result was parsed into."""
+        return {
+            "streams": [stream.to_fields() for stream in self.streams],
+            "format": self.format.to_fields(),
+        }
+
+    @property
+    def duration(self) -> float | None:
+        """Duration of the input in seconds, taken from the container or the longest stream."""
+        if self.format.duration is not None:
+            return self.format.duration
+        durations = [s.duration for s in self.streams if s.duration is not None]
+        return max(durations) if durations else None
+
+    @property
+    def video_streams(self) -> tuple[StreamInfo, ...]:
+        return tuple(s for s in self.streams if s.codec_type == "video")
+
+    @property
+    def audio_streams(self) -> tuple[StreamInfo, ...]:
+        return tuple(s for s in self.streams if s.codec_type == "audio")
+
+    @property
+    def video(self) -> StreamInfo | None:
+        """The first video stream, if any."""
+        return next(iter(self.video_streams), None)
+
+    @property
+    def audio(self) -> StreamInfo | None:
+        """The first audio stream, if any."""
+        return next(iter(self.audio_streams), None)
+
+
+@dataclass(frozen=True)
+class ProbeKey(_FrozenSlots):
+    """Identity of a probed file a cached `ProbeResult` is valid for.
+
+    Besides the absolute path, the key holds the inode, size and modification time of the file,
+    so that a replaced or modified file does not match the key of its previous version, and the
+    ffprobe executable and options used.
+    """
+
+    __slots__ = ("path", "inode", "size", "mtime_ns", "options")
+
+    path: str
+    inode: int
+    size: int
+    mtime_ns: int
+    #: ffprobe executable followed by the additional options
+    options: tuple[str, ...]
+
+    @classmethod
+    def from_path(cls, path: str, options: Sequence[str] = ()) -> ProbeKey | None:
+        """Create the key of a local file; `None` if `path` cannot be ``stat``-ed (e.g. a URL)."""
+        try:
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return cls(
+            os.path.abspath(path), stat.st_ino, stat.st_size, stat.st_mtime_ns, tuple(options)
+        )
+
+
+class BaseProbeCache(abc.ABC):
+    """Base class of `ProbeResult` caches used by `FFprobe.probe`.
+
+    Subclasses implement `get_many`, `put_many` and `clear`; single item access is built on top
+    of them. Subclasses count cache ``hits`` and ``misses``.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: ProbeKey) -> ProbeResult | None:
+        """Return the result cached for ``key`` or `None`."""
+        return self.get_many([key]).get(key)
+
+    def put(self, key: ProbeKey, result: ProbeResult) -> None:
+        """Cache ``result`` for ``key``."""
+        self.put_many({key: result})
+
+    @abc.abstractmethod
+    def get_many(self, keys: Iterable[ProbeKey]) -> dict[ProbeKey, ProbeResult]:
+        """Return the cached results for those of ``keys`` that are in the cache."""
+
+    @abc.abstractmethod
+    def put_many(self, results: Mapping[ProbeKey, ProbeResult]) -> None:
+        """Cache all the ``results``."""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove all the cached results and reset the counters."""
+
+
+class ProbeCache(BaseProbeCache):
+    """Thread-safe, size-bounded in-memory LRU cache of `ProbeResult` objects.
+
+    :param int maxsize: maximum number of results kept; the least recently used ones are
+        discarded first
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be greater than 0")
+        super().__init__()
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict[ProbeKey, ProbeResult] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: Iterable[ProbeKey]) -> dict[ProbeKey, ProbeResult]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                result = self._entries.get(key)
+                if result is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    found[key] = result
+        return found
+
+    def put_many(self, results: Mapping[ProbeKey, ProbeResult]) -> None:
+        with self._lock:
+            for key, result in results.items():
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class SQLiteProbeCache(BaseProbeCache):
+    """Persistent cache of `ProbeResult` objects stored in an SQLite database file.
+
+    The cache survives process restarts, so after a restart only files that have actually
+    changed need to be probed again. One entry is stored per path and ffprobe options. An entry
+    whose inode, size or modification time no longer match the file is stale: it is never
+    returned and is removed as soon as it is looked up. Use `FFprobe.probe_many` (or
+    `get_many`) to look up many files with a few queries.
+
+    The database file can be shared by several processes. Entries not accessed for more than
+    ``max_age`` seconds and the least recently accessed entries in excess of ``max_entries`` are
+    evicted when the cache is opened, after every 1000 stored results and on `evict`.
+
+    :param path: path to the database file, created if it does not exist
+    :param int max_entries: maximum number of entries to keep; by default unlimited
+    :param float max_age: maximum number of seconds since the last access an entry is kept for;
+        by default unlimited
+    """
+
+    _EVICT_INTERVAL = 1000
+    # SQLite limits the number of parameters of a single statement
+    _BATCH_SIZE = 500
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        max_entries: int | None = None,
+        max_age: float | None = None,
+    ) -> None:
+        import sqlite3
+
+        super().__init__()
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stored = 0
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS probe_results ("
+                " path TEXT NOT NULL,"
+                " options TEXT NOT NULL,"
+                " inode INTEGER NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " result TEXT NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (path, options))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS probe_results_accessed_at ON probe_results (accessed_at)"
+            )
+        self.evict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM probe_results").fetchone()
+        return int(count)
+
+    def __enter__(self) -> SQLiteProbeCache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def get_many(self, keys: Iterable[ProbeKey]) -> dict[ProbeKey, ProbeResult]:
+        by_options: dict[tuple[str, ...], dict[str, ProbeKey]] = {}
+        for key in keys:
+            by_options.setdefault(key.options, {})[key.path] = key
+
+        found: dict[ProbeKey, ProbeResult] = {}
+        accessed: list[tuple[float, str, str]] = []
+        stale: list[tuple[str, str]] = []
+        now = time.time()
+        with self._lock, self._connection as connection:
+            for options, keys_by_path in by_options.items():
+                encoded_options = json.dumps(options)
+                paths = list(keys_by_path)
+                for start in range(0, len(paths), self._BATCH_SIZE):
+                    batch = paths[start : start + self._BATCH_SIZE]
+                    rows = connection.execute(
+                        "SELECT path, inode, size, mtime_ns, result FROM probe_results"
+                        f" WHERE options = ? AND path IN ({', '.join('?' * len(batch))})",
+                        (encoded_options, *batch),
+                    )
+                    for path, inode, size, mtime_ns, result in rows:
+                        key = keys_by_path[path]
+                        if (key.inode, key.size, key.mtime_ns) == (inode, size, mtime_ns):
+                            found[key] = ProbeResult.from_json(result)
+                            accessed.append((now, path, encoded_options))
+                        else:
+                            stale.append((path, encoded_options))
+
+            connection.executemany(
+                "UPDATE probe_results SET accessed_at = ? WHERE path = ? AND options = ?", accessed
+            )
+            connection.executemany("DELETE FROM probe_results WHERE path = ? AND options = ?", stale)
+            self.hits += len(found)
+            self.misses += sum(map(len, by_options.values())) - len(found)
+        return found
+
+    def put_many(self, results: Mapping[ProbeKey, ProbeResult]) -> None:
+        now = time.time()
+        rows = [
+            (
+                key.path,
+                json.dumps(key.options),
+                key.inode,
+                key.size,
+                key.mtime_ns,
+                json.dumps(result.to_dict()),
+                now,
+            )
+            for key, result in results.items()
+        ]
+        with self._lock, self._connection as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO probe_results VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._stored += len(rows)
+            evict = self._stored >= self._EVICT_INTERVAL
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """Remove the entries exceeding ``max_age`` and ``max_entries``.
+
+        :return: number of removed entries
+        :rtype: int
+        """
+        removed = 0
+        with self._lock, self._connection as connection:
+            self._stored = 0
+            if self.max_age is not None:
+                cursor = connection.execute(
+                    "DELETE FROM probe_results WHERE accessed_at < ?", (time.time() - self.max_age,)
+                )
+                removed += cursor.rowcount
+            if self.max_entries is not None:
+                cursor = connection.execute(
+                    "DELETE FROM probe_results WHERE rowid IN ("
+                    " SELECT rowid FROM probe_results"
+                    " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                removed += cursor.rowcount
+        return removed
+
+    def clear(self) -> None:
+        with self._lock, self._connection as connection:
+            connection.execute("DELETE FROM probe_results")
+            self.hits = 0
+            self.misses = 0
+
+
+#: the in-memory cache `FFprobe.probe` uses unless told otherwise
+default_cache = ProbeCache()
+
+
+def _present(**fields: Any) -> dict[str, Any]:
+    """Return ``fields`` without the ones that are `None`, as ffprobe leaves them out."""
+    return {name: value for name, value in fields.items() if value is not None}
+
+
+def _to_int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_rate(value: Any) -> float | None:
+    """Convert an ffprobe rational (e.g. ``30000/1001``) to a float; ``0/0`` becomes `None`."""
+    try:
+        rate = fractions.Fraction(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return float(rate) or None
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Iterable, Iterator, Mapping
+
+
+@dataclass(frozen=True)
+class Progress:
+    """A single progress report emitted by FFmpeg ``-progress`` option.
+
+    FFmpeg periodically writes a block of ``key=value`` lines terminated by a ``progress`` key.
+    Every block is converted into an instance of this class. Values FFmpeg reports as ``N/A``
+    are represented as `None`. All the keys of the block, including the ones without a dedicated
+    attribute (e.g. ``stream_0_0_q``), are available as strings in ``fields``.
+    """
+
+    __slots__ = (
+        "frame",
+        "fps",
+        "bitrate",
+        "total_size",
+        "out_time_us",
+        "dup_frames",
+        "drop_frames",
+        "speed",
+        "progress",
+        "fields",
+    )
+
+    #: number of frames processed so far
+    frame: int | None
+    #: current processing rate in frames per second
+    fps: float | None
+    #: current output bitrate in kbit/s
+    bitrate: float | None
+    #: size of the output written so far in bytes
+    total_size: int | None
+    #: timestamp of the output written so far in microseconds
+    out_time_us: int | None
+    #: number of duplicated frames
+    dup_frames: int | None
+    #: number of dropped frames
+    drop_frames: int | None
+    #: processing speed relative to real time (e.g. ``2.0`` means twice as fast as real time)
+    speed: float | None
+    #: ``continue`` for intermediate reports and ``end`` for the last one
+    progress: str
+    #: raw ``key=value`` pairs of the report
+    fields: Mapping[str, str]
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[str, str]) -> Progress:
+        """Create a `Progress` from the ``key=value`` pairs of one report block."""
+        return cls(
+            frame=_parse_int(fields.get("frame")),
+            fps=_parse_float(fields.get("fps")),
+            bitrate=_parse_float(fields.get("bitrate"), suffix="kbits/s"),
+            total_size=_parse_int(fields.get("total_size")),
+            out_time_us=_parse_int(fields.get("out_time_us")),
+            dup_frames=_parse_int(fields.get("dup_frames")),
+            drop_frames=_parse_int(fields.get("drop_frames")),
+            speed=_parse_float(fields.get("speed"), suffix="x"),
+            progress=fields.get("progress", ""),
+            fields=dict(fields),
+        )
+
+    @property
+    def out_time(self) -> float | None:
+        """Timestamp of the output written so far in seconds."""
+        return None if self.out_time_us is None else self.out_time_us / 1_000_000
+
+    @property
+    def done(self) -> bool:
+        """Whether this is the last report of the run."""
+        return self.progress == "end"
+
+
+def parse_progress(lines: Iterable[bytes | str]) -> Iterator[Progress]:
+    """Parse lines of FFmpeg ``-progress`` output into `Progress` reports.
+
+    :param iterable lines: lines of ``-progress`` output, e.g. a file object opened on the
+        progress pipe or file
+    :return: an iterator over the reports, yielded as soon as a block is complete
+    :rtype: iterator
+    """
+    parser = _ProgressParser()
+    for line in lines:
+        progress = parser.feed(line)
+        if progress is not None:
+            yield progress
+
+
+class _ProgressParser:
+    """Incrementally assemble ``key=value`` lines into `Progress` reports."""
+
+    __slots__ = ("_fields",)
+
+    def __init__(self) -> None:
+        self._fields: dict[str, str] = {}
+
+    def feed(self, line: bytes | str) -> Progress | None:
+        if isinstance(line, bytes):
+            line = line.decode(errors="replace")
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+
+        self._fields[key] = value.strip()
+        if key != "progress":
+            return None
+
+        progress = Progress.from_fields(self._fields)
+        self._fields = {}
+        return progress
+
+
+class _ProgressPipe:
+    """A pipe FFmpeg writes its ``-progress`` reports to.
+
+    The write end is passed to the FFmpeg process (via ``pass_fds``) and the read end is drained
+    either by a thread (`start`) or by a coroutine (`read_async`) which invoke the callback with
+    every complete report. An exception raised by the callback kills the process and is
+    re-raised by `raise_error`. If there is no callback, no pipe is created and all the methods
+    leave the command and the process untouched.
+    """
+
+    def __init__(self, callback: Callable[[Progress], object] | None) -> None:
+        self.callback = callback
+        self.read_fd, self.write_fd = os.pipe() if callback is not None else (-1, -1)
+        self.error: BaseException | None = None
+        self._thread: threading.Thread | None = None
+
+    def command(self, cmd: list[str]) -> list[str]:
+        """Return `cmd` with the ``-progress`` global option pointing to this pipe."""
+        if self.callback is None:
+            return cmd
+        return [cmd[0], "-progress", f"pipe:{self.write_fd}", *cmd[1:]]
+
+    def popen_kwargs(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Return Popen `kwargs` with the write end of the pipe added to ``pass_fds``."""
+        if self.callback is None:
+            return kwargs
+        return {**kwargs, "pass_fds": (*kwargs.get("pass_fds", ()), self.write_fd)}
+
+    def close_write_end(self) -> None:
+        """Close the parent's copy of the write end, so that EOF follows the process exit."""
+        if self.write_fd >= 0:
+            os.close(self.write_fd)
+            self.write_fd = -1
+
+    def close(self) -> None:
+        self.close_write_end()
+        if self.read_fd >= 0:
+            os.close(self.read_fd)
+            self.read_fd = -1
+
+    def start(self, kill: Callable[[], object]) -> None:
+        self.close_write_end()
+        if self.callback is None:
+            return
+        stream = os.fdopen(self.read_fd, "rb")
+        self.read_fd = -1
+        self._thread = threading.Thread(
+            target=self._read, args=(stream, self.callback, kill), daemon=True
+        )
+        self._thread.start()
+
+    def join(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+
+    def _read(
+        self,
+        stream: IO[bytes],
+        callback: Callable[[Progress], object],
+        kill: Callable[[], object],
+    ) -> None:
+        with stream:
+            try:
+                for progress in parse_progress(stream):
+                    callback(progress)
+            except BaseException as e:
+                self.error = e
+                kill()
+                # Keep draining so that FFmpeg is never blocked on a full progress pipe
+                for _ in stream:
+                    pass
+
+    async def read_async(self, kill: Callable[[], object]) -> None:
+        self.close_write_end()
+        callback = self.callback
+        if callback is None:
+            return
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        stream = os.fdopen(self.read_fd, "rb", 0)
+        self.read_fd = -1
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), stream
+        )
+        parser = _ProgressParser()
+        try:
+            async for line in reader:
+                progress = parser.feed(line)
+                if progress is not None and self.error is None:
+                    try:
+                        callback(progress)
+                    except Exception as e:
+                        self.error = e
+                        kill()
+        finally:
+            transport.close()
+
+    def raise_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+
+def _parse_int(value: str | None) -> int | None:
+    """Parse an integer progress value; ``N/A`` and other non-numbers become `None`."""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _parse_float(value: str | None, suffix: str = "") -> float | None:
+    """Parse a float progress value, stripping the unit `suffix` (e.g. ``x`` or ``kbits/s``)."""
+    if value is None:
+        return None
+    if suffix and value.endswith(suffix):
+        value = value[: -len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return None
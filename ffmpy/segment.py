@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import functools
+import os
+import subprocess
+import tempfile
+from typing import Any, Sequence
+
+from .capture import TailCapture
+from .ffmpy import FFmpeg, FFprobe, _normalize_options
+from .pool import run_many
+from .spill import _quote
+
+#: ffprobe options listing the timestamps and flags of the packets of the first video stream
+KEYFRAME_OPTIONS = (
+    *("-v", "error", "-select_streams", "v:0"),
+    *("-show_entries", "packet=pts_time,flags", "-of", "csv=p=0"),
+)
+# File name extensions of the segment formats not named after their usual extension
+_EXTENSIONS = {"matroska": "mkv", "mpegts": "ts", "mpeg": "mpg"}
+
+
+class SegmentedTranscode:
+    """Transcode a single long input in segments encoded concurrently.
+
+    A single FFmpeg process often cannot keep all the cores of a large machine busy, as many
+    encoders scale to a few threads only. The input is split into ``segments`` time ranges
+    starting at keyframes, the video of every range is encoded by a separate FFmpeg process, at
+    most ``max_workers`` of them running at once, and the encoded segments are joined with the
+    `concat demuxer <https://ffmpeg.org/ffmpeg-formats.html#concat>`_ without being encoded
+    again:
+
+    >>> SegmentedTranscode(
+    ...     'input.mov', 'output.mp4', '-c:v libx264 -crf 20', audio_options='-c:a aac', segments=16
+    ... ).run()
+
+    Only the first video stream is split. The audio is taken from the input as a whole when the
+    segments are joined and processed with ``audio_options``, since audio encoders such as AAC
+    add priming samples to the start of every segment, which would be audible at the joins.
+    Other streams (e.g. subtitles) are dropped.
+
+    The segments are written to a temporary directory created in ``tmp_dir``, which is removed
+    when the transcoding completes or fails.
+
+    :param input: path of the input
+    :param output: path of the output
+    :param output_options: options the video is encoded with (e.g. ``-c:v libx264 -crf 20``)
+    :param input_options: options of the input (e.g. ``-hwaccel cuda``)
+    :param int segments: number of segments; by default ``max_workers``. Fewer segments are
+        encoded if the input has too few keyframes.
+    :param int max_workers: maximum number of concurrently running processes; by default the
+        number of CPUs
+    :param audio_options: options of the audio of the output; by default the audio of the input
+        is copied, ``-an`` drops it
+    :param str segment_format: format (muxer) of the intermediate segments
+    :param str executable: path to ffmpeg executable
+    :param str probe_executable: path to ffprobe executable
+    :param global_options: global options of every ffmpeg process (e.g. ``-y -v error``)
+    :param tmp_dir: directory to create the temporary directory in; by default the system's
+        temporary directory is used
+    :raise: `ValueError` in case ``segments`` is less than 1
+    """
+
+    def __init__(
+        self,
+        input: str | os.PathLike[str],
+        output: str | os.PathLike[str],
+        output_options: Sequence[str] | str | None = None,
+        input_options: Sequence[str] | str | None = None,
+        segments: int | None = None,
+        max_workers: int | None = None,
+        audio_options: Sequence[str] | str | None = "-c:a copy",
+        segment_format: str = "matroska",
+        executable: str = "ffmpeg",
+        probe_executable: str = "ffprobe",
+        global_options: Sequence[str] | str | None = None,
+        tmp_dir: str | os.PathLike[str] | None = None,
+    ) -> None:
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if segments is None:
+            segments = max_workers
+        if segments < 1:
+            raise ValueError("segments must be greater than 0")
+
+        self.input = os.fspath(input)
+        self.output = os.fspath(output)
+        self.output_options = _normalize_options(output_options, split_mixed=True)
+        self.input_options = _normalize_options(input_options, split_mixed=True)
+        self.segments = segments
+        self.max_workers = max_workers
+        self.audio_options = _normalize_options(audio_options, split_mixed=True)
+        self.segment_format = segment_format
+        self.executable = executable
+        self.probe_executable = probe_executable
+        self.global_options = _normalize_options(global_options, split_mixed=True)
+        self.tmp_dir = tmp_dir
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self.input!r} -> {self.output!r}>"
+
+    @functools.cached_property
+    def ranges(self) -> list[tuple[float, float | None]]:
+        """Time ranges of the segments as ``(start, end)`` in seconds; the last end is `None`.
+
+        The input is probed the first time the ranges are accessed: split points are spread
+        evenly over its duration and moved to the nearest keyframe of the first video stream, so
+        that no segment has to decode frames preceding its start.
+
+        :raise: `ValueError` in case the duration or the keyframes of the input could not be
+            probed; `FFRuntimeError` in case ffprobe exits with a non-zero code
+        """
+        result = FFprobe.probe(self.input, executable=self.probe_executable)
+        if result.duration is None:
+            raise ValueError(f"Could not probe the duration of {self.input!r}")
+        keyframes = self._probe_keyframes(offset=result.format.start_time or 0.0)
+        if not keyframes:
+            raise ValueError(f"No video keyframes found in {self.input!r}")
+
+        points = _split_points(result.duration, keyframes, self.segments)
+        return list(zip([0.0, *points], [*points, None]))
+
+    def run(self, **kwargs: Any) -> None:
+        """Encode the segments concurrently and join them into the output.
+
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run` of every process (e.g.
+            ``timeout``)
+        :raise: `FFBatchError` in case encoding any of the segments failed; `FFRuntimeError` in
+            case joining them failed
+        """
+        ranges = self.ranges
+        extension = _EXTENSIONS.get(self.segment_format, self.segment_format)
+        with tempfile.TemporaryDirectory(prefix="ffmpy-", dir=self.tmp_dir) as directory:
+            paths = [
+                os.path.join(directory, f"{index:05d}.{extension}") for index in range(len(ranges))
+            ]
+            run_many(
+                [
+                    self._encode_segment(path, start, end)
+                    for path, (start, end) in zip(paths, ranges)
+                ],
+                max_workers=self.max_workers,
+                **kwargs,
+            )
+
+            concat_list = os.path.join(directory, "segments.txt")
+            with open(concat_list, "w", encoding="utf-8") as f:
+                f.writelines(f"file {_quote(path)}\n" for path in paths)
+            self._join(concat_list).run(**kwargs)
+
+    def _encode_segment(self, path: str, start: float, end: float | None) -> FFmpeg:
+        input_options = list(self.input_options)
+        if start > 0:
+            input_options += ["-ss", f"{start:.6f}"]
+        if end is not None:
+            input_options += ["-t", f"{end - start:.6f}"]
+        return FFmpeg(
+            executable=self.executable,
+            global_options=self.global_options,
+            inputs={self.input: input_options},
+            outputs={
+                path: [
+                    *("-map", "0:V:0", *self.output_options),
+                    *("-an", "-sn", "-dn", "-f", self.segment_format),
+                ]
+            },
+        )
+
+    def _join(self, concat_list: str) -> FFmpeg:
+        return FFmpeg(
+            executable=self.executable,
+            global_options=self.global_options,
+            inputs={concat_list: ["-f", "concat", "-safe", "0"], self.input: None},
+            outputs={
+                self.output: ["-map", "0:v", "-map", "1:a?", "-c:v", "copy", *self.audio_options]
+            },
+        )
+
+    def _probe_keyframes(self, offset: float) -> list[float]:
+        """Return the sorted times of the keyframes of the first video stream from ``offset``."""
+        ff = FFprobe(
+            executable=self.probe_executable,
+            global_options=KEYFRAME_OPTIONS,
+            inputs={self.input: None},
+        )
+        stdout, _ = ff.run(stdout=subprocess.PIPE, stderr=TailCapture())
+        keyframes = []
+        for line in (stdout or b"").decode(errors="replace").splitlines():
+            pts_time, _, flags = line.partition(",")
+            if flags.startswith("K"):
+                # The timestamp is "N/A" if unknown
+                with contextlib.suppress(ValueError):
+                    keyframes.append(float(pts_time) - offset)
+        return sorted(keyframes)
+
+
+def _split_points(duration: float, keyframes: Sequence[float], segments: int) -> list[float]:
+    """Split ``duration`` evenly into ``segments`` at the nearest ones of the sorted ``keyframes``.
+
+    Split points moved to the same keyframe are merged, so fewer points may be returned.
+    """
+    points: list[float] = []
+    for i in range(1, segments):
+        target = duration * i / segments
+        index = bisect.bisect_left(keyframes, target)
+        candidates = keyframes[max(index - 1, 0) : index + 1]
+        point = min(candidates, key=lambda keyframe: abs(keyframe - target))
+        if 0 < point < duration and (not points or point > points[-1]):
+            points.append(point)
+    return points
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import subprocess
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence
+
+from .ffmpy import _FrozenSlots
+
+if TYPE_CHECKING:
+    from .ffmpy import FFmpeg
+
+
+@dataclass(frozen=True)
+class CommandSpec(_FrozenSlots):
+    """Immutable description of a command line, without any execution state.
+
+    Unlike an `FFmpeg` instance, which holds the process it has started and the statistics of
+    its run, a spec is only the executable and its arguments. It is cheap to create, to pickle
+    and to serialize to JSON, so jobs can be sent to worker processes (e.g. of a
+    `concurrent.futures.ProcessPoolExecutor`) or to other machines and executed there:
+
+    >>> specs = [FFmpeg(inputs={path: None}, outputs={mp4(path): None}).spec for path in paths]
+    >>> with concurrent.futures.ProcessPoolExecutor() as executor:
+    ...     results = list(executor.map(CommandSpec.run, specs))
+
+    Use `FFmpeg.spec` and `FFmpegTemplate.render_spec` to create specs and `FFmpeg.from_spec` to
+    turn a spec back into an `FFmpeg` instance.
+    """
+
+    __slots__ = ("executable", "args")
+
+    #: path to the executable
+    executable: str
+    #: the arguments following the executable
+    args: tuple[str, ...]
+
+    @classmethod
+    def from_argv(cls, argv: Sequence[str]) -> CommandSpec:
+        """Create a spec from a list of arguments starting with the executable."""
+        return cls(argv[0], tuple(argv[1:]))
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> CommandSpec:
+        """Create a spec from the JSON produced by `to_json`.
+
+        :raise: `ValueError` in case ``data`` is not a valid serialized spec
+        """
+        value = json.loads(data)
+        if (
+            not isinstance(value, dict)
+            or not isinstance(value.get("executable"), str)
+            or not isinstance(value.get("args"), list)
+            or not all(isinstance(arg, str) for arg in value["args"])
+        ):
+            raise ValueError(f"Invalid command spec: {data!r}")
+        return cls(value["executable"], tuple(value["args"]))
+
+    def to_json(self) -> str:
+        """Serialize the spec to a compact JSON object with ``executable`` and ``args``."""
+        return json.dumps({"executable": self.executable, "args": self.args}, separators=(",", ":"))
+
+    @property
+    def argv(self) -> list[str]:
+        """The command line as a list of arguments, starting with the executable."""
+        return [self.executable, *self.args]
+
+    @property
+    def cmd(self) -> str:
+        """The command line as a single string."""
+        return subprocess.list2cmdline(self.argv)
+
+    def run(self, **kwargs: Any) -> tuple[bytes | None, bytes | None]:
+        """Execute the command line with `FFmpeg.run`.
+
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run`
+        :return: a 2-tuple containing ``stdout`` and ``stderr`` of the process
+        :rtype: tuple
+        """
+        return self.to_ffmpeg().run(**kwargs)
+
+    def to_ffmpeg(self) -> FFmpeg:
+        """Return a new `FFmpeg` instance executing the command line."""
+        from .ffmpy import FFmpeg
+
+        return FFmpeg.from_spec(self)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+
+#: options whose value is a filter graph, and the options reading the graph from a file instead
+SCRIPT_OPTIONS = {
+    "-filter_complex": "-filter_complex_script",
+    "-lavfi": "-filter_complex_script",
+    "-vf": "-filter_script:v",
+    "-af": "-filter_script:a",
+    "-filter": "-filter_script",
+}
+
+
+class _Spill:
+    """Temporary files arguments of FFmpeg that are too long for the command line are moved to.
+
+    `command` replaces every filter graph (see `SCRIPT_OPTIONS`, including stream specific
+    ``-filter:SPEC``) longer than `threshold` bytes with the matching script option pointing to
+    a file containing the graph, which FFmpeg reads exactly like the graph itself. With `concat`,
+    every ``concat:`` protocol input longer than `threshold` is replaced with a list file read
+    by the concat demuxer, which is not equivalent (the demuxer opens every file as a separate
+    input rather than reading their bytes as one stream), so it is done only on request. The
+    files are written to a temporary directory created on the first spill, which `close`
+    removes once the process has exited. Without a `threshold` the command is left untouched.
+
+    Only single arguments are measured: other arguments have no file form, and separate ``-i``
+    inputs cannot be merged into a concat list without changing what FFmpeg does with them, so a
+    command line too long because of the number of its arguments is passed as it is.
+
+    Relative paths of a ``concat:`` input are made absolute against `cwd` (the working directory
+    of the process), as the concat demuxer resolves them against the directory of the list file.
+    """
+
+    def __init__(
+        self,
+        threshold: int | None,
+        cwd: str | os.PathLike[str] | None = None,
+        concat: bool = False,
+    ) -> None:
+        self.threshold = threshold
+        self.concat = concat
+        self.cwd = os.fspath(cwd) if cwd is not None else None
+        self.directory: str | None = None
+        self._count = 0
+
+    def command(self, cmd: list[str]) -> list[str]:
+        """Return `cmd` with the oversized arguments moved to files."""
+        if self.threshold is None:
+            return cmd
+        result = cmd[:1]
+        for option, value in zip(cmd, cmd[1:]):
+            if len(os.fsencode(value)) <= self.threshold:
+                result.append(value)
+                continue
+            script_option = _script_option(option)
+            if script_option is not None:
+                result[-1] = script_option
+                result.append(self._write("filter_script.txt", value))
+            elif self.concat and option == "-i" and value.startswith("concat:"):
+                paths = value[len("concat:") :].split("|")
+                concat_list = "".join(f"file {_quote(self._path(path))}\n" for path in paths)
+                result[-1:] = ["-f", "concat", "-safe", "0", "-i"]
+                result.append(self._write("concat.txt", concat_list))
+            else:
+                result.append(value)
+        return result
+
+    def close(self) -> None:
+        """Remove the files."""
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def _write(self, name: str, content: str) -> str:
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="ffmpy-")
+        self._count += 1
+        path = os.path.join(self.directory, f"{self._count:05d}-{name}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def _path(self, path: str) -> str:
+        if "://" in path or os.path.isabs(path):
+            return path
+        return os.path.abspath(os.path.join(self.cwd or os.getcwd(), path))
+
+
+def _script_option(option: str) -> str | None:
+    """Return the option reading the filter graph of `option` from a file, if it has a graph."""
+    name, colon, stream = option.partition(":")
+    if name == "-filter":
+        return f"-filter_script{colon}{stream}"
+    return SCRIPT_OPTIONS.get(option)
+
+
+def _quote(path: str) -> str:
+    """Quote ``path`` for a ``file`` directive of a concat demuxer script."""
+    return "'" + path.replace("'", "'\\''") + "'"
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Mapping
+
+from .ffmpy import _FrozenSlots
+
+if TYPE_CHECKING:
+    from psutil import Popen
+
+
+@dataclass(frozen=True)
+class ResourceSample(_FrozenSlots):
+    """Resource usage of a running FFmpeg process sampled with `psutil`."""
+
+    __slots__ = ("elapsed", "user_time", "system_time", "rss")
+
+    #: seconds since the process was started
+    elapsed: float
+    #: user CPU time consumed so far in seconds
+    user_time: float
+    #: system CPU time consumed so far in seconds
+    system_time: float
+    #: resident set size in bytes
+    rss: int
+
+
+@dataclass(frozen=True)
+class RunStats(_FrozenSlots):
+    """Resources used by a single FFmpeg run, available as ``stats`` of the `FFmpeg` instance.
+
+    CPU times and ``max_rss`` come from the resource usage the operating system reports for the
+    exited process (``wait4``), so they are exact also when many processes run concurrently;
+    they are `None` where it is not available, e.g. on Windows or when the process was run with
+    `FFmpeg.run_async`. Byte counts of ``stdout`` and ``stderr`` are `None` unless they were
+    redirected to a pipe.
+    """
+
+    __slots__ = (
+        "wall_time",
+        "spawn_time",
+        "user_time",
+        "system_time",
+        "max_rss",
+        "stdin_bytes",
+        "stdout_bytes",
+        "stderr_bytes",
+        "samples",
+        "log_counts",
+    )
+
+    #: seconds from starting the process until it exited and its output was read
+    wall_time: float
+    #: seconds it took to start the process (included in ``wall_time``)
+    spawn_time: float
+    #: user CPU time consumed by the process in seconds
+    user_time: float | None
+    #: system CPU time consumed by the process in seconds
+    system_time: float | None
+    #: peak resident set size of the process in bytes; on Linux this is never less than the peak
+    #: memory of the Python process at the time FFmpeg was started, as the kernel accounts the
+    #: memory of the forked process before it executed FFmpeg
+    max_rss: int | None
+    #: number of bytes written to ``stdin``
+    stdin_bytes: int
+    #: number of bytes read from ``stdout``
+    stdout_bytes: int | None
+    #: number of bytes read from ``stderr`` (including the ones `TailCapture` dropped)
+    stderr_bytes: int | None
+    #: periodic samples taken while the process was running (see ``sample_interval`` of
+    #: `FFmpeg.run`)
+    samples: tuple[ResourceSample, ...]
+    #: number of lines FFmpeg logged at every level (e.g. ``{'info': 20, 'warning': 1}``) if
+    #: ``stderr`` was captured with `LogCapture`
+    log_counts: Mapping[str, int] | None
+
+    @property
+    def cpu_time(self) -> float | None:
+        """Total CPU time consumed by the process in seconds."""
+        if self.user_time is None or self.system_time is None:
+            return None
+        return self.user_time + self.system_time
+
+    @property
+    def cpu_usage(self) -> float | None:
+        """Average number of CPUs the process kept busy (e.g. ``3.5`` for 3.5 cores)."""
+        cpu_time = self.cpu_time
+        if cpu_time is None or self.wall_time <= 0:
+            return None
+        return cpu_time / self.wall_time
+
+    @property
+    def warnings(self) -> int | None:
+        """Number of warnings FFmpeg logged, if ``stderr`` was captured with `LogCapture`."""
+        if self.log_counts is None:
+            return None
+        return self.log_counts.get("warning", 0)
+
+    @property
+    def errors(self) -> int | None:
+        """Number of errors (including fatal ones) FFmpeg logged, if ``stderr`` was captured with
+        `LogCapture`."""
+        if self.log_counts is None:
+            return None
+        return sum(self.log_counts.get(level, 0) for level in ("error", "fatal", "panic"))
+
+
+class _StatsRecorder:
+    """Collect the measurements of one run and turn them into `RunStats`.
+
+    Created right before the process is spawned. `track` starts a thread sampling the process
+    while it is running if a sampling interval is given and the process is a `psutil.Popen`.
+    ``rusage`` is set by `_wait` when it reaps the process.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spawned = self.started
+        self.stdin_bytes = 0
+        self.rusage: Any = None
+        self._samples: list[ResourceSample] = []
+        self._stopped = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def track(
+        self,
+        process: subprocess.Popen | Popen | None = None,
+        sample_interval: float | None = None,
+    ) -> None:
+        """Record that the process has been spawned and start tracking its resource usage."""
+        self.spawned = time.perf_counter()
+        if process is None:
+            return
+        if sample_interval is not None and hasattr(process, "memory_info"):
+            self._sampler = threading.Thread(
+                target=self._sample, args=(process, sample_interval), daemon=True
+            )
+            self._sampler.start()
+
+    def _sample(self, process: Popen, interval: float) -> None:
+        while True:
+            try:
+                cpu_times = process.cpu_times()
+                rss = process.memory_info().rss
+            except Exception:  # psutil.Error, the process has exited
+                return
+            if not rss:
+                # The process has exited but has not been reaped yet
+                return
+            elapsed = time.perf_counter() - self.started
+            self._samples.append(ResourceSample(elapsed, cpu_times.user, cpu_times.system, rss))
+            if self._stopped.wait(interval):
+                return
+
+    def finish(
+        self,
+        stdout_bytes: int | None,
+        stderr_bytes: int | None,
+        log_counts: Mapping[str, int] | None = None,
+    ) -> RunStats:
+        """Stop sampling and return the stats of the run; the process must have been waited for."""
+        wall_time = time.perf_counter() - self.started
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+        user_time = system_time = max_rss = None
+        if self.rusage is not None:
+            user_time = self.rusage.ru_utime
+            system_time = self.rusage.ru_stime
+            # ru_maxrss is in kilobytes, except on macOS where it is in bytes
+            max_rss = self.rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        elif self._samples:
+            max_rss = max(sample.rss for sample in self._samples)
+
+        return RunStats(
+            wall_time=wall_time,
+            spawn_time=self.spawned - self.started,
+            user_time=user_time,
+            system_time=system_time,
+            max_rss=max_rss,
+            stdin_bytes=self.stdin_bytes,
+            stdout_bytes=stdout_bytes,
+            stderr_bytes=stderr_bytes,
+            samples=tuple(self._samples),
+            log_counts=log_counts,
+        )
+
+
+def _wait(process: subprocess.Popen | Popen, recorder: _StatsRecorder | None = None) -> int:
+    """Wait for `process` to exit and return its exit code, storing its resource usage in
+    `recorder` (see `_reap`)."""
+    popen = _subprocess(process)
+    _reap(popen, recorder)
+    return int(popen.wait())
+
+
+def _communicate(
+    process: subprocess.Popen | Popen, recorder: _StatsRecorder | None = None
+) -> tuple[Any, Any]:
+    """Call ``communicate`` of `process` without input, reaping the process with `_reap`.
+
+    ``communicate`` reads the output (decoding it in text mode) and then calls ``wait`` of the
+    `subprocess.Popen`, which is overridden on the instance for the duration of the call so
+    that the resource usage of the process is not lost to ``waitpid``.
+    """
+    popen = _subprocess(process)
+    wait = popen.wait
+
+    def reaping_wait(timeout: float | None = None) -> int:
+        if timeout is None:
+            _reap(popen, recorder)
+        return wait(timeout)
+
+    popen.wait = reaping_wait  # type: ignore[method-assign]
+    try:
+        return process.communicate()
+    finally:
+        del popen.wait
+
+
+def _reap(popen: subprocess.Popen, recorder: _StatsRecorder | None) -> None:
+    """Reap the process of `popen` with ``wait4``, storing its exit code as ``returncode``.
+
+    Unlike the ``waitpid`` of `subprocess.Popen`, ``wait4`` reports the resource usage of the
+    child, which is stored in `recorder`. Nothing is done where ``wait4`` is not available or the
+    process has been reaped already; ``wait`` of `popen` then returns the exit code as usual.
+    """
+    if popen.returncode is not None or not hasattr(os, "wait4"):
+        return
+    try:
+        _, status, rusage = os.wait4(popen.pid, 0)
+    except ChildProcessError:
+        return
+    if recorder is not None:
+        recorder.rusage = rusage
+    popen.returncode = os.waitstatus_to_exitcode(status)
+
+
+def _subprocess(process: subprocess.Popen | Popen) -> subprocess.Popen:
+    """Return the `subprocess.Popen` of `process`, which holds its exit code also when
+    `process` is a `psutil.Popen` wrapping it."""
+    if isinstance(process, subprocess.Popen):
+        return process
+    subproc: subprocess.Popen = process._Popen__subproc
+    return subproc
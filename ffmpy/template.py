@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import string
+from typing import Any, Mapping, Sequence, Union
+
+from .ffmpy import FFmpeg, _merge_args_opts, _normalize_options
+from .spec import CommandSpec
+
+# A compiled argument: pairs of literal text and the placeholder following it, the placeholder
+# given as its name and format spec, or None after the trailing literal text
+_Part = tuple[str, Union[tuple[str, str], None]]
+
+
+class FFmpegTemplate:
+    """Precompiled FFmpeg command line with named placeholders.
+
+    Creating an `FFmpeg` instance parses all of its option strings. When many jobs differing only
+    in e.g. paths and a few parameters are generated, the parsing can be done once: a template
+    takes the same arguments as `FFmpeg`, but any of the executable, options, inputs and outputs
+    may contain placeholders in `str.format` syntax (``{name}`` or ``{name:spec}``), which are
+    replaced when the template is rendered. Options are split into arguments before the
+    placeholders are replaced, so a value containing spaces (e.g. a path) always stays a single
+    argument. Literal braces (e.g. in FFmpeg filter expressions) must be doubled: ``%{{pts}}``.
+
+    >>> template = FFmpegTemplate(
+    ...     global_options='-y -v error',
+    ...     inputs={'{src}': '-ss {start}'},
+    ...     outputs={'{dst}': '-c:v libx264 -crf {crf}'},
+    ... )
+    >>> template.render(src='in.mp4', dst='out.mp4', start=10, crf=23).cmd
+    'ffmpeg -y -v error -ss 10 -i in.mp4 -c:v libx264 -crf 23 out.mp4'
+
+    :param str executable: path to ffmpeg executable
+    :param global_options: global options (see `FFmpeg`)
+    :param dict inputs: inputs and their options (see `FFmpeg`)
+    :param dict outputs: outputs and their options (see `FFmpeg`)
+    :raise: `ValueError` in case a placeholder is not a plain name or uses a conversion
+    """
+
+    def __init__(
+        self,
+        executable: str = "ffmpeg",
+        global_options: Sequence[str] | str | None = None,
+        inputs: Mapping[str, Sequence[str] | str | None] | None = None,
+        outputs: Mapping[str, Sequence[str] | str | None] | None = None,
+    ) -> None:
+        args = [executable]
+        args += _normalize_options(global_options, split_mixed=True)
+        if inputs is not None:
+            args += _merge_args_opts(inputs, add_minus_i_option=True)
+        if outputs is not None:
+            args += _merge_args_opts(outputs)
+
+        self._args: list[str] = []
+        self._fields: list[tuple[int, tuple[_Part, ...]]] = []
+        placeholders: set[str] = set()
+        for index, arg in enumerate(args):
+            parts = _compile(arg)
+            if all(field is None for _, field in parts):
+                # Only literal text, possibly with escaped braces
+                self._args.append("".join(literal for literal, _ in parts))
+                continue
+            self._args.append("")
+            self._fields.append((index, parts))
+            placeholders.update(field[0] for _, field in parts if field is not None)
+
+        #: names of all the placeholders of the template
+        self.placeholders = frozenset(placeholders)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self._args!r}>"
+
+    def render_args(self, **values: Any) -> list[str]:
+        """Return the command line arguments with the placeholders replaced by ``values``.
+
+        :param values: values of the placeholders; they are formatted with `format`
+        :return: the list of command line arguments, starting with the executable
+        :rtype: list
+        :raise: `KeyError` in case a value for any of the placeholders is missing
+        """
+        args = self._args.copy()
+        try:
+            for index, parts in self._fields:
+                args[index] = "".join(
+                    literal if field is None else literal + format(values[field[0]], field[1])
+                    for literal, field in parts
+                )
+        except KeyError as e:
+            raise KeyError(f"No value for placeholder {e.args[0]!r}") from None
+        return args
+
+    def render(self, **values: Any) -> FFmpeg:
+        """Return an `FFmpeg` instance with the placeholders replaced by ``values``.
+
+        The command line string (``cmd``) of the instance is only built if it is accessed.
+
+        :param values: values of the placeholders; they are formatted with `format`
+        :return: a new `FFmpeg` instance
+        :rtype: FFmpeg
+        :raise: `KeyError` in case a value for any of the placeholders is missing
+        """
+        return FFmpeg._from_cmd(self.render_args(**values))
+
+    def render_spec(self, **values: Any) -> CommandSpec:
+        """Return a `CommandSpec` with the placeholders replaced by ``values``.
+
+        Cheaper than `render` when the jobs are sent to other processes and not run directly.
+
+        :param values: values of the placeholders; they are formatted with `format`
+        :return: a new `CommandSpec`
+        :rtype: CommandSpec
+        :raise: `KeyError` in case a value for any of the placeholders is missing
+        """
+        return CommandSpec.from_argv(self.render_args(**values))
+
+
+def _compile(arg: str) -> tuple[_Part, ...]:
+    """Split `arg` into literal text and the placeholders between it."""
+    parts: list[_Part] = []
+    for literal, name, spec, conversion in string.Formatter().parse(arg):
+        if name is None:
+            parts.append((literal, None))
+            continue
+        if not name.isidentifier() or conversion is not None or "{" in (spec or ""):
+            raise ValueError(f"Invalid placeholder {{{name}}} in {arg!r}")
+        parts.append((literal, (name, spec or "")))
+    return tuple(parts)
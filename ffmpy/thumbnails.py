@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import itertools
+import os
+import tempfile
+from typing import Any, Sequence
+
+from .ffmpy import FFmpeg, _normalize_options
+
+
+class Thumbnails:
+    """Extract still images from a video at many points in a single FFmpeg run.
+
+    Running FFmpeg once per image opens the input, seeks and decodes it again for every image.
+    Instead, the first video stream is decoded once and a ``select`` filter picks the frames
+    that are encoded as images, chosen in one of three ways:
+
+    - ``timestamps``: the first frame at or after each of the timestamps (in seconds from the
+      start of the input)
+    - ``interval``: the first frame and then every frame at least ``interval`` seconds after the
+      previously selected one
+    - ``keyframes``: every keyframe; only the keyframes are decoded (``-skip_frame nokey``), which
+      is many times faster than decoding the whole video
+
+    >>> thumbnails = Thumbnails('input.mp4', timestamps=[5, 60, 120.5], filters='scale=320:-1')
+    >>> images = thumbnails.read()
+    >>> paths = thumbnails.write('thumbs/%03d.jpg')
+
+    The format of the images follows from their extension (e.g. ``jpg`` or ``png``). With
+    ``timestamps``, FFmpeg stops as soon as it has written an image for each of them
+    (``-frames:v``) rather than decoding the rest of the video. Several timestamps falling on the
+    same frame select it only once and timestamps past the end of the video select nothing, so
+    there may be fewer images than timestamps (and the video is then decoded to its end).
+    Requires FFmpeg 5.1 or newer (``-fps_mode``).
+
+    :param input: path (or URL) of the video
+    :param timestamps: times to take the images at, in seconds
+    :param float interval: minimum number of seconds between the images
+    :param bool keyframes: whether to take an image of every keyframe
+    :param str filters: filters applied to the selected frames (e.g. ``scale=320:-1``)
+    :param output_options: options the images are encoded with (e.g. ``-q:v 2``)
+    :param input_options: options of the input
+    :param str extension: extension of the images returned by `read`, which selects their format
+    :param str executable: path to ffmpeg executable
+    :param global_options: global options of the ffmpeg process (e.g. ``-v error``)
+    :param tmp_dir: directory `read` creates its temporary directory in; by default the system's
+        temporary directory is used
+    :raise: `ValueError` in case not exactly one of ``timestamps``, ``interval`` and
+        ``keyframes`` is given, ``timestamps`` is empty or ``interval`` is not positive
+    """
+
+    def __init__(
+        self,
+        input: str | os.PathLike[str],
+        timestamps: Sequence[float] | None = None,
+        interval: float | None = None,
+        keyframes: bool = False,
+        filters: str | None = None,
+        output_options: Sequence[str] | str | None = None,
+        input_options: Sequence[str] | str | None = None,
+        extension: str = "jpg",
+        executable: str = "ffmpeg",
+        global_options: Sequence[str] | str | None = None,
+        tmp_dir: str | os.PathLike[str] | None = None,
+    ) -> None:
+        if (timestamps is not None) + (interval is not None) + keyframes != 1:
+            raise ValueError("Exactly one of timestamps, interval and keyframes must be given")
+        if timestamps is not None and not timestamps:
+            raise ValueError("timestamps must not be empty")
+        if interval is not None and interval <= 0:
+            raise ValueError("interval must be greater than 0")
+
+        self.input = os.fspath(input)
+        self.timestamps = sorted(set(timestamps)) if timestamps is not None else None
+        self.interval = interval
+        self.keyframes = keyframes
+        self.filters = filters
+        self.output_options = _normalize_options(output_options, split_mixed=True)
+        self.input_options = _normalize_options(input_options, split_mixed=True)
+        self.extension = extension
+        self.executable = executable
+        self.global_options = _normalize_options(global_options, split_mixed=True)
+        self.tmp_dir = tmp_dir
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__!r} {self.input!r}>"
+
+    def write(self, pattern: str | os.PathLike[str], **kwargs: Any) -> list[str]:
+        """Write the images to files named by ``pattern`` and return their paths.
+
+        ``pattern`` is a pattern of the FFmpeg ``image2`` muxer, where a ``%d`` sequence (e.g.
+        ``%03d``) is replaced with the number of the image, starting from 1. The images should be
+        written to an empty directory, as any further files already matching the pattern are
+        returned too.
+
+        :param pattern: pattern of the paths of the images (e.g. ``thumbs/%03d.jpg``)
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run`
+        :return: the paths of the images in the order of the video
+        :rtype: list
+        :raise: `ValueError` in case ``pattern`` does not contain a ``%d`` sequence;
+            `FFRuntimeError` in case FFmpeg exits with a non-zero code
+        """
+        pattern = os.fspath(pattern)
+        try:
+            pattern % 1
+        except TypeError:
+            raise ValueError(f"Pattern {pattern!r} does not contain a %d sequence") from None
+        self.ffmpeg(pattern).run(**kwargs)
+        paths = (pattern % number for number in itertools.count(1))
+        return list(itertools.takewhile(os.path.exists, paths))
+
+    def read(self, **kwargs: Any) -> list[bytes]:
+        """Return the images as `bytes` in the order of the video.
+
+        The images are written to a temporary directory, which is removed afterwards.
+
+        :param kwargs: keyword arguments forwarded to `FFmpeg.run`
+        :rtype: list
+        :raise: `FFRuntimeError` in case FFmpeg exits with a non-zero code
+        """
+        with tempfile.TemporaryDirectory(prefix="ffmpy-", dir=self.tmp_dir) as directory:
+            images = []
+            for path in self.write(os.path.join(directory, f"%06d.{self.extension}"), **kwargs):
+                with open(path, "rb") as f:
+                    images.append(f.read())
+            return images
+
+    def ffmpeg(self, pattern: str) -> FFmpeg:
+        """Return the `FFmpeg` instance writing the images to files named by ``pattern``."""
+        input_options = list(self.input_options)
+        if self.keyframes:
+            input_options += ["-skip_frame", "nokey"]
+        filters = [self.filters] if self.filters else []
+        select = self._select()
+        if select is not None:
+            filters.insert(0, f"select='{select}'")
+        output_options = ["-map", "0:v:0"]
+        if filters:
+            output_options += ["-vf", ",".join(filters)]
+        output_options += ["-fps_mode", "passthrough"]
+        if self.timestamps is not None:
+            output_options += ["-frames:v", str(len(self.timestamps))]
+        return FFmpeg(
+            executable=self.executable,
+            global_options=self.global_options,
+            inputs={self.input: input_options},
+            outputs={pattern: [*output_options, *self.output_options]},
+        )
+
+    def _select(self) -> str | None:
+        """Return the expression of the ``select`` filter, or `None` to keep every frame."""
+        if self.timestamps is not None:
+            # The first frame at or after each timestamp; prev_pts is NAN for the first frame
+            return "+".join(
+                f"gte(t,{timestamp:.6f})*not(gte(prev_pts*TB,{timestamp:.6f}))"
+                for timestamp in self.timestamps
+            )
+        if self.interval is not None:
+            return f"isnan(prev_selected_t)+gte(t-prev_selected_t,{self.interval:.6f})"
+        return None
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import contextlib
+import subprocess
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, cast
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from psutil import Popen
+
+DEFAULT_GRACE_PERIOD = 5.0
+
+_Callback = TypeVar("_Callback", bound=Optional[Callable[[Any], object]])
+
+
+class _Watchdog:
+    """Stop a process running longer than `timeout` or making no progress for `stall_timeout`.
+
+    Progress is any activity reported with `touch`: output read from the pipes of the process or
+    a progress report. Once a limit is exceeded, ``reason`` is set to ``"timeout"`` or
+    ``"stall"`` and the process is stopped in steps, waiting `grace_period` seconds after each
+    of them for the process to exit: ``q`` is sent to its ``stdin`` (which makes FFmpeg finish
+    the output files and exit), then SIGTERM and finally SIGKILL. The ``q`` step is skipped
+    unless `quit_via_stdin` is set, as ``stdin`` carrying input data cannot take commands.
+
+    The watchdog is either run in a thread (`start`/`stop`) or as a task (`watch_async`). If
+    neither limit is set, it is disabled and does nothing.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None,
+        stall_timeout: float | None,
+        grace_period: float = DEFAULT_GRACE_PERIOD,
+        quit_via_stdin: bool = False,
+    ) -> None:
+        self.timeout = timeout
+        self.stall_timeout = stall_timeout
+        self.grace_period = grace_period
+        self.quit_via_stdin = quit_via_stdin
+        self.reason: str | None = None
+        self._started = self._last_activity = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout is not None or self.stall_timeout is not None
+
+    @property
+    def limit(self) -> float | None:
+        """The limit that was exceeded, in seconds."""
+        return self.stall_timeout if self.reason == "stall" else self.timeout
+
+    def touch(self) -> None:
+        """Record activity of the process."""
+        self._last_activity = time.monotonic()
+
+    @property
+    def keeps_stdin(self) -> bool:
+        """Whether ``stdin`` must be kept open until the process exits to be able to send ``q``."""
+        return self.enabled and self.quit_via_stdin
+
+    def wrap(self, callback: _Callback) -> _Callback:
+        """Return `callback` (if any) calling `touch` before every call when enabled."""
+        if callback is None or not self.enabled:
+            return callback
+        call = callback
+
+        def wrapped(value: Any) -> object:
+            self.touch()
+            return call(value)
+
+        return cast(_Callback, wrapped)
+
+    def start(self, process: subprocess.Popen | Popen) -> None:
+        if not self.enabled:
+            return
+        self._started = self._last_activity = time.monotonic()
+        self._thread = threading.Thread(target=self._watch, args=(process,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching; must be called once the process has been waited for."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _remaining(self) -> tuple[float, str]:
+        """Return the seconds left until the nearest limit is exceeded and the limit's reason."""
+        now = time.monotonic()
+        remaining = []
+        if self.timeout is not None:
+            remaining.append((self._started + self.timeout - now, "timeout"))
+        if self.stall_timeout is not None:
+            remaining.append((self._last_activity + self.stall_timeout - now, "stall"))
+        return min(remaining)
+
+    def _watch(self, process: subprocess.Popen | Popen) -> None:
+        while True:
+            remaining, reason = self._remaining()
+            if remaining <= 0:
+                break
+            if self._stopped.wait(remaining):
+                return
+
+        self.reason = reason
+        for step in self._steps(process, lambda: _send_quit(process)):
+            with contextlib.suppress(OSError, ValueError):
+                step()
+            if self._stopped.wait(self.grace_period):
+                return
+
+    async def watch_async(self, process: asyncio.subprocess.Process) -> None:
+        """Asynchronous counterpart of `start`; cancel the task once the process has exited."""
+        import asyncio
+
+        if not self.enabled:
+            return
+        self._started = self._last_activity = time.monotonic()
+        while True:
+            remaining, reason = self._remaining()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(remaining)
+
+        self.reason = reason
+        for step in self._steps(process, lambda: _send_quit_async(process)):
+            if process.returncode is not None:
+                return
+            with contextlib.suppress(OSError, RuntimeError):
+                step()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(process.wait(), self.grace_period)
+
+    def _steps(
+        self,
+        process: subprocess.Popen | Popen | asyncio.subprocess.Process,
+        send_quit: Callable[[], object],
+    ) -> list[Callable[[], object]]:
+        steps: list[Callable[[], object]] = [process.terminate, process.kill]
+        if self.quit_via_stdin and process.stdin is not None:
+            steps.insert(0, send_quit)
+        return steps
+
+
+def _send_quit(process: subprocess.Popen | Popen) -> None:
+    """Send FFmpeg the ``q`` command through the ``stdin`` of `process`."""
+    stdin = process.stdin
+    if stdin is not None and not stdin.closed:
+        stdin.write(b"q")
+        stdin.flush()
+
+
+def _send_quit_async(process: asyncio.subprocess.Process) -> None:
+    """Asynchronous counterpart of `_send_quit`."""
+    stdin = process.stdin
+    if stdin is not None and not stdin.is_closing():
+        stdin.write(b"q")
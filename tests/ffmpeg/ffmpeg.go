@@ -2,9 +2,15 @@ package main
 
 import (
 	"bufio"
+	"bytes"
 	"fmt"
+	"io"
 	"os"
+	"os/signal"
 	"strconv"
+	"strings"
+	"syscall"
+	"time"
 )
 
 func printStdoutOneline() {
@@ -23,6 +29,296 @@ func printStderrMultiline() {
 	fmt.Fprint(os.Stderr, "These are\nmultiple lines\nprinted to stderr")
 }
 
+func printStdoutBytes(n int) {
+	chunk := bytes.Repeat([]byte("x"), 64*1024)
+	for n > 0 {
+		size := len(chunk)
+		if n < size {
+			size = n
+		}
+		os.Stdout.Write(chunk[:size])
+		n -= size
+	}
+}
+
+// printStdoutSequence writes n bytes, byte i having the value i % 251, so that any
+// misplaced chunk of the output is detected
+func printStdoutSequence(n int) {
+	w := bufio.NewWriterSize(os.Stdout, 64*1024)
+	for i := 0; i < n; i++ {
+		w.WriteByte(byte(i % 251))
+	}
+	w.Flush()
+}
+
+func openPipe(url string) *os.File {
+	fd, err := strconv.Atoi(strings.TrimPrefix(url, "pipe:"))
+	if err != nil {
+		fmt.Fprintln(os.Stderr, "invalid pipe url", url)
+		os.Exit(1)
+	}
+	return os.NewFile(uintptr(fd), url)
+}
+
+func printProgress(url string, blocks int) {
+	f := openPipe(url)
+	for i := 1; i <= blocks; i++ {
+		status := "continue"
+		if i == blocks {
+			status = "end"
+		}
+		fmt.Fprintf(
+			f,
+			"frame=%d\nfps=25.00\nstream_0_0_q=28.0\nbitrate=N/A\ntotal_size=%d\n"+
+				"out_time_us=%d\nout_time_ms=%d\nout_time=00:00:0%d.000000\n"+
+				"dup_frames=0\ndrop_frames=0\nspeed=%d.5x\nprogress=%s\n",
+			i*25, i*1024, i*1000000, i*1000000, i, i, status,
+		)
+	}
+	f.Close()
+}
+
+// copyPipes concatenates all the pipe inputs and writes the result to every pipe output
+func copyPipes(inputs, outputs []string) {
+	var data []byte
+	for _, url := range inputs {
+		f := openPipe(url)
+		chunk, _ := io.ReadAll(f)
+		f.Close()
+		data = append(data, chunk...)
+	}
+	for _, url := range outputs {
+		f := openPipe(url)
+		f.Write(data)
+		f.Close()
+	}
+}
+
+// printPackets prints the timestamps and flags of the packets of a 10 seconds long 25 fps
+// video stream with a keyframe every 2 seconds, as -show_entries packet=pts_time,flags does
+func printPackets() {
+	w := bufio.NewWriter(os.Stdout)
+	for i := 0; i < 250; i++ {
+		flags := "__"
+		if i%50 == 0 {
+			flags = "K_"
+		}
+		fmt.Fprintf(w, "%.6f,%s\n", float64(i)/25, flags)
+	}
+	w.Flush()
+}
+
+// logSample is what FFmpeg could log while transcoding a damaged input, with the level flag
+var logSample = []string{
+	"[in#0/mov,mp4,m4a,3gp,3g2,mj2 @ 0x55d5c8a0] [info] Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'input.mp4':\n",
+	"[h264 @ 0x55d5c8b0] [error] concealing 12 DC, 12 AC, 12 MV errors in P frame\n",
+	"[h264 @ 0x55d5c8b0] [error] concealing 12 DC, 12 AC, 12 MV errors in P frame\n",
+	"[info] frame=  125 fps=100 q=28.0 size=     512KiB time=00:00:05.00 speed=4.0x\r",
+	"[out#0/mp4 @ 0x55d5c8c0] [warning] 3 frames left in the queue on closing\n",
+	"[info] frame=  250 fps=100 q=-1.0 Lsize=    1024KiB time=00:00:10.00 speed=4.0x\n",
+}
+
+// writeImageSequence writes n files named by the printf pattern of the image2 muxer, numbered
+// from 1, like FFmpeg writing an image sequence.
+func writeImageSequence(pattern string, n int) {
+	for i := 1; i <= n; i++ {
+		name := fmt.Sprintf(pattern, i)
+		if err := os.WriteFile(name, []byte(fmt.Sprintf("image %d", i)), 0o644); err != nil {
+			fmt.Fprintln(os.Stderr, err)
+			os.Exit(1)
+		}
+	}
+}
+
+// printScripts prints the files passed with *_script options and the lists read by the concat
+// demuxer, each following a line with its option.
+func printScripts(args []string) {
+	for i := 1; i < len(args); i++ {
+		concat := args[i-1] == "-i" && i >= 2 && strings.Join(args[max(i-5, 0):i-1], " ") == "-f concat -safe 0"
+		script := strings.HasPrefix(args[i-1], "-") && strings.Contains(args[i-1], "_script")
+		if !script && !concat {
+			continue
+		}
+		content, err := os.ReadFile(args[i])
+		if err != nil {
+			fmt.Fprintln(os.Stderr, err)
+			os.Exit(1)
+		}
+		fmt.Fprintf(os.Stdout, "%s\n%s\n", args[i-1], content)
+	}
+}
+
+// logLevelValues are the log levels of FFmpeg by their names
+var logLevelValues = map[string]int{
+	"quiet": -8, "panic": 0, "fatal": 8, "error": 16, "warning": 24,
+	"info": 32, "verbose": 40, "debug": 48, "trace": 56,
+}
+
+// parseLogLevel returns whether the value of -loglevel sets the level flag and the level it
+// selects, info if it selects none
+func parseLogLevel(value string) (bool, int) {
+	tokens := strings.FieldsFunc(value, func(r rune) bool { return r == '+' || r == '-' })
+	levelFlag := false
+	level := logLevelValues["info"]
+	for _, token := range tokens {
+		if token == "level" {
+			levelFlag = true
+		} else if v, ok := logLevelValues[token]; ok {
+			level = v
+		}
+	}
+	return levelFlag, level
+}
+
+// logLevelOption returns the value FFmpeg selects its log level with: that of the first
+// -loglevel, or of the first -v if there is no -loglevel
+func logLevelOption(args []string) string {
+	for _, name := range []string{"-loglevel", "-v"} {
+		for i := 0; i < len(args)-1; i++ {
+			if args[i] == name {
+				return args[i+1]
+			}
+		}
+	}
+	return ""
+}
+
+// printLogSample prints the lines of logSample up to level to stderr, without their level
+// unless levels is set
+func printLogSample(levels bool, level int) {
+	for _, line := range logSample {
+		skip := false
+		for name, value := range logLevelValues {
+			skip = skip || (value > level && strings.Contains(line, "["+name+"] "))
+		}
+		if skip {
+			continue
+		}
+		if !levels {
+			for _, level := range []string{"info", "error", "warning"} {
+				line = strings.Replace(line, "["+level+"] ", "", 1)
+			}
+		}
+		fmt.Fprint(os.Stderr, line)
+	}
+}
+
+// listings are abridged outputs of the options of real ffmpeg listing its capabilities
+var listings = map[string]string{
+	"-version": `ffmpeg version 6.1.1-fake Copyright (c) 2000-2023 the FFmpeg developers
+built with gcc 13 (Ubuntu 13.2.0-23ubuntu3)
+configuration: --enable-gpl --enable-libx264 --enable-libsvtav1
+libavutil      58. 29.100 / 58. 29.100
+`,
+	"-encoders": `Encoders:
+ V..... = Video
+ A..... = Audio
+ S..... = Subtitle
+ .F.... = Frame-level multithreading
+ ..S... = Slice-level multithreading
+ ...X.. = Codec is experimental
+ ....B. = Supports draw_horiz_band
+ .....D = Supports direct rendering method 1
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D libsvtav1            SVT-AV1(Scalable Video Technology for AV1) encoder (codec av1)
+ A....D aac                  AAC (Advanced Audio Coding)
+ S..... srt                  SubRip subtitle
+`,
+	"-decoders": `Decoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ VFS..D h264                 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10
+ A....D aac                  AAC (Advanced Audio Coding)
+`,
+	"-filters": `Filters:
+  T.. = Timeline support
+  .S. = Slice threading
+  ..C = Command support
+  A = Audio input/output
+  V = Video input/output
+  N = Dynamic number and/or type of input/output
+  | = Source or sink filter
+ TSC scale             V->V       Scale the input video size and/or convert the image format.
+ ... concat            N->N       Concatenate audio and video streams.
+ T.. volume            A->A       Change input volume.
+`,
+	"-muxers": `File formats:
+ D. = Demuxing supported
+ .E = Muxing supported
+ --
+  E matroska        Matroska
+  E mp4             MP4 (MPEG-4 Part 14)
+  E mpegts          MPEG-TS (MPEG-2 Transport Stream)
+`,
+	"-demuxers": `File formats:
+ D. = Demuxing supported
+ .E = Muxing supported
+ --
+ D  matroska,webm   Matroska / WebM
+ D  mov,mp4,m4a,3gp,3g2,mj2 QuickTime / MOV
+`,
+	"-pix_fmts": `Pixel formats:
+I.... = Supported Input  format for conversion
+.O... = Supported Output format for conversion
+..H.. = Hardware accelerated format
+...P. = Paletted format
+....B = Bitstream format
+FLAGS NAME            NB_COMPONENTS BITS_PER_PIXEL BIT_DEPTHS
+-----
+IO... yuv420p                3            12      8-8-8
+IO... rgb24                  3            24      8-8-8
+..H.. cuda                   0             0      0
+`,
+	"-hwaccels": `Hardware acceleration methods:
+vdpau
+cuda
+`,
+}
+
+func printProbe(input string) {
+	fmt.Fprintf(os.Stdout, `{
+    "streams": [
+        {
+            "index": 0,
+            "codec_name": "h264",
+            "codec_type": "video",
+            "width": 1920,
+            "height": 1080,
+            "pix_fmt": "yuv420p",
+            "r_frame_rate": "30000/1001",
+            "avg_frame_rate": "30000/1001",
+            "duration": "10.010000",
+            "bit_rate": "4000000",
+            "tags": {"language": "und"}
+        },
+        {
+            "index": 1,
+            "codec_name": "aac",
+            "codec_type": "audio",
+            "sample_rate": "48000",
+            "channels": 2,
+            "r_frame_rate": "0/0",
+            "avg_frame_rate": "0/0",
+            "duration": "10.005333",
+            "bit_rate": "128000"
+        }
+    ],
+    "format": {
+        "filename": %q,
+        "nb_streams": 2,
+        "format_name": "mov,mp4,m4a,3gp,3g2,mj2",
+        "start_time": "0.000000",
+        "duration": "10.010000",
+        "size": "5167890",
+        "bit_rate": "4130182",
+        "tags": {"encoder": "Lavf60.3.100"}
+    }
+}
+`, input)
+}
+
 func main() {
 	args := os.Args[1:]
 
@@ -31,7 +327,29 @@ func main() {
 	}
 
 	var stdIn, stdOut, stdErr, exitCode string
+	stdoutBytes := 0
+	stdoutSequence := 0
+	stderrLines := 0
+	progressBlocks := 3
+	var progressURL, input string
+	showFormat := false
+	showPackets := false
 	longRun := false
+	ignoreSigterm := false
+	ticks := 0
+	copyPipeArgs := false
+	logSampleArg := false
+	logLevels, logLevel := parseLogLevel(logLevelOption(args))
+	writeImages := 0
+	catScripts := false
+	var pipeInputs, pipeOutputs []string
+
+	for _, arg := range args {
+		if listing, ok := listings[arg]; ok {
+			fmt.Fprint(os.Stdout, listing)
+			os.Exit(0)
+		}
+	}
 
 	for i, arg := range args {
 		switch arg {
@@ -43,16 +361,111 @@ func main() {
 			stdErr = args[i+1]
 		case "--exit-code":
 			exitCode = args[i+1]
+		case "--stdout-bytes":
+			stdoutBytes, _ = strconv.Atoi(args[i+1])
+		case "--stdout-sequence":
+			stdoutSequence, _ = strconv.Atoi(args[i+1])
+		case "--stderr-lines":
+			stderrLines, _ = strconv.Atoi(args[i+1])
+		case "-i":
+			input = args[i+1]
+		case "-show_format":
+			showFormat = true
+		case "-show_entries":
+			showPackets = strings.HasPrefix(args[i+1], "packet=")
+		case "-progress":
+			progressURL = args[i+1]
+		case "--progress-blocks":
+			progressBlocks, _ = strconv.Atoi(args[i+1])
 		case "--long-run":
 			longRun = true
+		case "--ignore-sigterm":
+			ignoreSigterm = true
+		case "--ticks":
+			ticks, _ = strconv.Atoi(args[i+1])
+		case "--copy-pipes":
+			copyPipeArgs = true
+		case "--log-sample":
+			logSampleArg = true
+		case "--write-images":
+			writeImages, _ = strconv.Atoi(args[i+1])
+		case "--cat-scripts":
+			catScripts = true
+		}
+		fd, err := strconv.Atoi(strings.TrimPrefix(arg, "pipe:"))
+		if strings.HasPrefix(arg, "pipe:") && err == nil && fd > 2 && i > 0 && args[i-1] != "-progress" {
+			if args[i-1] == "-i" {
+				pipeInputs = append(pipeInputs, arg)
+			} else {
+				pipeOutputs = append(pipeOutputs, arg)
+			}
 		}
 	}
 
-	if stdIn == "pipe" {
+	if ignoreSigterm {
+		signal.Ignore(syscall.SIGTERM)
+	}
+
+	if stdIn == "keys" {
+		// Quit on "q" like FFmpeg does when reading commands from stdin
+		go func() {
+			key := make([]byte, 1)
+			for {
+				n, err := os.Stdin.Read(key)
+				if err != nil {
+					return
+				}
+				if n == 1 && key[0] == 'q' {
+					fmt.Fprint(os.Stderr, "Exiting normally, received signal q.\n")
+					os.Exit(0)
+				}
+			}
+		}()
+	} else if stdIn == "pipe" {
 		scanner := bufio.NewScanner(os.Stdin)
 		for scanner.Scan() {
 			fmt.Fprintln(os.Stdout, scanner.Text())
 		}
+	} else if stdIn == "echo" {
+		io.Copy(os.Stdout, os.Stdin)
+	} else if stdIn == "discard" {
+		io.Copy(io.Discard, os.Stdin)
+	}
+
+	if showFormat {
+		if _, err := os.Stat(input); err != nil && !strings.Contains(input, "://") {
+			fmt.Fprintf(os.Stderr, "%s: No such file or directory\n", input)
+			os.Exit(1)
+		}
+		printProbe(input)
+	}
+
+	if showPackets {
+		printPackets()
+	}
+
+	if copyPipeArgs {
+		copyPipes(pipeInputs, pipeOutputs)
+	}
+
+	if writeImages > 0 {
+		writeImageSequence(args[len(args)-1], writeImages)
+	}
+
+	if catScripts {
+		printScripts(args)
+	}
+
+	if progressURL != "" {
+		printProgress(progressURL, progressBlocks)
+	}
+
+	if stdoutBytes > 0 {
+		printStdoutBytes(stdoutBytes)
+	}
+
+	if stdoutSequence > 0 {
+		printStdoutSequence(stdoutSequence)
 	}
 
 	if stdOut == "oneline" {
@@ -67,6 +480,23 @@ func main() {
 		printStderrMultiline()
 	}
 
+	if logSampleArg {
+		printLogSample(logLevels, logLevel)
+	}
+
+	if stderrLines > 0 {
+		w := bufio.NewWriter(os.Stderr)
+		for i := 1; i <= stderrLines; i++ {
+			fmt.Fprintf(w, "stderr line %d\n", i)
+		}
+		w.Flush()
+	}
+
+	for i := 1; i <= ticks; i++ {
+		time.Sleep(50 * time.Millisecond)
+		fmt.Fprintf(os.Stderr, "tick %d\n", i)
+	}
+
 	if longRun {
 		for {
 		}
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+from typing import Iterator
+from unittest import mock
+
+import pytest
+
+from ffmpy import Capabilities, FFExecutableNotFoundError, FFmpeg, get_capabilities
+from ffmpy.capabilities import _parse_listing
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> Iterator[None]:
+    get_capabilities.cache_clear()
+    yield
+    get_capabilities.cache_clear()
+
+
+def test_resolves_executable() -> None:
+    caps = Capabilities("ffmpeg")
+    assert caps.executable == "ffmpeg"
+    assert caps.path == os.path.abspath(os.path.join(FFMPEG_PATH, "ffmpeg"))
+    assert repr(caps) == f"<'Capabilities' {caps.path!r}>"
+
+
+def test_executable_not_found() -> None:
+    with pytest.raises(FFExecutableNotFoundError, match="Executable 'nonexistent' not found"):
+        get_capabilities("nonexistent")
+
+
+def test_capabilities() -> None:
+    caps = get_capabilities()
+
+    assert caps.version == "6.1.1-fake"
+    assert caps.configuration == ("--enable-gpl", "--enable-libx264", "--enable-libsvtav1")
+    assert caps.encoders == {"libx264", "libsvtav1", "aac", "srt"}
+    assert caps.decoders == {"h264", "aac"}
+    assert caps.filters == {"scale", "concat", "volume"}
+    assert caps.muxers == {"matroska", "mp4", "mpegts"}
+    assert caps.demuxers == {"matroska", "webm", "mov", "mp4", "m4a", "3gp", "3g2", "mj2"}
+    assert caps.pix_fmts == {"yuv420p", "rgb24", "cuda"}
+    assert caps.hwaccels == {"vdpau", "cuda"}
+
+
+def test_capabilities_are_cached() -> None:
+    with mock.patch.object(FFmpeg, "run", autospec=True, side_effect=FFmpeg.run) as run:
+        caps = get_capabilities("ffmpeg")
+        assert get_capabilities("ffmpeg") is caps
+        assert run.call_count == 0
+
+        assert "libsvtav1" in caps.encoders
+        assert "libfdk_aac" not in caps.encoders
+        assert caps.version == "6.1.1-fake"
+        assert caps.configuration
+        assert run.call_count == 2
+
+        assert get_capabilities("ffmpeg").encoders is caps.encoders
+        assert run.call_count == 2
+
+
+def test_parse_listing_without_separator() -> None:
+    output = "Filters:\n  T.. = Timeline support\n  | = Source or sink\n TSC scale  V->V  Scale.\n"
+    assert _parse_listing(output) == {"scale"}
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from ffmpy import TailCapture
+from ffmpy.capture import _RingBuffer
+
+
+def test_tail_capture_requires_limit() -> None:
+    with pytest.raises(ValueError):
+        TailCapture(max_bytes=None, max_lines=None)
+
+
+def test_tail_capture_is_slotted() -> None:
+    capture = TailCapture(max_lines=10)
+    assert capture.max_bytes == 64 * 1024
+    assert capture.max_lines == 10
+    assert not hasattr(capture, "__dict__")
+
+
+def test_ring_buffer_max_bytes() -> None:
+    buffer = _RingBuffer(TailCapture(max_bytes=10))
+    buffer.write(b"0123456789")
+    assert buffer.getvalue() == b"0123456789"
+    buffer.write(b"abc")
+    assert buffer.getvalue() == b"3456789abc"
+    buffer.write(b"\n" * 20 + b"end")
+    assert buffer.getvalue() == b"\n" * 7 + b"end"
+    assert buffer.total_bytes == 36
+
+
+def test_ring_buffer_max_lines() -> None:
+    buffer = _RingBuffer(TailCapture(max_bytes=None, max_lines=2))
+    buffer.write(b"first\nsec")
+    assert buffer.getvalue() == b"first\nsec"
+    buffer.write(b"ond\nthi")
+    assert buffer.getvalue() == b"second\nthi"
+    buffer.write(b"rd\n")
+    assert buffer.getvalue() == b"second\nthird\n"
+    buffer.write(b"frame=1\rframe=2\rframe=3")
+    assert buffer.getvalue() == b"frame=2\rframe=3"
+
+
+def test_ring_buffer_max_bytes_and_lines() -> None:
+    buffer = _RingBuffer(TailCapture(max_bytes=8, max_lines=3))
+    buffer.write(b"a\nb\nc\nd\n")
+    assert buffer.getvalue() == b"b\nc\nd\n"
+    buffer.write(b"a very long line")
+    assert buffer.getvalue() == b"ong line"
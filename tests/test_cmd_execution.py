@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import pathlib
 import subprocess
 import threading
 import time
+from typing import AsyncIterator, Iterator
 from unittest import mock
 
 import pytest
 
-from ffmpy import FFExecutableNotFoundError, FFmpeg, FFRuntimeError
+from ffmpy import FFExecutableNotFoundError, FFmpeg, FFRuntimeError, TailCapture
 
 FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
 os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
@@ -260,3 +263,203 @@ def test_runtime_error_with_non_utf8_bytes(popen_mock: mock.MagicMock) -> None:
 
     with pytest.raises(FFRuntimeError):
         ff.run(stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def test_run_async_redirect_to_pipe() -> None:
+    global_options = "--stdin pipe --stdout oneline --stderr multiline --exit-code 0"
+    ff = FFmpeg(global_options=global_options)
+    stdout, stderr = asyncio.run(
+        ff.run_async(input_data=b"my input data", stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    )
+    assert stdout == b"my input data\nThis is printed to stdout"
+    assert stderr == b"These are\nmultiple lines\nprinted to stderr"
+
+
+def test_run_async_non_zero_exitcode() -> None:
+    global_options = "--stdin none --stdout multiline --stderr multiline --exit-code 42"
+    ff = FFmpeg(global_options=global_options)
+    with pytest.raises(FFRuntimeError) as exc_info:
+        asyncio.run(ff.run_async(stdout=subprocess.PIPE, stderr=subprocess.PIPE))
+
+    assert exc_info.value.exit_code == 42
+    assert exc_info.value.stdout == b"These are\nmultiple lines\nprinted to stdout"
+    assert exc_info.value.stderr == b"These are\nmultiple lines\nprinted to stderr"
+
+
+def test_run_async_invalid_executable_path() -> None:
+    ff = FFmpeg(executable="/tmp/foo/bar/ffmpeg")
+    with pytest.raises(FFExecutableNotFoundError) as exc_info:
+        asyncio.run(ff.run_async())
+    assert str(exc_info.value) == "Executable '/tmp/foo/bar/ffmpeg' not found"
+
+
+def test_run_async_cancel() -> None:
+    ff = FFmpeg(global_options="--long-run")
+
+    async def run_and_cancel() -> None:
+        task = asyncio.ensure_future(ff.run_async())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run_and_cancel())
+    assert ff.process is not None
+    assert ff.process.returncode == -9
+
+
+def test_run_async_concurrent() -> None:
+    global_options = "--stdin none --stdout oneline --stderr none --exit-code 0"
+
+    async def run_many() -> list[tuple[bytes | None, bytes | None]]:
+        ffs = [FFmpeg(global_options=global_options) for _ in range(10)]
+        return await asyncio.gather(*(ff.run_async(stdout=subprocess.PIPE) for ff in ffs))
+
+    results = asyncio.run(run_many())
+    assert results == [(b"This is printed to stdout", None)] * 10
+
+
+def test_stream() -> None:
+    global_options = "--stdin none --stdout-bytes 1000000 --stderr none --exit-code 0"
+    ff = FFmpeg(global_options=global_options)
+    chunks = list(ff.stream(chunk_size=4096))
+    assert all(0 < len(chunk) <= 4096 for chunk in chunks)
+    assert b"".join(chunks) == b"x" * 1000000
+    assert ff.process is not None
+    assert ff.process.returncode == 0
+
+
+def test_stream_input() -> None:
+    global_options = "--stdin echo --stdout none --stderr none --exit-code 0"
+    ff = FFmpeg(global_options=global_options)
+    input_data = os.urandom(1000000)
+    assert b"".join(ff.stream(input_data=input_data)) == input_data
+
+
+def test_stream_non_zero_exitcode() -> None:
+    global_options = "--stdin none --stdout multiline --stderr multiline --exit-code 42"
+    ff = FFmpeg(global_options=global_options)
+    chunks = []
+    with pytest.raises(FFRuntimeError) as exc_info:
+        for chunk in ff.stream(stderr=subprocess.PIPE):
+            chunks.append(chunk)
+
+    assert b"".join(chunks) == b"These are\nmultiple lines\nprinted to stdout"
+    assert exc_info.value.exit_code == 42
+    assert exc_info.value.stdout is None
+    assert exc_info.value.stderr == b"These are\nmultiple lines\nprinted to stderr"
+
+
+def test_stream_close_early() -> None:
+    global_options = "--stdin none --stdout-bytes 100000000 --long-run"
+    ff = FFmpeg(global_options=global_options)
+    stream = ff.stream()
+    assert next(stream)
+    stream.close()
+    assert ff.process is not None
+    assert ff.process.returncode == -9
+
+
+def test_stream_invalid_executable_path() -> None:
+    ff = FFmpeg(executable="/tmp/foo/bar/ffmpeg")
+    with pytest.raises(FFExecutableNotFoundError):
+        next(ff.stream())
+
+
+def test_input_file_object(tmp_path: pathlib.Path) -> None:
+    input_data = os.urandom(1000000)
+    input_path = tmp_path / "input"
+    input_path.write_bytes(input_data)
+
+    ff = FFmpeg(global_options="--stdin echo --stdout none --stderr none --exit-code 0")
+    with open(input_path, "rb") as f:
+        stdout, stderr = ff.run(input_data=f, stdout=subprocess.PIPE)
+    assert stdout == input_data
+    assert stderr is None
+
+
+def test_input_iterable() -> None:
+    chunks = [os.urandom(100000) for _ in range(10)]
+    ff = FFmpeg(global_options="--stdin echo --stdout none --stderr oneline --exit-code 0")
+    stdout, stderr = ff.run(input_data=iter(chunks), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert stdout == b"".join(chunks)
+    assert stderr == b"This is printed to stderr"
+
+
+def test_input_iterable_non_zero_exitcode() -> None:
+    ff = FFmpeg(global_options="--stdin echo --stdout none --stderr none --exit-code 42")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        ff.run(input_data=[b"my ", b"input ", b"data"], stdout=subprocess.PIPE)
+    assert exc_info.value.exit_code == 42
+    assert exc_info.value.stdout == b"my input data"
+
+
+def test_input_iterable_error() -> None:
+    def chunks() -> Iterator[bytes]:
+        yield b"my input data"
+        raise ValueError("broken source")
+
+    ff = FFmpeg(global_options="--stdin echo --long-run")
+    with pytest.raises(ValueError, match="broken source"):
+        ff.run(input_data=chunks(), stdout=subprocess.PIPE)
+    assert ff.process is not None
+    assert ff.process.returncode == -9
+
+
+def test_stream_input_iterable() -> None:
+    chunks = [os.urandom(100000) for _ in range(10)]
+    ff = FFmpeg(global_options="--stdin echo --stdout none --stderr none --exit-code 0")
+    assert b"".join(ff.stream(input_data=iter(chunks))) == b"".join(chunks)
+
+
+def test_run_async_input_async_iterable() -> None:
+    chunks = [os.urandom(100000) for _ in range(10)]
+
+    async def produce() -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+    ff = FFmpeg(global_options="--stdin echo --stdout none --stderr none --exit-code 0")
+    stdout, stderr = asyncio.run(ff.run_async(input_data=produce(), stdout=subprocess.PIPE))
+    assert stdout == b"".join(chunks)
+    assert stderr is None
+
+
+def test_run_async_input_iterable() -> None:
+    chunks = [os.urandom(100000) for _ in range(10)]
+    ff = FFmpeg(global_options="--stdin echo --stdout none --stderr none --exit-code 0")
+    stdout, _ = asyncio.run(ff.run_async(input_data=chunks, stdout=subprocess.PIPE))
+    assert stdout == b"".join(chunks)
+
+
+def test_stderr_tail_capture() -> None:
+    ff = FFmpeg(global_options="--stdout oneline --stderr-lines 100000 --exit-code 0")
+    stdout, stderr = ff.run(stdout=subprocess.PIPE, stderr=TailCapture(max_lines=2))
+    assert stdout == b"This is printed to stdout"
+    assert stderr == b"stderr line 99999\nstderr line 100000\n"
+
+
+def test_stderr_tail_capture_non_zero_exitcode() -> None:
+    ff = FFmpeg(global_options="--stderr-lines 100000 --exit-code 42")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        ff.run(stderr=TailCapture(max_bytes=19))
+    assert exc_info.value.exit_code == 42
+    assert exc_info.value.stdout is None
+    assert exc_info.value.stderr == b"stderr line 100000\n"
+
+
+def test_stream_stderr_tail_capture() -> None:
+    ff = FFmpeg(global_options="--stdout-bytes 1000 --stderr-lines 100000 --exit-code 42")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        for _ in ff.stream(stderr=TailCapture(max_lines=1)):
+            pass
+    assert exc_info.value.stderr == b"stderr line 100000\n"
+
+
+def test_run_async_stderr_tail_capture() -> None:
+    ff = FFmpeg(global_options="--stdout oneline --stderr-lines 100000 --exit-code 42")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        asyncio.run(ff.run_async(stdout=subprocess.PIPE, stderr=TailCapture(max_lines=1)))
+    assert exc_info.value.stdout == b"This is printed to stdout"
+    assert exc_info.value.stderr == b"stderr line 100000\n"
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import subprocess
+from typing import Iterator
+
+import pytest
+
+from ffmpy import FFmpeg
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="pass_fds requires POSIX")
+
+
+def copy_pipes() -> FFmpeg:
+    return FFmpeg(
+        global_options="--copy-pipes",
+        inputs={"pipe:video": None, "pipe:audio": None},
+        outputs={"pipe:first": None, "pipe:second": None},
+    )
+
+
+def open_fds() -> int:
+    return len(os.listdir("/dev/fd"))
+
+
+def test_run_with_pipes() -> None:
+    video = os.urandom(3 * 2**20)
+    audio = os.urandom(2**20)
+    first = io.BytesIO()
+    second: list[bytes] = []
+    ff = copy_pipes()
+
+    fds = open_fds()
+    ff.run(
+        pipes={
+            "video": video,
+            "audio": io.BytesIO(audio),
+            "first": first,
+            "second": second.append,
+        }
+    )
+
+    assert first.getvalue() == video + audio
+    assert b"".join(second) == video + audio
+    assert open_fds() == fds
+    assert ff.cmd == "ffmpeg --copy-pipes -i pipe:video -i pipe:audio pipe:first pipe:second"
+
+
+def test_run_with_pipes_and_stdio() -> None:
+    first = io.BytesIO()
+    second = io.BytesIO()
+    ff = FFmpeg(
+        global_options="--copy-pipes --stdin echo",
+        inputs={"pipe:0": None, "pipe:video": None, "pipe:audio": None},
+        outputs={"pipe:1": None, "pipe:first": None, "pipe:second": None},
+    )
+
+    stdout, _ = ff.run(
+        input_data=b"stdin",
+        stdout=subprocess.PIPE,
+        pipes={
+            "video": iter([b"vid", b"eo"]),
+            "audio": b"audio",
+            "first": first,
+            "second": second,
+        },
+    )
+
+    assert stdout == b"stdin"
+    assert first.getvalue() == second.getvalue() == b"videoaudio"
+
+
+def test_stream_with_pipes() -> None:
+    output = io.BytesIO()
+    ff = FFmpeg(
+        global_options="--copy-pipes --stdout-bytes 100000",
+        inputs={"pipe:video": None},
+        outputs={"pipe:1": None, "pipe:copy": None},
+    )
+
+    stdout = b"".join(ff.stream(pipes={"video": b"x" * 10, "copy": output}))
+
+    assert len(stdout) == 100000
+    assert output.getvalue() == b"x" * 10
+
+
+def test_run_async_with_pipes() -> None:
+    first = io.BytesIO()
+    second = io.BytesIO()
+    ff = copy_pipes()
+
+    asyncio.run(
+        ff.run_async(pipes={"video": b"video", "audio": b"audio", "first": first, "second": second})
+    )
+
+    assert first.getvalue() == second.getvalue() == b"videoaudio"
+
+
+def test_input_pipe_error_kills_process() -> None:
+    def video() -> Iterator[bytes]:
+        yield b"video"
+        raise RuntimeError("input failed")
+
+    ff = FFmpeg(global_options="--copy-pipes --long-run", inputs={"pipe:video": None})
+    with pytest.raises(RuntimeError, match="input failed"):
+        ff.run(pipes={"video": video()})
+    assert ff.process is not None
+    assert ff.process.returncode == -9
+
+
+def test_output_pipe_error_kills_process() -> None:
+    def output(chunk: bytes) -> None:
+        raise RuntimeError("output failed")
+
+    ff = FFmpeg(
+        global_options="--copy-pipes --long-run",
+        inputs={"pipe:video": None},
+        outputs={"pipe:output": None},
+    )
+    with pytest.raises(RuntimeError, match="output failed"):
+        ff.run(pipes={"video": b"video", "output": output})
+    assert ff.process is not None
+    assert ff.process.returncode == -9
+
+
+@pytest.mark.parametrize(
+    "pipes,error,message",
+    [
+        ({"video": b"", "unknown": b""}, ValueError, "Pipes not used in the command line"),
+        ({"video": lambda chunk: None}, TypeError, "Input 'pipe:video' needs data"),
+        ({"video": b"", "first": b"data"}, TypeError, "Output 'pipe:first' needs a file"),
+    ],
+)
+def test_invalid_pipes(pipes: dict, error: type[Exception], message: str) -> None:
+    ff = FFmpeg(inputs={"pipe:video": None}, outputs={"pipe:first": None})
+    fds = open_fds()
+    with pytest.raises(error, match=message):
+        ff.run(pipes=pipes)
+    assert ff.process is None
+    assert open_fds() == fds
+
+
+def test_pipe_used_more_than_once() -> None:
+    ff = FFmpeg(inputs={"pipe:video": None}, outputs={"pipe:video": None})
+    with pytest.raises(ValueError, match="Pipe 'pipe:video' is used more than once"):
+        ff.run(pipes={"video": b""})
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from ffmpy import Capabilities, FFExecutableNotFoundError, FFmpeg, FFprobe
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["psutil", "asyncio", "sqlite3", "logging", "tempfile", "concurrent.futures", "ffmpy.probe"],
+)
+def test_import_is_lazy(module: str) -> None:
+    code = f"import sys, ffmpy; sys.exit({module!r} in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_lazy_names() -> None:
+    import ffmpy
+
+    assert ffmpy.ProbeResult.__module__ == "ffmpy.probe"
+    assert set(ffmpy.__all__) <= set(dir(ffmpy))
+    with pytest.raises(AttributeError):
+        ffmpy.NotAName  # noqa: B018
+
+
+def test_run() -> None:
+    ff = FFmpeg(global_options="--stdout oneline")
+    stdout, _ = ff.run(stdout=subprocess.PIPE, fast_spawn=True)
+
+    assert stdout == b"This is printed to stdout"
+    assert type(ff.process) is subprocess.Popen
+    assert ff.process.args == [os.path.join(FFMPEG_PATH, "ffmpeg"), "--stdout", "oneline"]
+    assert ff.cmd == "ffmpeg --stdout oneline"
+    assert ff.stats is not None
+
+
+def test_run_with_sample_interval() -> None:
+    psutil = pytest.importorskip("psutil")
+    ff = FFmpeg()
+    ff.run(fast_spawn=True, sample_interval=1.0)
+    assert isinstance(ff.process, psutil.Popen)
+    assert ff.process.args[0] == os.path.join(FFMPEG_PATH, "ffmpeg")
+
+
+def test_default_mode_uses_psutil() -> None:
+    psutil = pytest.importorskip("psutil")
+    ff = FFmpeg()
+    ff.run()
+    assert isinstance(ff.process, psutil.Popen)
+    assert ff.process.args[0] == "ffmpeg"
+
+
+def test_stream() -> None:
+    ff = FFmpeg(global_options="--stdout-bytes 10")
+    assert b"".join(ff.stream(fast_spawn=True)) == b"x" * 10
+    assert type(ff.process) is subprocess.Popen
+
+
+def test_probe() -> None:
+    path = os.path.join(FFMPEG_PATH, "ffmpeg.go")
+    result = FFprobe.probe(path, executable="ffmpeg", cache=None, fast_spawn=True)
+    assert result.duration == 10.01
+
+
+def test_path_of_env(tmp_path: pathlib.Path) -> None:
+    ff = FFmpeg()
+    with pytest.raises(FFExecutableNotFoundError):
+        ff.run(env={"PATH": str(tmp_path)}, fast_spawn=True)
+
+
+def test_executable_not_found() -> None:
+    ff = FFmpeg(executable="/tmp/foo/bar/ffmpeg")
+    with pytest.raises(FFExecutableNotFoundError):
+        ff.run(fast_spawn=True)
+    ff = FFmpeg(executable="ffmpeg-not-installed")
+    with pytest.raises(FFExecutableNotFoundError):
+        ff.run(fast_spawn=True)
+
+
+def test_executable_installed_later(tmp_path: pathlib.Path) -> None:
+    ff = FFmpeg()
+    env = {"PATH": str(tmp_path)}
+    with pytest.raises(FFExecutableNotFoundError):
+        ff.run(env=env, fast_spawn=True)
+    shutil.copy(os.path.join(FFMPEG_PATH, "ffmpeg"), tmp_path)
+    ff.run(env=env, fast_spawn=True)
+    assert ff.process is not None
+    assert ff.process.args[0] == str(tmp_path / "ffmpeg")  # type: ignore[union-attr,index]
+
+
+def test_same_path_as_capabilities() -> None:
+    ff = FFmpeg()
+    ff.run(fast_spawn=True)
+    assert ff.process is not None
+    assert ff.process.args[0] == Capabilities().path  # type: ignore[union-attr,index]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import subprocess
+
+import pytest
+
+from ffmpy import FFRuntimeError, FrameWriter
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def test_video_writer_cmd() -> None:
+    writer = FrameWriter.video(
+        "output.mp4", 640, 480, frame_rate="30000/1001", output_options="-c:v libx264"
+    )
+    assert writer.ff.cmd == (
+        "ffmpeg -f rawvideo -pix_fmt rgb24 -s 640x480 -framerate 30000/1001 -i pipe:0 "
+        "-c:v libx264 output.mp4"
+    )
+    assert writer.frame_size == 640 * 480 * 3
+    assert FrameWriter.video("output.mp4", 640, 480, pix_fmt="rgb48le").frame_size == 640 * 480 * 6
+    assert FrameWriter.video("output.mp4", 640, 480, pix_fmt="yuv420p").frame_size is None
+
+
+def test_audio_writer_cmd() -> None:
+    writer = FrameWriter.audio("output.wav", sample_rate=44100, channels=1, sample_fmt="f32le")
+    assert writer.ff.cmd == "ffmpeg -f f32le -ar 44100 -ac 1 -i pipe:0 output.wav"
+    assert writer.frame_size is None
+
+
+def test_write() -> None:
+    writer = FrameWriter.video("-", 4, 2, global_options="--stdin echo --stderr oneline")
+    writer.open(stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with writer:
+        writer.write(bytes(range(24)))
+        writer.write(bytearray(range(24, 72)))
+        writer.write(memoryview(bytes(range(72, 96))))
+
+    assert writer.close() == (bytes(range(96)), b"This is printed to stderr")
+    assert writer.ff.stats is not None
+    assert writer.ff.stats.stdin_bytes == 96
+    assert writer.ff.process is not None
+    assert writer.ff.process.returncode == 0
+
+
+def test_write_numpy_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    frames = np.arange(4 * 2 * 4 * 3, dtype=np.uint8).reshape(4, 2, 4, 3)
+    writer = FrameWriter.video("-", 4, 2, global_options="--stdin echo")
+    writer.open(stdout=subprocess.PIPE)
+    with writer:
+        writer.write(frames[0])
+        # Not contiguous, copied before writing
+        writer.write(frames[1::2])
+
+    stdout, _ = writer.close()
+    assert stdout == frames[0].tobytes() + frames[1::2].tobytes()
+
+
+def test_write_partial_frame() -> None:
+    with FrameWriter.video("-", 4, 2, global_options="--stdin discard") as writer:
+        with pytest.raises(ValueError, match="Expected whole frames of 24 bytes, got 30 bytes"):
+            writer.write(b"x" * 30)
+
+
+def test_write_after_close() -> None:
+    with FrameWriter.audio("-", global_options="--stdin discard") as writer:
+        writer.write(b"data")
+    with pytest.raises(ValueError, match="Write to a closed writer"):
+        writer.write(b"data")
+
+
+def test_non_zero_exitcode() -> None:
+    writer = FrameWriter.audio("-", global_options="--stdin discard --exit-code 1 --stderr oneline")
+    writer.open(stderr=subprocess.PIPE)
+    with pytest.raises(FFRuntimeError) as exc_info:
+        with writer:
+            writer.write(b"data")
+    assert exc_info.value.exit_code == 1
+    assert exc_info.value.stderr == b"This is printed to stderr"
+
+
+def test_ffmpeg_exits_early() -> None:
+    writer = FrameWriter.audio("-", global_options="--exit-code 1")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        with writer:
+            for _ in range(100):
+                writer.write(b"x" * 2**20)
+    assert exc_info.value.exit_code == 1
+
+
+def test_error_while_writing_kills_process() -> None:
+    writer = FrameWriter.audio("-", global_options="--stdin discard --long-run")
+    with pytest.raises(RuntimeError, match="no more samples"):
+        with writer:
+            writer.write(b"data")
+            raise RuntimeError("no more samples")
+    assert writer.ff.process is not None
+    assert writer.ff.process.returncode == -9
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from unittest import mock
+
+import pytest
+
+from ffmpy import FFRuntimeError, FrameReader
+
+pytest.importorskip("numpy")
+
+import numpy as np
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def sequence(start: int, stop: int) -> np.ndarray:
+    """The bytes the fake ffmpeg writes with ``--stdout-sequence`` between the offsets."""
+    return np.arange(start, stop) % 251
+
+
+def test_read_frames() -> None:
+    reader = FrameReader("input.mp4", width=4, height=2, input_options="--stdout-sequence 240")
+    assert reader.shape == (2, 4, 3)
+    assert reader.ff.cmd == (
+        "ffmpeg --stdout-sequence 240 -i input.mp4 -f rawvideo -pix_fmt rgb24 pipe:1"
+    )
+
+    frames = []
+    buffers = []
+    for frame in reader:
+        assert frame.shape == (2, 4, 3)
+        assert frame.dtype == np.uint8
+        frames.append(frame.copy())
+        buffers.append(frame)
+
+    assert len(frames) == 10
+    for index, frame in enumerate(frames):
+        assert (frame.ravel() == sequence(index * 24, (index + 1) * 24)).all()
+    # Every frame is read into the same buffer
+    assert all(np.shares_memory(buffers[0], buffer) for buffer in buffers)
+    assert reader.ff.stats is not None
+    assert reader.ff.stats.stdout_bytes == 240
+
+
+def test_read_frames_in_batches() -> None:
+    reader = FrameReader(
+        "input.mp4",
+        width=2,
+        height=2,
+        pix_fmt="gray16le",
+        batch_size=3,
+        input_options="--stdout-sequence 80",
+    )
+
+    batches = [batch.copy() for batch in reader]
+
+    assert [batch.shape for batch in batches] == [(3, 2, 2, 1)] * 3 + [(1, 2, 2, 1)]
+    assert all(batch.dtype == np.dtype("<u2") for batch in batches)
+    data = np.concatenate([batch.ravel() for batch in batches]).view(np.uint8)
+    assert (data == sequence(0, 80)).all()
+
+
+def test_read_frames_ignores_incomplete_frame() -> None:
+    reader = FrameReader(
+        "input.mp4", width=2, height=2, batch_size=4, input_options="--stdout-sequence 50"
+    )
+    assert [batch.shape[0] for batch in reader] == [4]
+
+
+def test_read_frames_probes_dimensions(tmp_path: pathlib.Path) -> None:
+    media_file = tmp_path / "input.mp4"
+    media_file.touch()
+
+    reader = FrameReader(media_file, pix_fmt="rgba", probe_executable="ffmpeg")
+
+    assert (reader.width, reader.height) == (1920, 1080)
+    assert reader.shape == (1080, 1920, 4)
+
+
+def test_read_frames_failure() -> None:
+    reader = FrameReader(
+        "input.mp4", width=4, height=2, input_options="--stdout-sequence 48 --exit-code 1"
+    )
+    with pytest.raises(FFRuntimeError):
+        for _ in reader:
+            pass
+
+
+def test_read_frames_stopped_early() -> None:
+    reader = FrameReader(
+        "input.mp4", width=4, height=2, input_options="--stdout-sequence 480 --long-run"
+    )
+    frames = reader.read()
+    next(frames)
+    frames.close()
+    assert reader.ff.process is not None
+    assert reader.ff.process.returncode == -9
+
+
+@pytest.mark.parametrize(
+    "kwargs,message",
+    [
+        ({"pix_fmt": "yuv420p"}, "Unsupported pixel format 'yuv420p'"),
+        ({"batch_size": 0}, "batch_size must be greater than 0"),
+    ],
+)
+def test_invalid_arguments(kwargs: dict, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        FrameReader("input.mp4", width=4, height=2, **kwargs)
+
+
+def test_numpy_required() -> None:
+    with mock.patch.dict("sys.modules", {"numpy": None}):
+        with pytest.raises(ImportError, match="NumPy is required"):
+            FrameReader("input.mp4", width=4, height=2)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import pickle
+import subprocess
+
+import pytest
+
+from ffmpy import FFmpeg, JobQueue
+from ffmpy.journal import DONE, FAILED, PENDING, RUNNING
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def make_job(exit_code: int = 0, options: str = "") -> FFmpeg:
+    return FFmpeg(global_options=f"--exit-code {exit_code} --stderr oneline {options}".strip())
+
+
+def test_add(tmp_path: pathlib.Path) -> None:
+    with JobQueue(tmp_path / "journal.db") as queue:
+        assert queue.add([make_job(0), make_job(1)]) == 2
+        assert queue.add([make_job(0), make_job(2)]) == 1
+        assert queue.add({"custom": make_job(0)}) == 1
+        assert queue.add({"custom": make_job(3)}) == 0
+
+        assert len(queue) == 4
+        entries = queue.entries()
+        assert [entry.id for entry in entries] == [1, 2, 3, 4]
+        assert [entry.key for entry in entries] == [
+            "ffmpeg --exit-code 0 --stderr oneline",
+            "ffmpeg --exit-code 1 --stderr oneline",
+            "ffmpeg --exit-code 2 --stderr oneline",
+            "custom",
+        ]
+        assert entries[3].args == ("ffmpeg", "--exit-code", "0", "--stderr", "oneline")
+        assert entries[3].job.cmd == "ffmpeg --exit-code 0 --stderr oneline"
+        assert all(entry.state == PENDING and entry.attempts == 0 for entry in entries)
+        assert queue.counts() == {PENDING: 4, RUNNING: 0, DONE: 0, FAILED: 0}
+        assert pickle.loads(pickle.dumps(entries[3])) == entries[3]
+
+
+def test_run(tmp_path: pathlib.Path) -> None:
+    with JobQueue(tmp_path / "journal.db", max_workers=2) as queue:
+        queue.add([make_job(0), make_job(42), make_job(0, "--stdout oneline")])
+        entries = sorted(queue.run(stdout=subprocess.PIPE), key=lambda entry: entry.id)
+
+        assert [entry.state for entry in entries] == [DONE, FAILED, DONE]
+        assert [entry.exit_code for entry in entries] == [0, 42, 0]
+        assert [entry.attempts for entry in entries] == [1, 1, 1]
+        assert entries[0].error is None
+        assert entries[1].error is not None
+        assert entries[1].error.startswith("FFRuntimeError: ")
+        # stderr is captured by default
+        assert "This is printed to stderr" in entries[1].error
+        assert all(entry.wall_time is not None for entry in entries)
+        assert queue.entries() == entries
+        assert queue.counts() == {PENDING: 0, RUNNING: 0, DONE: 2, FAILED: 1}
+
+
+def test_resume(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "journal.db"
+    with JobQueue(path) as queue:
+        queue.add([make_job(0), make_job(1)])
+        assert len(list(queue.run())) == 2
+
+    with JobQueue(path) as queue:
+        # Adding the same jobs again on restart does not run the completed ones again
+        assert queue.add([make_job(0), make_job(1), make_job(0, "--stdout oneline")]) == 1
+        assert list(queue.run(retry_failed=False)) == [queue.entries(DONE)[1]]
+
+        (entry,) = queue.run()
+        assert (entry.id, entry.state, entry.attempts) == (2, FAILED, 2)
+        assert [entry.attempts for entry in queue.entries()] == [1, 2, 1]
+
+
+def test_interrupted_jobs_are_pending_when_reopened(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "journal.db"
+    queue = JobQueue(path)
+    queue.add([make_job(0)])
+    # A process that stopped while the job was running never recorded its completion
+    queue._start(1)
+    assert queue.entries()[0].state == RUNNING
+    queue.close()
+
+    with JobQueue(path) as queue:
+        (entry,) = queue.entries()
+        assert (entry.state, entry.attempts) == (PENDING, 1)
+        assert [entry.state for entry in queue.run()] == [DONE]
+
+
+def test_abandoned_run_leaves_jobs_pending(tmp_path: pathlib.Path) -> None:
+    with JobQueue(tmp_path / "journal.db", max_workers=2) as queue:
+        long_job = FFmpeg(global_options="--long-run")
+        queue.add([make_job(0), long_job])
+
+        entries = queue.run()
+        assert next(entries).state == DONE
+        entries.close()
+
+        assert [(entry.state, entry.attempts) for entry in queue.entries()] == [
+            (DONE, 1),
+            (PENDING, 1),
+        ]
+
+
+def test_invalid_max_workers(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError, match="max_workers must be greater than 0"):
+        JobQueue(tmp_path / "journal.db", max_workers=0)
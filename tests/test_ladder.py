@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+import pickle
+
+import pytest
+
+from ffmpy import FFRuntimeError, Ladder, Rendition
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def test_ffmpeg() -> None:
+    ladder = Ladder(
+        "master.mov",
+        [
+            Rendition("1080p.mp4", height=1080, options="-c:v libx264 -b:v 6M -c:a aac"),
+            Rendition("360p.mp4", width=640, filters="fps=30", audio=False),
+            Rendition("source.mkv", options=["-c:v", "ffv1"]),
+        ],
+        input_options="-hwaccel auto",
+        filters="yadif",
+        global_options="-y",
+    )
+    assert ladder.ffmpeg()._cmd == [
+        *("ffmpeg", "-y", "-filter_complex"),
+        "[0:v:0]yadif,split=3[s0][s1][s2];"
+        "[s0]scale=-2:1080[v0];[s1]scale=640:-2,fps=30[v1];[s2]null[v2]",
+        *("-hwaccel", "auto", "-i", "master.mov"),
+        *("-map", "[v0]", "-map", "0:a:0?", "-c:v", "libx264", "-b:v", "6M", "-c:a", "aac"),
+        "1080p.mp4",
+        *("-map", "[v1]", "360p.mp4"),
+        *("-map", "[v2]", "-map", "0:a:0?", "-c:v", "ffv1", "source.mkv"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "renditions,filters,expected",
+    [
+        ([Rendition("a.mp4", 1280, 720)], None, "[0:v:0]scale=1280:720[v0]"),
+        ([Rendition("a.mp4")], None, "[0:v:0]null[v0]"),
+        ([Rendition("a.mp4")], "yadif", "[0:v:0]yadif[s0];[s0]null[v0]"),
+        (
+            [Rendition("a.mp4", height=720), Rendition("b.mp4", height=480)],
+            None,
+            "[0:v:0]split=2[s0][s1];[s0]scale=-2:720[v0];[s1]scale=-2:480[v1]",
+        ),
+    ],
+)
+def test_filter_graph(renditions: list[Rendition], filters: str | None, expected: str) -> None:
+    assert Ladder("input.mp4", renditions, filters=filters).filter_graph == expected
+
+
+def test_run() -> None:
+    ladder = Ladder("input.mp4", [Rendition("a.mp4")], global_options="--exit-code 1")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        ladder.run()
+    assert exc_info.value.cmd.startswith("ffmpeg --exit-code 1 -filter_complex")
+
+
+def test_rendition_pickle() -> None:
+    rendition = Rendition("720p.mp4", height=720, options="-c:v libx264", audio=False)
+    assert rendition.options == ("-c:v", "libx264")
+    assert pickle.loads(pickle.dumps(rendition)) == rendition
+
+
+def test_invalid_renditions() -> None:
+    with pytest.raises(ValueError, match="renditions must not be empty"):
+        Ladder("input.mp4", [])
+    with pytest.raises(ValueError, match="Every rendition must have a different output"):
+        Ladder("input.mp4", [Rendition("a.mp4", height=720), Rendition("a.mp4", height=480)])
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import pickle
+import subprocess
+
+import pytest
+
+from ffmpy import FFmpeg, FFRuntimeError, LogCapture, LogEntry, TailCapture
+from ffmpy.capture import _LogBuffer
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+SAMPLE_ENTRIES = [
+    LogEntry(
+        "info",
+        "in#0/mov,mp4,m4a,3gp,3g2,mj2",
+        "Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'input.mp4':",
+    ),
+    LogEntry("error", "h264", "concealing 12 DC, 12 AC, 12 MV errors in P frame"),
+    LogEntry("error", "h264", "concealing 12 DC, 12 AC, 12 MV errors in P frame"),
+    LogEntry(
+        "info", None, "frame=  125 fps=100 q=28.0 size=     512KiB time=00:00:05.00 speed=4.0x"
+    ),
+    LogEntry("warning", "out#0/mp4", "3 frames left in the queue on closing"),
+    LogEntry(
+        "info", None, "frame=  250 fps=100 q=-1.0 Lsize=    1024KiB time=00:00:10.00 speed=4.0x"
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "line,expected",
+    [
+        ("[h264 @ 0x55d5c8a0] [error] concealing", LogEntry("error", "h264", "concealing")),
+        ("[info] frame=  250", LogEntry("info", None, "frame=  250")),
+        ("[Parsed_scale_0 @ 0x5b] scaling", LogEntry(None, "Parsed_scale_0", "scaling")),
+        ("Press [q] to stop", LogEntry(None, None, "Press [q] to stop")),
+        ("[unknown] text", LogEntry(None, None, "[unknown] text")),
+    ],
+)
+def test_parse(line: str, expected: LogEntry) -> None:
+    assert LogEntry.parse(line) == expected
+
+
+def test_run_logs_entries(caplog: pytest.LogCaptureFixture) -> None:
+    ff = FFmpeg(global_options="--log-sample")
+    with caplog.at_level(logging.DEBUG, logger="transcode"):
+        stdout, stderr = ff.run(stderr=LogCapture("transcode"))
+
+    assert ff.cmd == "ffmpeg --log-sample"
+    assert stdout is None
+    assert stderr is not None
+    assert stderr.endswith(
+        b"[info] frame=  250 fps=100 q=-1.0 Lsize=    1024KiB time=00:00:10.00 speed=4.0x\n"
+    )
+    assert [(record.levelno, record.getMessage()) for record in caplog.records] == [
+        (
+            logging.INFO,
+            "[in#0/mov,mp4,m4a,3gp,3g2,mj2] Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'input.mp4':",
+        ),
+        (logging.ERROR, "[h264] concealing 12 DC, 12 AC, 12 MV errors in P frame"),
+        (logging.ERROR, "[h264] concealing 12 DC, 12 AC, 12 MV errors in P frame"),
+        (logging.INFO, "frame=  125 fps=100 q=28.0 size=     512KiB time=00:00:05.00 speed=4.0x"),
+        (logging.WARNING, "[out#0/mp4] 3 frames left in the queue on closing"),
+        (logging.INFO, "frame=  250 fps=100 q=-1.0 Lsize=    1024KiB time=00:00:10.00 speed=4.0x"),
+    ]
+    assert vars(caplog.records[1])["ffmpeg_level"] == "error"
+    assert vars(caplog.records[1])["ffmpeg_component"] == "h264"
+
+    assert ff.stats is not None
+    assert ff.stats.log_counts == {"info": 3, "error": 2, "warning": 1}
+    assert ff.stats.warnings == 1
+    assert ff.stats.errors == 2
+
+
+def test_on_entry() -> None:
+    entries: list[LogEntry] = []
+    ff = FFmpeg(global_options="--log-sample")
+    ff.run(stderr=LogCapture(None, on_entry=entries.append))
+    assert entries == SAMPLE_ENTRIES
+
+
+def test_on_entry_failure(caplog: pytest.LogCaptureFixture) -> None:
+    calls = []
+
+    def on_entry(entry: LogEntry) -> None:
+        calls.append(entry)
+        raise RuntimeError("boom")
+
+    ff = FFmpeg(global_options="--log-sample")
+    ff.run(stderr=LogCapture(None, on_entry=on_entry))
+
+    assert len(calls) == 1
+    assert "on_entry of LogCapture failed" in caplog.text
+    assert ff.stats is not None
+    assert ff.stats.log_counts == {"info": 3, "error": 2, "warning": 1}
+
+
+def test_without_levels() -> None:
+    entries: list[LogEntry] = []
+    ff = FFmpeg(global_options="--log-sample")
+    ff.run(stderr=LogCapture(None, on_entry=entries.append, print_levels=False))
+    assert [entry.level for entry in entries] == [None] * 6
+    assert [entry.component for entry in entries] == [entry.component for entry in SAMPLE_ENTRIES]
+    assert ff.stats is not None
+    assert ff.stats.log_counts == {}
+    assert ff.stats.errors == 0
+
+
+def test_failure_keeps_tail() -> None:
+    ff = FFmpeg(global_options="--log-sample --exit-code 1")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        ff.run(stderr=LogCapture(None, max_lines=1))
+    assert exc_info.value.stderr == (
+        b"[info] frame=  250 fps=100 q=-1.0 Lsize=    1024KiB time=00:00:10.00 speed=4.0x\n"
+    )
+    assert ff.stats is not None
+    assert ff.stats.errors == 2
+
+
+def test_stream() -> None:
+    entries: list[LogEntry] = []
+    ff = FFmpeg(global_options="--log-sample --stdout-bytes 10")
+    assert b"".join(ff.stream(stderr=LogCapture(None, on_entry=entries.append))) == b"x" * 10
+    assert entries == SAMPLE_ENTRIES
+    assert ff.stats is not None
+    assert ff.stats.warnings == 1
+
+
+def test_run_async() -> None:
+    entries: list[LogEntry] = []
+    ff = FFmpeg(global_options="--log-sample")
+    asyncio.run(ff.run_async(stderr=LogCapture(None, on_entry=entries.append)))
+    assert entries == SAMPLE_ENTRIES
+    assert ff.stats is not None
+    assert ff.stats.log_counts == {"info": 3, "error": 2, "warning": 1}
+
+
+def test_tail_capture_does_not_count() -> None:
+    ff = FFmpeg(global_options="--log-sample")
+    ff.run(stdout=subprocess.PIPE, stderr=TailCapture())
+    assert ff.stats is not None
+    assert ff.stats.log_counts is None
+    assert ff.stats.warnings is None
+    assert ff.stats.errors is None
+
+
+def test_log_buffer_splits_lines_across_chunks() -> None:
+    entries: list[LogEntry] = []
+    buffer = _LogBuffer(LogCapture(None, on_entry=entries.append))
+    for chunk in [b"[err", b"or] first\r", b"\n[info] second\r[info] thi", b"rd\n\n", b"last"]:
+        buffer.write(chunk)
+    assert [entry.message for entry in entries] == ["first", "second", "third"]
+    buffer.flush()
+    assert entries[-1] == LogEntry(None, None, "last")
+    assert buffer.counts == {"error": 1, "info": 2}
+
+
+def test_command() -> None:
+    buffer = _LogBuffer(LogCapture())
+    assert buffer.command(["ffmpeg", "-i", "input.mp4"]) == [
+        *("ffmpeg", "-loglevel", "+repeat+level"),
+        *("-i", "input.mp4"),
+    ]
+    assert buffer.command(["ffmpeg", "-v", "error", "-i", "input.mp4"]) == [
+        *("ffmpeg", "-v", "repeat+level+error", "-i", "input.mp4"),
+    ]
+    assert buffer.command(["ffmpeg", "-loglevel", "+time+warning", "-v", "debug"]) == [
+        *("ffmpeg", "-loglevel", "repeat+level+time+warning", "-v", "repeat+level+debug"),
+    ]
+    assert _LogBuffer(LogCapture(print_levels=False)).command(["ffmpeg"]) == ["ffmpeg"]
+
+
+def test_keeps_selected_level() -> None:
+    entries: list[LogEntry] = []
+    ff = FFmpeg(global_options="-v warning --log-sample")
+    ff.run(stdout=subprocess.PIPE, stderr=LogCapture(None, on_entry=entries.append))
+    assert entries == [SAMPLE_ENTRIES[1], SAMPLE_ENTRIES[2], SAMPLE_ENTRIES[4]]
+    assert ff.stats is not None
+    assert ff.stats.log_counts == {"error": 2, "warning": 1}
+
+
+def test_log_capture_pickle() -> None:
+    capture = LogCapture("transcode", max_lines=10)
+    assert capture.logger is logging.getLogger("transcode")
+    restored = pickle.loads(pickle.dumps(capture))
+    assert restored == capture
+    assert isinstance(restored, TailCapture)
+    entry = LogEntry("warning", "h264", "frame size changed")
+    assert pickle.loads(pickle.dumps(entry)) == entry
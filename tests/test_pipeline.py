@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import subprocess
+
+import pytest
+
+from ffmpy import (
+    FFExecutableNotFoundError,
+    FFmpeg,
+    FFPipelineError,
+    FFRuntimeError,
+    Pipeline,
+    TailCapture,
+)
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def test_pipe_to() -> None:
+    first = FFmpeg(global_options="--stdin echo")
+    second = FFmpeg(global_options="--stdout oneline")
+    third = FFmpeg(global_options="--stdin discard")
+
+    pipeline = first.pipe_to(second)
+    assert isinstance(pipeline, Pipeline)
+    assert pipeline.stages == [first, second]
+    assert pipeline.cmd == "ffmpeg --stdin echo | ffmpeg --stdout oneline"
+    assert repr(pipeline) == "<'Pipeline' 'ffmpeg --stdin echo | ffmpeg --stdout oneline'>"
+    assert pipeline.pipe_to(third).stages == [first, second, third]
+    assert first.pipe_to(pipeline).stages == [first, first, second]
+
+
+def test_pipeline_requires_stages() -> None:
+    with pytest.raises(ValueError):
+        Pipeline([])
+
+
+def test_pipeline_run() -> None:
+    stages = [FFmpeg(global_options="--stdin echo --stderr oneline") for _ in range(3)]
+    pipeline = Pipeline(stages)
+
+    stdout, stderrs = pipeline.run(
+        input_data=iter([b"abc", b"def"]), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    assert stdout == b"abcdef"
+    assert stderrs == [b"This is printed to stderr"] * 3
+    for stage in stages:
+        assert stage.process is not None and stage.process.returncode == 0
+        assert stage.stats is not None
+    assert [stage.stats.stdin_bytes for stage in stages if stage.stats] == [6, 0, 0]
+    assert stages[0].stats is not None and stages[0].stats.stdout_bytes is None
+    assert stages[-1].stats is not None and stages[-1].stats.stdout_bytes == 6
+
+
+def test_pipeline_run_large_output() -> None:
+    size = 8 * 1024 * 1024
+    generate = FFmpeg(global_options=f"--stdout-bytes {size}")
+    expected, _ = generate.run(stdout=subprocess.PIPE)
+
+    stdout, stderrs = generate.pipe_to(FFmpeg(global_options="--stdin echo")).run(
+        stdout=subprocess.PIPE
+    )
+
+    assert stdout == expected
+    assert stderrs == [None, None]
+
+
+def test_pipeline_run_tail_capture() -> None:
+    pipeline = Pipeline(FFmpeg(global_options="--stdin echo --stderr-lines 100") for _ in range(2))
+    _, stderrs = pipeline.run(stderr=TailCapture(max_lines=1))
+    assert stderrs == [b"stderr line 100\n"] * 2
+
+
+@pytest.mark.parametrize(
+    "exit_codes,failed",
+    [
+        ((1, 0), 0),
+        ((0, 2), 1),
+        ((3, 4), 1),
+    ],
+)
+def test_pipeline_run_failure(exit_codes: tuple[int, int], failed: int) -> None:
+    stages = [
+        FFmpeg(global_options=f"--stdin echo --stderr-lines {index + 1} --exit-code {code}")
+        for index, code in enumerate(exit_codes)
+    ]
+    pipeline = Pipeline(stages)
+
+    with pytest.raises(FFPipelineError) as exc_info:
+        pipeline.run(input_data=b"data", stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    error = exc_info.value
+    assert isinstance(error, FFRuntimeError)
+    assert error.cmd == pipeline.cmd
+    assert error.cmds == [stage.cmd for stage in stages]
+    assert error.exit_codes == list(exit_codes)
+    assert error.exit_code == exit_codes[failed]
+    assert error.stdout == b"data"
+    assert error.stderrs == [b"stderr line 1\n", b"stderr line 1\nstderr line 2\n"]
+    assert error.stderr == error.stderrs[failed]
+    assert str(error) == (
+        f"`{pipeline.cmd}` exited with statuses {exit_codes[0]}, {exit_codes[1]}\n\n"
+        "STDOUT:\ndata\n\n"
+        f"STDERR of stage 0 (`{stages[0].cmd}`):\nstderr line 1\n\n\n"
+        f"STDERR of stage 1 (`{stages[1].cmd}`):\nstderr line 1\nstderr line 2\n"
+    )
+
+
+def test_pipeline_downstream_exits_early() -> None:
+    # The first stage gets a broken pipe once the second one has exited without reading
+    generate = FFmpeg(global_options="--stdout-bytes 100000000")
+    with pytest.raises(FFPipelineError) as exc_info:
+        generate.pipe_to(FFmpeg(global_options="--exit-code 1")).run()
+    assert exc_info.value.exit_codes[0] != 0
+    assert exc_info.value.exit_codes[1] == 1
+
+
+def test_pipeline_executable_not_found() -> None:
+    first = FFmpeg(global_options="--stdin echo")
+    pipeline = first.pipe_to(FFmpeg(executable="/tmp/foo/bar/ffmpeg"))
+    with pytest.raises(FFExecutableNotFoundError):
+        pipeline.run()
+    assert first.process is not None
+    assert first.process.returncode is not None
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+import subprocess
+import time
+
+import pytest
+
+from ffmpy import (
+    FFBatchError,
+    FFmpeg,
+    FFmpegPool,
+    FFRuntimeError,
+    FFTimeoutError,
+    JobResult,
+    run_many,
+    run_many_async,
+)
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def make_jobs(count: int) -> list[FFmpeg]:
+    return [
+        FFmpeg(global_options=f"--stdout-bytes {index + 1} --exit-code {42 if index == 3 else 0}")
+        for index in range(count)
+    ]
+
+
+def test_pool_run_ordered() -> None:
+    jobs = make_jobs(8)
+    results = list(FFmpegPool(max_workers=3).run(jobs, stdout=subprocess.PIPE))
+
+    assert [result.index for result in results] == list(range(8))
+    assert [result.job for result in results] == jobs
+    assert [result.ok for result in results] == [True, True, True, False, True, True, True, True]
+    assert results[0].stdout == b"x"
+    assert results[7].stdout == b"x" * 8
+    assert isinstance(results[3].error, FFRuntimeError)
+    assert results[3].error.exit_code == 42
+    assert results[3].error.stdout == b"x" * 4
+
+
+def test_pool_run_as_completed() -> None:
+    jobs = make_jobs(8)
+    results = list(FFmpegPool(max_workers=3).run(jobs, ordered=False, stdout=subprocess.PIPE))
+    assert sorted(result.index for result in results) == list(range(8))
+
+
+def test_pool_bounded_parallelism() -> None:
+    jobs = [FFmpeg(global_options="--long-run") for _ in range(4)]
+    pool = FFmpegPool(max_workers=2, timeout=0.5)
+
+    start = time.monotonic()
+    results = list(pool.run(jobs, grace_period=0.1))
+    elapsed = time.monotonic() - start
+
+    assert all(isinstance(result.error, FFTimeoutError) for result in results)
+    assert all(isinstance(result.error, TimeoutError) for result in results)
+    assert str(results[0].error).splitlines()[0] == (
+        "`ffmpeg --long-run` timed out after 0.5 seconds"
+    )
+    assert all(result.job.process.returncode == -15 for result in results)  # type: ignore[union-attr]
+    assert 1.0 <= elapsed < 3.0
+
+
+def test_pool_abandoned_before_process_started() -> None:
+    class SlowStartPool(FFmpegPool):
+        def _run_job(self, index: int, job: FFmpeg, kwargs: dict) -> JobResult:
+            if index == 1:
+                time.sleep(0.2)
+            return super()._run_job(index, job, kwargs)
+
+    long_job = FFmpeg(global_options="--long-run")
+    results = SlowStartPool(max_workers=2).run([FFmpeg(), long_job], ordered=False)
+    assert next(results).index == 0
+    # The long job has not started its process yet
+    results.close()
+    assert long_job.process is not None
+    assert long_job.process.returncode == -9
+
+
+def test_pool_abandoned_before_rerun_started() -> None:
+    class SlowStartPool(FFmpegPool):
+        def _run_job(self, index: int, job: FFmpeg, kwargs: dict) -> JobResult:
+            if index == 1:
+                time.sleep(0.2)
+            return super()._run_job(index, job, kwargs)
+
+    long_job = FFmpeg(global_options="--long-run")
+    with pytest.raises(FFTimeoutError):
+        long_job.run(timeout=0.1, grace_period=0.1)
+    previous_process = long_job.process
+
+    results = SlowStartPool(max_workers=2).run([FFmpeg(), long_job], ordered=False)
+    assert next(results).index == 0
+    # The long job still holds the exited process of its previous run
+    results.close()
+    assert long_job.process is not previous_process
+    assert long_job.process is not None
+    assert long_job.process.returncode == -9
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="requires os.wait4")
+@pytest.mark.parametrize("stdout", [subprocess.PIPE, subprocess.DEVNULL])
+def test_pool_run_stats(stdout: int) -> None:
+    jobs = [FFmpeg(global_options="--stdout-bytes 1000") for _ in range(8)]
+    results = list(FFmpegPool(max_workers=4).run(jobs, stdout=stdout))
+
+    assert all(result.ok for result in results)
+    for job in jobs:
+        assert job.stats is not None
+        assert job.stats.user_time is not None
+        assert job.stats.max_rss is not None
+
+
+def test_job_result_pickle() -> None:
+    result = JobResult(3, FFmpeg(global_options="--exit-code 42"), b"out", None, None)
+    restored = pickle.loads(pickle.dumps(result))
+    assert (restored.index, restored.stdout, restored.stderr, restored.error) == (
+        3,
+        b"out",
+        None,
+        None,
+    )
+    assert restored.job.cmd == result.job.cmd
+
+
+def test_pool_invalid_max_workers() -> None:
+    with pytest.raises(ValueError):
+        FFmpegPool(max_workers=0)
+
+
+def test_pool_run_async() -> None:
+    jobs = make_jobs(8)
+
+    async def collect() -> list[JobResult]:
+        pool = FFmpegPool(max_workers=3)
+        return [result async for result in pool.run_async(jobs, stdout=subprocess.PIPE)]
+
+    results = asyncio.run(collect())
+    assert [result.index for result in results] == list(range(8))
+    assert [result.stdout for result in results if result.ok] == [
+        b"x" * size for size in (1, 2, 3, 5, 6, 7, 8)
+    ]
+    assert isinstance(results[3].error, FFRuntimeError)
+
+
+def test_pool_run_async_timeout() -> None:
+    jobs = [FFmpeg(global_options="--long-run") for _ in range(4)]
+
+    async def collect() -> list[JobResult]:
+        pool = FFmpegPool(max_workers=2, timeout=0.3)
+        return [result async for result in pool.run_async(jobs, ordered=False, grace_period=0.1)]
+
+    results = asyncio.run(collect())
+    assert all(isinstance(result.error, FFTimeoutError) for result in results)
+    assert all(result.job.process.returncode == -15 for result in results)  # type: ignore[union-attr]
+
+
+def test_run_many() -> None:
+    jobs = [FFmpeg(global_options=f"--stdout-bytes {size}") for size in (1, 2, 3)]
+    assert run_many(jobs, max_workers=2, stdout=subprocess.PIPE) == [
+        (b"x", None),
+        (b"xx", None),
+        (b"xxx", None),
+    ]
+
+
+def test_run_many_errors() -> None:
+    with pytest.raises(FFBatchError) as exc_info:
+        run_many(make_jobs(5), stdout=subprocess.PIPE)
+
+    assert len(exc_info.value.results) == 5
+    assert [result.index for result in exc_info.value.errors] == [3]
+    assert isinstance(exc_info.value.errors[0].error, FFRuntimeError)
+    assert str(exc_info.value) == (
+        "1 of 5 jobs failed\n"
+        "  [3] FFRuntimeError: `ffmpeg --stdout-bytes 4 --exit-code 42` exited with status 42"
+    )
+
+
+def test_run_many_async() -> None:
+    jobs = [FFmpeg(global_options=f"--stdout-bytes {size}") for size in (1, 2, 3)]
+    results = asyncio.run(run_many_async(jobs, max_workers=2, stdout=subprocess.PIPE))
+    assert results == [(b"x", None), (b"xx", None), (b"xxx", None)]
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import pathlib
+import pickle
+import subprocess
+import time
+
+import pytest
+
+from ffmpy import (
+    FFBatchError,
+    FFprobe,
+    FFRuntimeError,
+    ProbeCache,
+    ProbeResult,
+    SQLiteProbeCache,
+)
+from ffmpy.probe import BaseProbeCache, ProbeKey
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+@pytest.fixture
+def media_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "input.mp4"
+    path.write_bytes(b"not really a video")
+    return path
+
+
+def test_probe(media_file: pathlib.Path) -> None:
+    result = FFprobe.probe(media_file, executable="ffmpeg", cache=None)
+
+    assert result.format.filename == str(media_file)
+    assert result.format.format_name == "mov,mp4,m4a,3gp,3g2,mj2"
+    assert result.format.nb_streams == 2
+    assert result.format.start_time == 0.0
+    assert result.format.duration == 10.01
+    assert result.format.size == 5167890
+    assert result.format.bit_rate == 4130182
+    assert result.format.tags == {"encoder": "Lavf60.3.100"}
+    assert result.duration == 10.01
+
+    assert len(result.streams) == 2
+    assert result.video_streams == (result.streams[0],)
+    assert result.audio_streams == (result.streams[1],)
+
+    video = result.video
+    assert video is not None
+    assert video.index == 0
+    assert video.codec_type == "video"
+    assert video.codec_name == "h264"
+    assert (video.width, video.height) == (1920, 1080)
+    assert video.pix_fmt == "yuv420p"
+    assert video.frame_rate == pytest.approx(29.97, abs=0.001)
+    assert video.sample_rate is None
+    assert video.bit_rate == 4000000
+    assert video.tags == {"language": "und"}
+
+    audio = result.audio
+    assert audio is not None
+    assert audio.codec_name == "aac"
+    assert audio.sample_rate == 48000
+    assert audio.channels == 2
+    assert audio.frame_rate is None
+    assert audio.width is None
+    assert audio.tags == {}
+
+
+def test_probe_result_from_json() -> None:
+    result = ProbeResult.from_json(b'{"streams": [{"index": 0, "duration": "3.5"}], "format": {}}')
+    assert result.format.duration is None
+    assert result.duration == 3.5
+    assert result.video is None
+    assert not hasattr(result, "__dict__")
+    assert not hasattr(result.streams[0], "__dict__")
+
+
+def test_probe_cache(media_file: pathlib.Path) -> None:
+    cache = ProbeCache()
+    first = FFprobe.probe(media_file, executable="ffmpeg", cache=cache)
+    second = FFprobe.probe(str(media_file), executable="ffmpeg", cache=cache)
+
+    assert second is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    third = FFprobe.probe(media_file, executable="ffmpeg", options="-count_frames", cache=cache)
+    assert third is not first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_probe_cache_invalidated_on_change(media_file: pathlib.Path) -> None:
+    cache = ProbeCache()
+    first = FFprobe.probe(media_file, executable="ffmpeg", cache=cache)
+
+    media_file.write_bytes(b"a different video")
+    second = FFprobe.probe(media_file, executable="ffmpeg", cache=cache)
+
+    assert second is not first
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_probe_cache_not_a_file() -> None:
+    cache = ProbeCache()
+    FFprobe.probe("http://example.com/video.mp4", executable="ffmpeg", cache=cache)
+    FFprobe.probe("http://example.com/video.mp4", executable="ffmpeg", cache=cache)
+    assert len(cache) == 0
+
+
+def test_probe_cache_lru(tmp_path: pathlib.Path) -> None:
+    cache = ProbeCache(maxsize=2)
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        paths.append(path)
+
+    results = [FFprobe.probe(path, executable="ffmpeg", cache=cache) for path in paths[:2]]
+    assert FFprobe.probe(paths[0], executable="ffmpeg", cache=cache) is results[0]
+    FFprobe.probe(paths[2], executable="ffmpeg", cache=cache)
+
+    assert len(cache) == 2
+    assert FFprobe.probe(paths[0], executable="ffmpeg", cache=cache) is results[0]
+    assert FFprobe.probe(paths[1], executable="ffmpeg", cache=cache) is not results[1]
+
+    cache.clear()
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_probe_cache_invalid_maxsize() -> None:
+    with pytest.raises(ValueError):
+        ProbeCache(maxsize=0)
+
+
+def test_probe_error(media_file: pathlib.Path) -> None:
+    with pytest.raises(FFRuntimeError) as exc_info:
+        FFprobe.probe(media_file, executable="ffmpeg", options="--exit-code 1 --stderr oneline")
+    assert exc_info.value.stderr == b"This is printed to stderr"
+
+
+def test_probe_stderr(media_file: pathlib.Path) -> None:
+    with pytest.raises(FFRuntimeError) as exc_info:
+        FFprobe.probe(
+            media_file,
+            executable="ffmpeg",
+            options="--exit-code 1 --stderr oneline",
+            cache=None,
+            stderr=subprocess.DEVNULL,
+        )
+    assert exc_info.value.stderr is None
+
+    results = FFprobe.probe_many(
+        [media_file], executable="ffmpeg", cache=None, stderr=subprocess.PIPE
+    )
+    assert results[0].format.filename == str(media_file)
+
+
+def test_probe_result_pickle(media_file: pathlib.Path) -> None:
+    result = FFprobe.probe(media_file, executable="ffmpeg", cache=None)
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored == result
+    assert restored.format.tags == {"encoder": "Lavf60.3.100"}
+    with pytest.raises(TypeError):
+        restored.format.tags["encoder"] = "x"
+
+    key = ProbeKey.from_path(str(media_file), ("ffprobe",))
+    assert pickle.loads(pickle.dumps(key)) == key
+
+
+def test_probe_result_tags_read_only(media_file: pathlib.Path) -> None:
+    cache = ProbeCache()
+    result = FFprobe.probe(media_file, executable="ffmpeg", cache=cache)
+    with pytest.raises(TypeError):
+        result.streams[0].tags["language"] = "eng"  # type: ignore[index]
+    assert FFprobe.probe(media_file, executable="ffmpeg", cache=cache).streams[0].tags == {
+        "language": "und"
+    }
+
+
+def test_probe_async(media_file: pathlib.Path) -> None:
+    cache = ProbeCache()
+
+    async def probe_twice() -> tuple[ProbeResult, ProbeResult]:
+        first = await FFprobe.probe_async(media_file, executable="ffmpeg", cache=cache)
+        second = await FFprobe.probe_async(media_file, executable="ffmpeg", cache=cache)
+        return first, second
+
+    first, second = asyncio.run(probe_twice())
+    assert first.format.filename == str(media_file)
+    assert second is first
+
+
+def make_files(directory: pathlib.Path, count: int) -> list[pathlib.Path]:
+    paths = []
+    for index in range(count):
+        path = directory / f"{index}.mp4"
+        path.write_bytes(b"x" * index)
+        paths.append(path)
+    return paths
+
+
+def test_probe_result_to_dict_roundtrip(media_file: pathlib.Path) -> None:
+    result = FFprobe.probe(media_file, executable="ffmpeg", cache=None)
+    assert ProbeResult.from_json(result.to_dict()) == result
+
+
+def test_probe_result_to_dict_parsed_only() -> None:
+    result = ProbeResult.from_json(
+        {"format": {"filename": "a.mp4", "probe_score": 100}, "streams": [{"index": 0}]}
+    )
+    assert result.to_dict() == {
+        "streams": [{"index": 0, "tags": {}}],
+        "format": {"filename": "a.mp4", "tags": {}},
+    }
+
+
+def test_probe_key_absolute_path(media_file: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(media_file.parent)
+    key = ProbeKey.from_path(media_file.name)
+    assert key == ProbeKey.from_path(str(media_file))
+    assert key is not None and key.path == str(media_file)
+
+
+def test_base_probe_cache_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        BaseProbeCache()  # type: ignore[abstract]
+
+
+def test_sqlite_probe_cache_persistent(tmp_path: pathlib.Path, media_file: pathlib.Path) -> None:
+    database = tmp_path / "probe.db"
+    with SQLiteProbeCache(database) as cache:
+        first = FFprobe.probe(media_file, executable="ffmpeg", cache=cache)
+        assert len(cache) == 1
+
+    with SQLiteProbeCache(database) as cache:
+        second = FFprobe.probe(media_file, executable="ffmpeg", cache=cache)
+        assert second == first
+        assert (cache.hits, cache.misses) == (1, 0)
+
+        FFprobe.probe(media_file, executable="ffmpeg", options="-count_frames", cache=cache)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert len(cache) == 2
+
+
+def test_sqlite_probe_cache_invalidated_on_change(
+    tmp_path: pathlib.Path, media_file: pathlib.Path
+) -> None:
+    with SQLiteProbeCache(tmp_path / "probe.db") as cache:
+        key = ProbeKey.from_path(str(media_file), ("ffprobe",))
+        assert key is not None
+        result = ProbeResult.from_json("{}")
+        cache.put(key, result)
+        assert cache.get(key) == result
+
+        replacement = tmp_path / "replacement.mp4"
+        replacement.write_bytes(b"not really a video")
+        os.replace(replacement, media_file)
+        new_key = ProbeKey.from_path(str(media_file), ("ffprobe",))
+        assert new_key is not None
+        assert new_key.inode != key.inode
+
+        assert cache.get(new_key) is None
+        assert len(cache) == 0
+
+
+def test_sqlite_probe_cache_get_many(tmp_path: pathlib.Path) -> None:
+    paths = make_files(tmp_path, 1200)
+    keys = [ProbeKey.from_path(str(path), ("ffprobe",)) for path in paths]
+    results = {
+        key: ProbeResult.from_json({"format": {"filename": key.path}})
+        for key in keys[:1000]
+        if key is not None
+    }
+    with SQLiteProbeCache(tmp_path / "probe.db") as cache:
+        cache.put_many(results)
+        found = cache.get_many(key for key in keys if key is not None)
+        assert found == results
+        assert (cache.hits, cache.misses) == (1000, 200)
+
+
+def test_sqlite_probe_cache_eviction(tmp_path: pathlib.Path) -> None:
+    paths = make_files(tmp_path, 5)
+    keys = [ProbeKey.from_path(str(path)) for path in paths]
+    database = tmp_path / "probe.db"
+    with SQLiteProbeCache(database) as cache:
+        for key in keys:
+            assert key is not None
+            cache.put(key, ProbeResult.from_json("{}"))
+        assert cache.get(keys[0]) is not None  # type: ignore[arg-type]
+
+    with SQLiteProbeCache(database, max_entries=2) as cache:
+        assert len(cache) == 2
+        assert cache.get(keys[0]) is not None  # type: ignore[arg-type]
+        assert cache.get(keys[4]) is not None  # type: ignore[arg-type]
+
+    time.sleep(0.1)
+    with SQLiteProbeCache(database, max_age=0.05) as cache:
+        assert len(cache) == 0
+
+
+def test_probe_many(tmp_path: pathlib.Path) -> None:
+    paths = make_files(tmp_path, 6)
+    cache = ProbeCache()
+    FFprobe.probe(paths[2], executable="ffmpeg", cache=cache)
+
+    results = FFprobe.probe_many(paths, executable="ffmpeg", cache=cache, max_workers=2)
+    assert [result.format.filename for result in results] == [str(path) for path in paths]
+    assert (cache.hits, cache.misses) == (1, 6)
+    assert len(cache) == 6
+
+    FFprobe.probe_many(paths, executable="ffmpeg", cache=cache)
+    assert (cache.hits, cache.misses) == (7, 6)
+
+
+def test_probe_many_errors(tmp_path: pathlib.Path) -> None:
+    paths = make_files(tmp_path, 3)
+    with SQLiteProbeCache(tmp_path / "probe.db") as cache:
+        FFprobe.probe(paths[1], executable="ffmpeg", cache=cache)
+        with pytest.raises(FFBatchError) as exc_info:
+            FFprobe.probe_many(
+                [paths[0], paths[1], "missing.mp4", paths[2]], executable="ffmpeg", cache=cache
+            )
+        assert len(cache) == 3
+
+    assert [result.index for result in exc_info.value.results] == [0, 2, 3]
+    assert [result.index for result in exc_info.value.errors] == [2]
+    error = exc_info.value.errors[0].error
+    assert isinstance(error, FFRuntimeError)
+    assert error.stderr == b"missing.mp4: No such file or directory\n"
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+
+import pytest
+
+from ffmpy import FFmpeg, FFRuntimeError, Progress, parse_progress
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+PROGRESS_OUTPUT = [
+    b"frame=120\n",
+    b"fps=29.97\n",
+    b"stream_0_0_q=28.0\n",
+    b"bitrate=1536.2kbits/s\n",
+    b"total_size=786432\n",
+    b"out_time_us=4004000\n",
+    b"out_time_ms=4004000\n",
+    b"out_time=00:00:04.004000\n",
+    b"dup_frames=0\n",
+    b"drop_frames=1\n",
+    b"speed=2.01x\n",
+    b"progress=continue\n",
+    b"frame=240\n",
+    b"fps=30.01\n",
+    b"bitrate=N/A\n",
+    b"total_size=N/A\n",
+    b"out_time_us=N/A\n",
+    b"speed=N/A\n",
+    b"progress=end\n",
+]
+
+
+def test_parse_progress() -> None:
+    first, last = parse_progress(PROGRESS_OUTPUT)
+
+    assert first.frame == 120
+    assert first.fps == 29.97
+    assert first.bitrate == 1536.2
+    assert first.total_size == 786432
+    assert first.out_time_us == 4004000
+    assert first.out_time == 4.004
+    assert first.dup_frames == 0
+    assert first.drop_frames == 1
+    assert first.speed == 2.01
+    assert first.progress == "continue"
+    assert not first.done
+    assert first.fields["stream_0_0_q"] == "28.0"
+    assert first.fields["out_time"] == "00:00:04.004000"
+
+    assert last.frame == 240
+    assert last.bitrate is None
+    assert last.total_size is None
+    assert last.out_time_us is None
+    assert last.out_time is None
+    assert last.speed is None
+    assert last.dup_frames is None
+    assert last.done
+    assert "stream_0_0_q" not in last.fields
+
+
+def test_parse_progress_text_lines() -> None:
+    lines = [line.decode() for line in PROGRESS_OUTPUT[:12]]
+    assert list(parse_progress(lines)) == list(parse_progress(PROGRESS_OUTPUT[:12]))
+
+
+def test_parse_progress_incomplete_block() -> None:
+    assert list(parse_progress([b"frame=1\n", b"\n", b"garbage\n", b"fps=25\n"])) == []
+
+
+def test_progress_is_slotted() -> None:
+    (progress,) = parse_progress([b"progress=end\n"])
+    assert not hasattr(progress, "__dict__")
+    with pytest.raises(AttributeError):
+        progress.frame = 1  # type: ignore[misc]
+
+
+def test_run_on_progress() -> None:
+    reports: list[Progress] = []
+    ff = FFmpeg(global_options="--stdout oneline --progress-blocks 3")
+    stdout, _ = ff.run(stdout=subprocess.PIPE, on_progress=reports.append)
+
+    assert stdout == b"This is printed to stdout"
+    assert [p.frame for p in reports] == [25, 50, 75]
+    assert [p.out_time for p in reports] == [1.0, 2.0, 3.0]
+    assert [p.speed for p in reports] == [1.5, 2.5, 3.5]
+    assert [p.done for p in reports] == [False, False, True]
+    assert ff.cmd == "ffmpeg --stdout oneline --progress-blocks 3"
+
+
+def test_run_on_progress_callback_error() -> None:
+    def on_progress(progress: Progress) -> None:
+        raise ValueError("callback failed")
+
+    ff = FFmpeg(global_options="--long-run")
+    with pytest.raises(ValueError, match="callback failed"):
+        ff.run(on_progress=on_progress)
+    assert ff.process is not None
+    assert ff.process.returncode == -9
+
+
+def test_run_on_progress_non_zero_exitcode() -> None:
+    reports: list[Progress] = []
+    ff = FFmpeg(global_options="--progress-blocks 1 --exit-code 42")
+    with pytest.raises(FFRuntimeError):
+        ff.run(on_progress=reports.append)
+    assert len(reports) == 1
+
+
+def test_stream_on_progress() -> None:
+    reports: list[Progress] = []
+    ff = FFmpeg(global_options="--stdout-bytes 100000 --progress-blocks 2")
+    assert len(b"".join(ff.stream(on_progress=reports.append))) == 100000
+    assert [p.frame for p in reports] == [25, 50]
+
+
+def test_run_async_on_progress() -> None:
+    reports: list[Progress] = []
+    ff = FFmpeg(global_options="--stdout oneline --progress-blocks 4")
+    stdout, _ = asyncio.run(ff.run_async(stdout=subprocess.PIPE, on_progress=reports.append))
+    assert stdout == b"This is printed to stdout"
+    assert [p.frame for p in reports] == [25, 50, 75, 100]
+    assert reports[-1].done
+
+
+def test_run_async_on_progress_callback_error() -> None:
+    def on_progress(progress: Progress) -> None:
+        raise ValueError("callback failed")
+
+    ff = FFmpeg(global_options="--long-run")
+    with pytest.raises(ValueError, match="callback failed"):
+        asyncio.run(ff.run_async(on_progress=on_progress))
+    assert ff.process is not None
+    assert ff.process.returncode == -9
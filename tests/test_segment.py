@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from unittest import mock
+
+import pytest
+
+from ffmpy import FFBatchError, FFmpeg, FFprobe, SegmentedTranscode
+from ffmpy.segment import _quote, _split_points
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+@pytest.fixture
+def media_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "input.mp4"
+    path.touch()
+    return path
+
+
+def test_ranges_start_at_keyframes(media_file: pathlib.Path) -> None:
+    # The fake input is 10.01 seconds long with a keyframe every 2 seconds
+    transcode = SegmentedTranscode(media_file, "output.mp4", segments=3, probe_executable="ffmpeg")
+    assert transcode.ranges == [(0.0, 4.0), (4.0, 6.0), (6.0, None)]
+
+    transcode = SegmentedTranscode(media_file, "output.mp4", segments=8, probe_executable="ffmpeg")
+    assert transcode.ranges == [(0.0, 2.0), (2.0, 4.0), (4.0, 6.0), (6.0, 8.0), (8.0, None)]
+
+
+def test_single_segment(media_file: pathlib.Path) -> None:
+    transcode = SegmentedTranscode(media_file, "output.mp4", segments=1, probe_executable="ffmpeg")
+    assert transcode.ranges == [(0.0, None)]
+
+
+@pytest.mark.parametrize(
+    "duration,keyframes,segments,expected",
+    [
+        (12.0, [0.0, 2.0, 4.0, 6.0, 8.0, 10.0], 4, [2.0, 6.0, 8.0]),
+        (12.0, [0.0, 2.8, 3.1, 9.5], 4, [3.1, 9.5]),
+        (12.0, [0.0], 4, []),
+        (12.0, [0.0, 11.0], 2, [11.0]),
+    ],
+)
+def test_split_points(
+    duration: float, keyframes: list[float], segments: int, expected: list[float]
+) -> None:
+    assert _split_points(duration, keyframes, segments) == expected
+
+
+def test_run(media_file: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    tmp_dir = tmp_path / "tmp"
+    tmp_dir.mkdir()
+    transcode = SegmentedTranscode(
+        media_file,
+        "output.mp4",
+        "-c:v libx264 -crf 20",
+        input_options="-hwaccel auto",
+        segments=3,
+        max_workers=2,
+        audio_options="-c:a aac",
+        global_options="-y",
+        probe_executable="ffmpeg",
+        tmp_dir=tmp_dir,
+    )
+
+    with mock.patch.object(FFmpeg, "run", autospec=True, side_effect=FFmpeg.run) as run:
+        transcode.run()
+
+    # Sorted by the output; the segments are encoded in any order
+    commands = sorted(
+        (call.args[0].cmd for call in run.call_args_list if not isinstance(call.args[0], FFprobe)),
+        key=lambda cmd: cmd.split()[-1],
+    )
+    directory = os.path.dirname(commands[0].split()[-1])
+    assert os.path.dirname(directory) == str(tmp_dir)
+    assert commands == [
+        f"ffmpeg -y -hwaccel auto -t 4.000000 -i {media_file} -map 0:V:0 -c:v libx264 -crf 20 "
+        f"-an -sn -dn -f matroska {directory}/00000.mkv",
+        f"ffmpeg -y -hwaccel auto -ss 4.000000 -t 2.000000 -i {media_file} -map 0:V:0 "
+        f"-c:v libx264 -crf 20 -an -sn -dn -f matroska {directory}/00001.mkv",
+        f"ffmpeg -y -hwaccel auto -ss 6.000000 -i {media_file} -map 0:V:0 -c:v libx264 -crf 20 "
+        f"-an -sn -dn -f matroska {directory}/00002.mkv",
+        f"ffmpeg -y -f concat -safe 0 -i {directory}/segments.txt -i {media_file} "
+        "-map 0:v -map 1:a? -c:v copy -c:a aac output.mp4",
+    ]
+    # Intermediate files are removed
+    assert list(tmp_dir.iterdir()) == []
+
+
+def test_segment_failure(media_file: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    transcode = SegmentedTranscode(
+        media_file,
+        "output.mp4",
+        segments=3,
+        global_options="--exit-code 1",
+        probe_executable="ffmpeg",
+        tmp_dir=tmp_path,
+    )
+    with pytest.raises(FFBatchError) as exc_info:
+        transcode.run()
+    assert len(exc_info.value.errors) == 3
+    assert list(tmp_path.iterdir()) == [media_file]
+
+
+def test_quote() -> None:
+    assert _quote("/tmp/segments/00000.mkv") == "'/tmp/segments/00000.mkv'"
+    assert _quote("/tmp/it's/00000.mkv") == "'/tmp/it'\\''s/00000.mkv'"
+
+
+def test_invalid_segments() -> None:
+    with pytest.raises(ValueError, match="segments must be greater than 0"):
+        SegmentedTranscode("input.mp4", "output.mp4", segments=0)
+
+
+def test_no_duration() -> None:
+    transcode = SegmentedTranscode("pipe:0", "output.mp4", probe_executable="ffmpeg")
+    with mock.patch.object(FFprobe, "probe") as probe:
+        probe.return_value.duration = None
+        with pytest.raises(ValueError, match="Could not probe the duration of 'pipe:0'"):
+            transcode.ranges
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import pickle
+import subprocess
+
+import pytest
+
+from ffmpy import CommandSpec, FFmpeg, FFmpegTemplate, FFprobe, TailCapture
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def test_spec_of_ffmpeg() -> None:
+    ff = FFmpeg(
+        global_options="-y",
+        inputs={"input file.mp4": None},
+        outputs={"output.mp4": "-c:v libx264"},
+    )
+    spec = ff.spec
+    assert spec == CommandSpec(
+        "ffmpeg", ("-y", "-i", "input file.mp4", "-c:v", "libx264", "output.mp4")
+    )
+    assert spec.argv == ["ffmpeg", "-y", "-i", "input file.mp4", "-c:v", "libx264", "output.mp4"]
+    assert spec.cmd == ff.cmd
+
+    restored = FFmpeg.from_spec(spec)
+    assert type(restored) is FFmpeg
+    assert restored.cmd == ff.cmd
+    assert restored.process is None
+    assert type(FFprobe.from_spec(spec)) is FFprobe
+
+
+def test_pickle() -> None:
+    spec = CommandSpec.from_argv(["ffmpeg", "-i", "input.mp4", "output.mp4"])
+    restored = pickle.loads(pickle.dumps(spec))
+    assert restored == spec
+    assert hash(restored) == hash(spec)
+    assert pickle.loads(pickle.dumps(TailCapture(max_lines=10))) == TailCapture(max_lines=10)
+
+
+def test_json() -> None:
+    spec = CommandSpec("ffmpeg", ("-i", "input.mp4", "-vf", "drawtext=text='%{pts}'", "out.mp4"))
+    data = spec.to_json()
+    assert data == (
+        '{"executable":"ffmpeg","args":["-i","input.mp4","-vf","drawtext=text=\'%{pts}\'",'
+        '"out.mp4"]}'
+    )
+    assert CommandSpec.from_json(data) == spec
+    assert CommandSpec.from_json(data.encode()) == spec
+
+
+@pytest.mark.parametrize(
+    "data",
+    ['["ffmpeg"]', '{"executable":"ffmpeg"}', '{"executable":"ffmpeg","args":[1]}', "{}"],
+)
+def test_invalid_json(data: str) -> None:
+    with pytest.raises(ValueError, match="Invalid command spec"):
+        CommandSpec.from_json(data)
+
+
+def test_render_spec() -> None:
+    template = FFmpegTemplate(inputs={"{src}": None}, outputs={"{dst}": "-crf {crf}"})
+    spec = template.render_spec(src="in.mp4", dst="out.mp4", crf=23)
+    assert spec == CommandSpec("ffmpeg", ("-i", "in.mp4", "-crf", "23", "out.mp4"))
+
+
+def test_run() -> None:
+    spec = CommandSpec("ffmpeg", ("--stdout", "oneline"))
+    assert spec.run(stdout=subprocess.PIPE) == (b"This is printed to stdout", None)
+
+
+def test_run_in_process_pool() -> None:
+    specs = [CommandSpec("ffmpeg", ("--stdout-bytes", str(size))) for size in range(1, 5)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(spec.run, stdout=subprocess.PIPE, stderr=TailCapture()) for spec in specs
+        ]
+        results = [future.result() for future in futures]
+    assert results == [(b"x" * size, b"") for size in range(1, 5)]
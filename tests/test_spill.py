@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import pathlib
+import subprocess
+
+import pytest
+
+from ffmpy import FFExecutableNotFoundError, FFmpeg
+from ffmpy.progress import _ProgressPipe
+from ffmpy.spill import _Spill
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+GRAPH = ";".join(f"[{index}:v]scale=320:-2[v{index}]" for index in range(20))
+
+
+def test_filter_complex() -> None:
+    ff = FFmpeg(
+        global_options=["--cat-scripts", "-filter_complex", GRAPH],
+        inputs={"input.mp4": None},
+        outputs={"output.mp4": "-vf scale=640:-2"},
+    )
+    stdout, _ = ff.run(stdout=subprocess.PIPE, spill_threshold=100)
+
+    assert stdout == f"-filter_complex_script\n{GRAPH}\n".encode()
+    args = _args(ff)
+    script = args[args.index("-filter_complex_script") + 1]
+    # The short filter is kept on the command line and the script is removed after the run
+    assert args[-3:] == ["-vf", "scale=640:-2", "output.mp4"]
+    assert not os.path.exists(os.path.dirname(script))
+    assert ff.cmd.startswith("ffmpeg --cat-scripts -filter_complex [0:v]scale")
+
+
+def test_below_threshold() -> None:
+    ff = FFmpeg(global_options=["-filter_complex", GRAPH])
+    ff.run(spill_threshold=len(GRAPH))
+    assert _args(ff) == ["ffmpeg", "-filter_complex", GRAPH]
+
+
+def test_many_short_inputs() -> None:
+    inputs = {f"clip{index}.mp4": None for index in range(200)}
+    ff = FFmpeg(inputs=inputs)
+    ff.run(spill_threshold=100)
+    assert _args(ff) == ff._cmd
+
+
+def test_concat(tmp_path: pathlib.Path) -> None:
+    clips = [f"clip-{index:04d}.ts" for index in range(50)]
+    ff = FFmpeg(
+        global_options="--cat-scripts",
+        inputs={"concat:" + "|".join(clips): None},
+        outputs={"output.mp4": "-c copy"},
+    )
+    stdout, _ = ff.run(stdout=subprocess.PIPE, spill_threshold=512, spill_concat=True, cwd=tmp_path)
+
+    expected = "".join(f"file '{tmp_path / clip}'\n" for clip in clips)
+    assert stdout == f"-i\n{expected}\n".encode()
+    assert _args(ff)[2:6] == ["-f", "concat", "-safe", "0"]
+
+
+def test_concat_not_moved_by_default() -> None:
+    ff = FFmpeg(inputs={"concat:" + "|".join(["clip.ts"] * 100): None})
+    ff.run(spill_threshold=100)
+    assert _args(ff) == ff._cmd
+
+
+@pytest.mark.parametrize(
+    "option,script_option",
+    [
+        ("-filter_complex", "-filter_complex_script"),
+        ("-lavfi", "-filter_complex_script"),
+        ("-vf", "-filter_script:v"),
+        ("-af", "-filter_script:a"),
+        ("-filter", "-filter_script"),
+        ("-filter:v:1", "-filter_script:v:1"),
+    ],
+)
+def test_script_options(option: str, script_option: str) -> None:
+    spill = _Spill(10)
+    try:
+        cmd = spill.command(["ffmpeg", "-i", "input.mp4", option, "x" * 11, "output.mp4"])
+        assert cmd[:4] == ["ffmpeg", "-i", "input.mp4", script_option]
+        assert cmd[5] == "output.mp4"
+        with open(cmd[4], encoding="utf-8") as f:
+            assert f.read() == "x" * 11
+    finally:
+        spill.close()
+    assert not os.path.exists(cmd[4])
+
+
+def test_other_arguments_are_kept() -> None:
+    spill = _Spill(10)
+    cmd = ["ffmpeg", "-metadata", "title=" + "x" * 20, "-i", "y" * 20, "output.mp4"]
+    assert spill.command(cmd) == cmd
+    assert spill.directory is None
+
+
+def test_stream() -> None:
+    ff = FFmpeg(global_options=["--cat-scripts", "-filter_complex", GRAPH])
+    stdout = b"".join(ff.stream(spill_threshold=100))
+    assert stdout == f"-filter_complex_script\n{GRAPH}\n".encode()
+
+
+def test_run_async() -> None:
+    ff = FFmpeg(global_options=["--cat-scripts", "-filter_complex", GRAPH])
+    stdout, _ = asyncio.run(ff.run_async(stdout=subprocess.PIPE, spill_threshold=100))
+    assert stdout == f"-filter_complex_script\n{GRAPH}\n".encode()
+
+
+def test_files_removed_when_spawn_fails() -> None:
+    ff = FFmpeg(executable="ffmpeg-not-installed", global_options=["-filter_complex", GRAPH])
+    spill = _Spill(100)
+    with pytest.raises(FFExecutableNotFoundError):
+        ff._popen(_ProgressPipe(None), spill=spill)
+    assert spill.directory is None
+
+
+def _args(ff: FFmpeg) -> list[str]:
+    """Return the arguments the process of ``ff`` was started with."""
+    assert ff.process is not None
+    assert not isinstance(ff.process, asyncio.subprocess.Process)
+    args = ff.process.args
+    assert isinstance(args, list)
+    return args
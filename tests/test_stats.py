@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import array
+import asyncio
+import os
+import pickle
+import subprocess
+from contextlib import nullcontext
+from typing import Any
+from unittest import mock
+
+import pytest
+
+from ffmpy import FFmpeg, FFRuntimeError, ResourceSample, RunStats, TailCapture
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+posix_only = pytest.mark.skipif(not hasattr(os, "wait4"), reason="requires os.wait4")
+
+
+def test_stats_not_available_before_run() -> None:
+    assert FFmpeg().stats is None
+
+
+@posix_only
+@pytest.mark.parametrize("without_psutil", [False, True])
+def test_run_stats(without_psutil: bool) -> None:
+    ff = FFmpeg(global_options="--stdin echo --stdout-bytes 1000")
+    with mock.patch("ffmpy.ffmpy.popen", subprocess.Popen) if without_psutil else nullcontext():
+        ff.run(input_data=b"abc" * 100, stdout=subprocess.PIPE)
+
+    stats = ff.stats
+    assert stats is not None
+    assert stats.stdin_bytes == 300
+    assert stats.stdout_bytes == 1300
+    assert stats.stderr_bytes is None
+    assert 0 < stats.spawn_time < stats.wall_time
+    assert stats.user_time is not None and stats.user_time >= 0
+    assert stats.system_time is not None and stats.system_time >= 0
+    assert stats.cpu_time == stats.user_time + stats.system_time
+    assert stats.max_rss is not None and stats.max_rss > 0
+    assert stats.samples == ()
+
+
+@posix_only
+def test_run_stats_streamed_input_and_tail_capture() -> None:
+    ff = FFmpeg(global_options="--stdin echo --stderr-lines 1000")
+    ff.run(
+        input_data=iter([b"x" * 10, b"y" * 20]),
+        stdout=subprocess.PIPE,
+        stderr=TailCapture(max_lines=1),
+    )
+
+    assert ff.stats is not None
+    assert ff.stats.stdin_bytes == 30
+    assert ff.stats.stdout_bytes == 30
+    assert ff.stats.stderr_bytes == sum(len(f"stderr line {i}\n") for i in range(1, 1001))
+    assert ff.stats.user_time is not None
+
+
+def test_run_stats_on_failure() -> None:
+    ff = FFmpeg(global_options="--stderr oneline --exit-code 1")
+    with pytest.raises(FFRuntimeError):
+        ff.run(stderr=subprocess.PIPE)
+    assert ff.stats is not None
+    assert ff.stats.stderr_bytes == len(b"This is printed to stderr")
+
+
+def test_run_stats_samples() -> None:
+    pytest.importorskip("psutil")
+    ff = FFmpeg(global_options="--ticks 4")
+    ff.run(stderr=subprocess.PIPE, sample_interval=0.05)
+
+    assert ff.stats is not None
+    assert len(ff.stats.samples) >= 2
+    elapsed = [sample.elapsed for sample in ff.stats.samples]
+    assert elapsed == sorted(elapsed)
+    assert all(sample.rss > 0 for sample in ff.stats.samples)
+
+
+@pytest.mark.parametrize("stderr", [subprocess.PIPE, TailCapture()])
+def test_run_stats_psutil_exit_code(stderr: Any) -> None:
+    psutil = pytest.importorskip("psutil")
+    ff = FFmpeg(global_options="--exit-code 3")
+    with pytest.raises(FFRuntimeError) as exc_info:
+        ff.run(stderr=stderr, sample_interval=0.05)
+
+    assert isinstance(ff.process, psutil.Popen)
+    assert exc_info.value.exit_code == 3
+    assert ff.process.returncode == 3
+    assert ff.process.wait() == 3
+
+
+def test_stream_stats() -> None:
+    ff = FFmpeg(global_options="--stdin echo --stdout-bytes 100000")
+    assert sum(map(len, ff.stream(input_data=b"abc"))) == 100003
+    assert ff.stats is not None
+    assert ff.stats.stdin_bytes == 3
+    assert ff.stats.stdout_bytes == 100003
+    assert (ff.stats.user_time is not None) == hasattr(os, "wait4")
+
+
+def test_run_async_stats() -> None:
+    ff = FFmpeg(global_options="--stdin echo")
+    asyncio.run(ff.run_async(input_data=b"abc", stdout=subprocess.PIPE))
+
+    assert ff.stats is not None
+    assert ff.stats.stdin_bytes == 3
+    assert ff.stats.stdout_bytes == 3
+    assert ff.stats.user_time is None
+    assert ff.stats.cpu_usage is None
+
+
+def test_cpu_usage() -> None:
+    stats = RunStats(2.0, 0.001, 3.0, 1.0, 1024, 0, None, None, (), None)
+    assert stats.cpu_time == 4.0
+    assert stats.cpu_usage == 2.0
+
+
+def test_pickle_stats() -> None:
+    sample = ResourceSample(0.5, 0.25, 0.125, 4096)
+    stats = RunStats(2.0, 0.001, 3.0, 1.0, 1024, 0, 10, None, (sample,), {"warning": 1})
+    assert pickle.loads(pickle.dumps(stats)) == stats
+
+
+def test_run_stats_input_not_consumed() -> None:
+    ff = FFmpeg(global_options="--exit-code 0")
+    ff.run(input_data=b"x" * (16 * 1024 * 1024))
+    assert ff.stats is not None
+    assert ff.stats.stdin_bytes < 16 * 1024 * 1024
+
+
+def test_run_stats_memoryview_input() -> None:
+    ff = FFmpeg(global_options="--stdin echo")
+    chunk = memoryview(array.array("i", range(10)))
+    chunks: list[Any] = [chunk, chunk]
+    ff.run(input_data=iter(chunks), stdout=subprocess.PIPE)
+    assert ff.stats is not None
+    assert ff.stats.stdin_bytes == ff.stats.stdout_bytes == 2 * chunk.nbytes
+
+
+@posix_only
+def test_run_stats_reaped_by_communicate() -> None:
+    ff = FFmpeg(global_options="--stdout-bytes 1000")
+    ff.run(stdout=subprocess.PIPE)
+    assert ff.stats is not None
+    assert ff.stats.stdin_bytes == 0
+    assert ff.stats.user_time is not None and ff.stats.user_time >= 0
+    assert ff.stats.system_time is not None and ff.stats.system_time >= 0
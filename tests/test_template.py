@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from ffmpy import FFmpeg, FFmpegTemplate
+
+
+def make_template() -> FFmpegTemplate:
+    return FFmpegTemplate(
+        global_options="-y -v error",
+        inputs={"{src}": "-ss {start:.3f}"},
+        outputs={"{dst}": ["-c:v", "libx264", "-crf", "{crf}", "-metadata", "title=Part {part}"]},
+    )
+
+
+def test_render_args() -> None:
+    template = make_template()
+    assert template.placeholders == {"src", "dst", "start", "crf", "part"}
+    assert template.render_args(src="in put.mp4", dst="out.mp4", start=1.5, crf=23, part=2) == [
+        "ffmpeg",
+        "-y",
+        "-v",
+        "error",
+        "-ss",
+        "1.500",
+        "-i",
+        "in put.mp4",
+        "-c:v",
+        "libx264",
+        "-crf",
+        "23",
+        "-metadata",
+        "title=Part 2",
+        "out.mp4",
+    ]
+
+
+def test_render_matches_ffmpeg() -> None:
+    ff = make_template().render(src="in put.mp4", dst="out.mp4", start=0, crf=18, part=1)
+    expected = FFmpeg(
+        global_options="-y -v error",
+        inputs={"in put.mp4": "-ss 0.000"},
+        outputs={"out.mp4": ["-c:v", "libx264", "-crf", "18", "-metadata", "title=Part 1"]},
+    )
+    assert isinstance(ff, FFmpeg)
+    assert ff._cmd == expected._cmd
+    assert ff.cmd == expected.cmd
+    assert ff.executable == "ffmpeg"
+    assert ff.process is None
+
+
+def test_render_is_independent() -> None:
+    template = FFmpegTemplate(inputs={"{src}": None}, outputs={"out.mp4": None})
+    first = template.render(src="a.mp4")
+    second = template.render(src="b.mp4")
+    assert first._cmd == ["ffmpeg", "-i", "a.mp4", "out.mp4"]
+    assert second._cmd == ["ffmpeg", "-i", "b.mp4", "out.mp4"]
+
+
+def test_escaped_braces() -> None:
+    template = FFmpegTemplate(outputs={"{dst}": "-vf drawtext=text=%{{pts}}"})
+    assert template.placeholders == {"dst"}
+    assert template.render_args(dst="out.mp4") == [
+        "ffmpeg",
+        "-vf",
+        "drawtext=text=%{pts}",
+        "out.mp4",
+    ]
+
+
+def test_missing_value() -> None:
+    with pytest.raises(KeyError, match="No value for placeholder 'dst'"):
+        make_template().render(src="in.mp4", start=0, crf=23, part=1)
+
+
+@pytest.mark.parametrize("option", ["{}", "{0}", "{a.b}", "{a!r}", "{a:{b}}", "{a"])
+def test_invalid_placeholder(option: str) -> None:
+    with pytest.raises(ValueError):
+        FFmpegTemplate(global_options=[option])
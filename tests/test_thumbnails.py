@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import pathlib
+
+import pytest
+
+from ffmpy import FFRuntimeError, Thumbnails
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def test_timestamps() -> None:
+    thumbnails = Thumbnails(
+        "input.mp4", timestamps=[60, 5, 60], filters="scale=320:-1", output_options="-q:v 2"
+    )
+    assert thumbnails.timestamps == [5, 60]
+    assert thumbnails.ffmpeg("thumbs/%03d.jpg").cmd == (
+        "ffmpeg -i input.mp4 -map 0:v:0 -vf "
+        "select='gte(t,5.000000)*not(gte(prev_pts*TB,5.000000))"
+        "+gte(t,60.000000)*not(gte(prev_pts*TB,60.000000))',scale=320:-1 "
+        "-fps_mode passthrough -frames:v 2 -q:v 2 thumbs/%03d.jpg"
+    )
+
+
+def test_interval() -> None:
+    thumbnails = Thumbnails("input.mp4", interval=10)
+    assert thumbnails.ffmpeg("%d.png")._cmd == [
+        *("ffmpeg", "-i", "input.mp4", "-map", "0:v:0", "-vf"),
+        "select='isnan(prev_selected_t)+gte(t-prev_selected_t,10.000000)'",
+        *("-fps_mode", "passthrough", "%d.png"),
+    ]
+
+
+def test_keyframes() -> None:
+    thumbnails = Thumbnails("input.mp4", keyframes=True, input_options="-hwaccel auto")
+    assert thumbnails.ffmpeg("%d.jpg").cmd == (
+        "ffmpeg -hwaccel auto -skip_frame nokey -i input.mp4 -map 0:v:0 -fps_mode passthrough %d.jpg"
+    )
+
+
+def test_write(tmp_path: pathlib.Path) -> None:
+    thumbnails = Thumbnails("input.mp4", keyframes=True, global_options="--write-images 3")
+    paths = thumbnails.write(tmp_path / "%03d.jpg")
+    assert paths == [str(tmp_path / f"{number:03d}.jpg") for number in (1, 2, 3)]
+
+
+def test_read(tmp_path: pathlib.Path) -> None:
+    thumbnails = Thumbnails(
+        "input.mp4",
+        timestamps=[1.0, 2.0],
+        extension="png",
+        global_options="--write-images 2",
+        tmp_dir=tmp_path,
+    )
+    assert thumbnails.read() == [b"image 1", b"image 2"]
+    # The temporary directory is removed
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failure() -> None:
+    thumbnails = Thumbnails("input.mp4", interval=1, global_options="--exit-code 1")
+    with pytest.raises(FFRuntimeError):
+        thumbnails.read()
+
+
+def test_invalid_pattern() -> None:
+    with pytest.raises(ValueError, match="does not contain a %d sequence"):
+        Thumbnails("input.mp4", interval=1).write("thumb.jpg")
+
+
+@pytest.mark.parametrize(
+    "kwargs,message",
+    [
+        ({}, "Exactly one of timestamps, interval and keyframes must be given"),
+        ({"timestamps": [1.0], "keyframes": True}, "Exactly one of"),
+        ({"timestamps": []}, "timestamps must not be empty"),
+        ({"interval": 0}, "interval must be greater than 0"),
+    ],
+)
+def test_invalid_arguments(kwargs: dict, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        Thumbnails("input.mp4", **kwargs)
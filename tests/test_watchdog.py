@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+from ffmpy import FFmpeg, FFRuntimeError, FFTimeoutError, Progress, TailCapture
+
+FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "ffmpeg")
+os.environ["PATH"] = FFMPEG_PATH + os.pathsep + os.environ["PATH"]
+
+
+def test_timeout_quits_gracefully() -> None:
+    ff = FFmpeg(global_options="--stdin keys --stdout oneline --long-run")
+    start = time.monotonic()
+    with pytest.raises(FFTimeoutError) as exc_info:
+        ff.run(stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=0.3)
+    elapsed = time.monotonic() - start
+
+    assert isinstance(exc_info.value, FFRuntimeError)
+    assert isinstance(exc_info.value, TimeoutError)
+    assert exc_info.value.reason == "timeout"
+    assert exc_info.value.timeout == 0.3
+    assert exc_info.value.exit_code == 0
+    assert exc_info.value.stdout == b"This is printed to stdout"
+    assert exc_info.value.stderr == b"Exiting normally, received signal q.\n"
+    assert str(exc_info.value).startswith(
+        "`ffmpeg --stdin keys --stdout oneline --long-run` timed out after 0.3 seconds\n"
+    )
+    assert 0.3 <= elapsed < 2
+
+
+def test_timeout_escalates_to_sigterm() -> None:
+    ff = FFmpeg(global_options="--long-run")
+    with pytest.raises(FFTimeoutError) as exc_info:
+        ff.run(timeout=0.2, grace_period=0.2)
+    assert exc_info.value.exit_code == -15
+
+
+def test_timeout_escalates_to_sigkill() -> None:
+    ff = FFmpeg(global_options="--ignore-sigterm --long-run")
+    start = time.monotonic()
+    with pytest.raises(FFTimeoutError) as exc_info:
+        ff.run(timeout=0.2, grace_period=0.2)
+    elapsed = time.monotonic() - start
+
+    assert exc_info.value.exit_code == -9
+    assert 0.6 <= elapsed < 2
+
+
+def test_timeout_with_input_data_skips_quit() -> None:
+    ff = FFmpeg(global_options="--stdin keys --long-run")
+    start = time.monotonic()
+    with pytest.raises(FFTimeoutError) as exc_info:
+        ff.run(input_data=iter([b"data"]), timeout=0.2, grace_period=5)
+    assert exc_info.value.exit_code == -15
+    assert time.monotonic() - start < 2
+
+
+@pytest.mark.parametrize(
+    ("global_options", "inputs"),
+    [("--stdin echo", {"pipe:0": None}), ("--stdin echo -nostdin", None)],
+)
+def test_timeout_closes_stdin_not_read_for_commands(
+    global_options: str, inputs: dict[str, None] | None
+) -> None:
+    ff = FFmpeg(global_options=global_options, inputs=inputs)
+    start = time.monotonic()
+    assert ff.run(stdout=subprocess.PIPE, timeout=5) == (b"", None)
+    assert time.monotonic() - start < 2
+
+
+def test_stall_timeout() -> None:
+    ff = FFmpeg(global_options="--ticks 3 --long-run")
+    with pytest.raises(FFTimeoutError) as exc_info:
+        ff.run(stderr=TailCapture(), stall_timeout=0.3, grace_period=0.1)
+
+    assert exc_info.value.reason == "stall"
+    assert exc_info.value.stderr == b"tick 1\ntick 2\ntick 3\n"
+    assert str(exc_info.value).startswith(
+        "`ffmpeg --ticks 3 --long-run` stalled: no progress for 0.3 seconds\n"
+    )
+
+
+def test_stall_timeout_not_exceeded_by_active_process() -> None:
+    ff = FFmpeg(global_options="--ticks 10")
+    assert ff.run(stderr=subprocess.PIPE, stall_timeout=0.3, timeout=5) == (
+        None,
+        b"".join(b"tick %d\n" % i for i in range(1, 11)),
+    )
+
+
+def test_stall_timeout_progress_reports() -> None:
+    reports: list[Progress] = []
+    ff = FFmpeg(global_options="--progress-blocks 2 --long-run")
+    with pytest.raises(FFTimeoutError) as exc_info:
+        ff.run(on_progress=reports.append, stall_timeout=0.2, grace_period=0.1)
+    assert exc_info.value.reason == "stall"
+    assert len(reports) == 2
+
+
+def test_run_async_timeout() -> None:
+    ff = FFmpeg(global_options="--stdin keys --long-run")
+    with pytest.raises(FFTimeoutError) as exc_info:
+        asyncio.run(ff.run_async(stderr=subprocess.PIPE, timeout=0.3))
+    assert exc_info.value.exit_code == 0
+    assert exc_info.value.stderr == b"Exiting normally, received signal q.\n"
+
+
+def test_run_async_stall_timeout() -> None:
+    ff = FFmpeg(global_options="--ticks 3 --ignore-sigterm --long-run")
+    with pytest.raises(FFTimeoutError) as exc_info:
+        asyncio.run(ff.run_async(stderr=TailCapture(), stall_timeout=0.3, grace_period=0.1))
+    assert exc_info.value.reason == "stall"
+    assert exc_info.value.exit_code == -9
+    assert exc_info.value.stderr == b"tick 1\ntick 2\ntick 3\n"